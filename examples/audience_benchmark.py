@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import sys
+import time
+
+import numpy as np
+from conf_examples import get_tair
+
+from tair.audience import And, AudienceEngine, Not, Or
+from tair.roaringbulk import bulk_setbits
+
+PREFIX = "AUDIENCE_BENCHMARK"
+UNIVERSE = 10000000
+# the cardinality of each tag bitmap, from a niche tag to a very broad one.
+SIZES = [1000, 10000, 100000, 1000000, 3000000, 5000000, 8000000]
+
+
+def tag(i: int) -> str:
+    return f"{PREFIX}:tag:{i}"
+
+
+# the segment is written the way people usually write it: broad tags first
+# and the most selective condition last.
+SEGMENT = And(
+    Or(tag(6), tag(5)),
+    tag(4),
+    Not(Or(tag(3), tag(2))),
+    Or(tag(1), tag(0)),
+)
+
+
+# naive_count evaluates the tree left to right, storing every intermediate
+# result with TR.BITOP and reading the final count with TR.BITCOUNT.
+def naive_count(tair, expr, counter) -> int:
+    def evaluate(node, dest) -> str:
+        if isinstance(node, str):
+            return node
+        if isinstance(node, Or):
+            keys = [evaluate(c, f"{dest}:{i}") for i, c in enumerate(node.children)]
+            counter[0] += 1
+            tair.tr_bitop(dest, "OR", keys)
+            return dest
+        result = None
+        for i, child in enumerate(node.children):
+            if isinstance(child, Not):
+                key, op = evaluate(child.child, f"{dest}:{i}"), "DIFF"
+            else:
+                key, op = evaluate(child, f"{dest}:{i}"), "AND"
+            if result is None:
+                result = key
+                continue
+            counter[0] += 1
+            tair.tr_bitop(f"{dest}:r{i}", op, [result, key])
+            result = f"{dest}:r{i}"
+        return result
+
+    counter[0] += 1
+    return tair.tr_bitcount(evaluate(expr, f"{PREFIX}:naive"))
+
+
+def bench(name: str, fn, rounds: int) -> None:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = fn()
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"{name}: count {count}, first {latencies[0] * 1000:.1f}ms, "
+        f"median {np.median(latencies) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    tair = get_tair()
+    rng = np.random.default_rng(0)
+    for i, size in enumerate(SIZES):
+        bulk_setbits(
+            tair, tag(i), rng.choice(UNIVERSE, size, replace=False), replace=True
+        )
+
+    counter = [0]
+    bench("naive", lambda: naive_count(tair, SEGMENT, counter), rounds)
+    print(f"naive: {counter[0] / rounds:.0f} commands per query")
+
+    engine = AudienceEngine(tair, prefix=f"{PREFIX}:engine:", ttl=60)
+    bench("engine", lambda: engine.count(SEGMENT), rounds)
+    print(f"engine: {engine.stats}")
+
+    for key in tair.scan_iter(f"{PREFIX}:*"):
+        tair.delete(key)
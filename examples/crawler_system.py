@@ -1,10 +1,10 @@
 #!/usr/bin/env python
 
-from typing import List
+from typing import Iterable, List
 
 from conf_examples import get_tair
 
-from tair import ResponseError
+from tair import BloomDedup, ResponseError
 
 
 # Determine if the URL has been crawled
@@ -19,6 +19,18 @@ def bf_mexists(key: str, urls: List[str]):
         return None
 
 
+# Keep only the URLs that have never been crawled, checking and adding them
+# with one BF.INSERT per batch instead of one round trip per URL.
+# @param key key
+# @param urls the urls, may be a lazy stream
+def new_urls(key: str, urls: Iterable[str]):
+    dedup = BloomDedup(get_tair(), key, batch_size=5000)
+    try:
+        yield from dedup.dedup(urls)
+    finally:
+        print(dedup.stats)
+
+
 if __name__ == "__main__":
     tair = get_tair()
     key = "CrawlerSystem"
@@ -26,3 +38,4 @@ if __name__ == "__main__":
     tair.bf_add(key, "def")
     tair.bf_add(key, "ghi")
     print(bf_mexists(key, ["abc", "def", "xxx"]))
+    print(list(new_urls(key, ["abc", "jkl", "mno", "jkl"])))
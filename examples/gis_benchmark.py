@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import random
+import sys
+import time
+
+from conf_examples import get_tair
+
+from tair.localgis import LocalGis
+
+AREA = "GIS_BENCHMARK"
+# the store areas are squares of about 2km around random centers in a city.
+STORES = 2000
+LON, LAT, SPAN, SIDE = 120.0, 30.2, 0.4, 0.02
+
+
+def square(lon: float, lat: float) -> str:
+    corners = [
+        (lon, lat),
+        (lon + SIDE, lat),
+        (lon + SIDE, lat + SIDE),
+        (lon, lat + SIDE),
+    ]
+    return "POLYGON((" + ",".join(f"{x} {y}" for x, y in corners + corners[:1]) + "))"
+
+
+def bench(name: str, fn, points) -> None:
+    start = time.perf_counter()
+    matches = sum(fn(AREA, point, True)[0] for point in points)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {len(points) / elapsed:10.0f} queries/s, {matches} matches")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tair = get_tair()
+    rng = random.Random(0)
+    tair.delete(AREA)
+    stores = {
+        f"store-{i}": square(LON + rng.random() * SPAN, LAT + rng.random() * SPAN)
+        for i in range(STORES)
+    }
+    tair.gis_add(AREA, stores)
+    points = [
+        f"POINT({LON + rng.random() * SPAN} {LAT + rng.random() * SPAN})"
+        for _ in range(n)
+    ]
+
+    local = LocalGis(tair, ttl=3600)
+    start = time.perf_counter()
+    local.load(AREA)
+    print(f"load     {STORES} polygons in {(time.perf_counter() - start) * 1000:.1f}ms")
+    assert all(
+        sorted(local.gis_contains(AREA, p, True)[1])
+        == sorted(tair.gis_contains(AREA, p, True)[1])
+        for p in points[:100]
+    )
+
+    bench("remote", tair.gis_contains, points)
+    bench("local", local.gis_contains, points)
+    print(f"stats: {local.stats}")
+    tair.delete(AREA)
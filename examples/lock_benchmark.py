@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+import statistics
+import sys
+import time
+import uuid
+from threading import Thread
+from typing import Callable, List
+
+from conf_examples import get_tair
+
+from tair import Lock
+
+LOCK_KEY: str = "BENCHMARK_LOCK_KEY"
+
+
+# polling_critical_section is the approach of distribute_lock.py:
+# SET NX EX to acquire, CAD to release and sleep between attempts.
+def polling_critical_section(tair, hold: float) -> float:
+    request_id = str(uuid.uuid4())
+    start = time.perf_counter()
+    while not tair.set(LOCK_KEY, request_id, ex=10, nx=True):
+        time.sleep(1)
+    waited = time.perf_counter() - start
+    time.sleep(hold)
+    tair.cad(LOCK_KEY, request_id)
+    return waited
+
+
+# lock_critical_section uses tair.Lock, waiters are woken up by the release.
+def lock_critical_section(tair, hold: float) -> float:
+    lock = Lock(tair, LOCK_KEY, lease=10)
+    start = time.perf_counter()
+    lock.acquire()
+    waited = time.perf_counter() - start
+    time.sleep(hold)
+    lock.release()
+    return waited
+
+
+def run(
+    name: str,
+    critical_section: Callable,
+    threads_num: int,
+    iterations: int,
+    hold: float,
+) -> None:
+    waits: List[float] = []
+
+    def thread_target():
+        tair = get_tair()
+        for _ in range(iterations):
+            waits.append(critical_section(tair, hold))
+        tair.close()
+
+    threads: List[Thread] = [Thread(target=thread_target) for _ in range(threads_num)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    waits.sort()
+    print(
+        f"{name}: {len(waits) / elapsed:.1f} acquisitions/s, "
+        + f"wait p50 {statistics.median(waits) * 1000:.1f}ms, "
+        + f"p99 {waits[int(len(waits) * 0.99) - 1] * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    threads_num = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    hold = 0.01
+    get_tair().delete(LOCK_KEY)
+    run("polling", polling_critical_section, threads_num, iterations, hold)
+    run("tair.Lock", lock_critical_section, threads_num, iterations, hold)
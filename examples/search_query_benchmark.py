@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import json
+import sys
+import time
+
+from tair.searchquery import (
+    Bool,
+    Match,
+    Param,
+    QueryCache,
+    Range,
+    SearchQuery,
+    Term,
+    TermsAgg,
+)
+
+CACHE = QueryCache()
+
+
+# by_dict builds the DSL as nested dicts and serializes it with json.dumps,
+# as most callers do on every request.
+def by_dict(text: str, category: str, low: float, offset: int) -> str:
+    query = {
+        "query": {
+            "bool": {
+                "must": [{"match": {"title": {"query": text, "operator": "and"}}}],
+                "filter": [
+                    {"term": {"category": category}},
+                    {"range": {"price": {"gte": low}}},
+                ],
+            }
+        },
+        "sort": [{"price": {"order": "desc"}}],
+        "from": offset,
+        "size": 20,
+        "aggs": {"brands": {"terms": {"field": "brand", "size": 10}}},
+    }
+    return json.dumps(query)
+
+
+def build(text, category, low, offset) -> SearchQuery:
+    return (
+        SearchQuery(
+            Bool(
+                must=[Match("title", text, operator="and")],
+                filter=[Term("category", category), Range("price", gte=low)],
+            )
+        )
+        .sort("price", "desc")
+        .page(offset, 20)
+        .aggregate("brands", TermsAgg("brand", size=10))
+    )
+
+
+# by_builder builds and serializes a SearchQuery on every request.
+def by_builder(text: str, category: str, low: float, offset: int) -> str:
+    return build(text, category, low, offset).to_json()
+
+
+# by_template serializes the query once, and afterwards only encodes the
+# parameters of each request.
+def by_template(text: str, category: str, low: float, offset: int) -> str:
+    return CACHE.render(
+        "products",
+        lambda: build(Param("text"), Param("category"), Param("low"), Param("offset")),
+        text=text,
+        category=category,
+        low=low,
+        offset=offset,
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    requests = [
+        (f"red shoes {i}", f"c{i % 50}", i % 100 / 2, i % 5 * 20) for i in range(n)
+    ]
+    assert json.loads(by_dict(*requests[1])) == json.loads(by_template(*requests[1]))
+
+    for name, fn in (
+        ("dict + json.dumps", by_dict),
+        ("SearchQuery.to_json", by_builder),
+        ("QueryCache.render", by_template),
+    ):
+        start = time.perf_counter()
+        for request in requests:
+            fn(*request)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} {elapsed / n * 1e6:6.2f} us/query")
+    print(f"cache: {CACHE.stats}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+import sys
+import time
+
+import numpy as np
+from conf_examples import get_tair
+
+from tair.tairzset import encode_score, encode_scores
+
+KEY = "ZSET_INGEST_BENCHMARK"
+CHUNK_SIZE = 10000
+
+
+# ingest_mapping formats each "a#b#c" score in a Python loop and sends
+# one EXZADD per chunk through a pipeline.
+def ingest_mapping(tair, members, scores) -> float:
+    start = time.perf_counter()
+    rows = scores.tolist()
+    with tair.pipeline(transaction=False) as pipe:
+        for i in range(0, len(members), CHUNK_SIZE):
+            mapping = {
+                m: "#".join(str(s) for s in row)
+                for m, row in zip(members[i : i + CHUNK_SIZE], rows[i : i + CHUNK_SIZE])
+            }
+            pipe.exzadd(KEY, mapping)
+        pipe.execute()
+    return time.perf_counter() - start
+
+
+# ingest_array encodes all scores at once with encode_scores and sends the
+# chunks with exzadd_array.
+def ingest_array(tair, members, scores) -> float:
+    start = time.perf_counter()
+    with tair.pipeline(transaction=False) as pipe:
+        for i in range(0, len(members), CHUNK_SIZE):
+            pipe.exzadd_array(
+                KEY, members[i : i + CHUNK_SIZE], scores[i : i + CHUNK_SIZE]
+            )
+        pipe.execute()
+    return time.perf_counter() - start
+
+
+def bench_encoding(scores) -> None:
+    rows = scores.tolist()
+    start = time.perf_counter()
+    [encode_score(row) for row in rows]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encode_scores(scores)
+    vectorized = time.perf_counter() - start
+    print(
+        f"encode {len(rows)} scores: loop {loop:.2f}s, encode_scores {vectorized:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    dims = 3
+    members = [f"member_{i}" for i in range(n)]
+    scores = np.random.randint(0, 1000000, size=(n, dims)).astype("f8")
+
+    bench_encoding(scores)
+
+    tair = get_tair()
+    for name, ingest in (("mapping", ingest_mapping), ("array", ingest_array)):
+        tair.delete(KEY)
+        elapsed = ingest(tair, members, scores)
+        print(f"{name}: {n} members in {elapsed:.2f}s, {n / elapsed:.0f} members/s")
+    tair.delete(KEY)
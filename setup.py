@@ -14,4 +14,5 @@ setup(
     python_requires=">=3.7",
     packages=["tair", "tair.asyncio"],
     install_requires=["redis == 4.4.4"],
+    extras_require={"numpy": ["numpy"], "orjson": ["orjson"]},
 )
@@ -1,13 +1,20 @@
+from tair.audience import AudienceEngine
+from tair.cache import CacheAside
 from tair.client import Tair
 from tair.cluster import TairCluster
+from tair.counter import CounterBuffer
+from tair.dedup import BloomDedup
 from tair.exceptions import (
     AuthenticationError,
     AuthenticationWrongNumberOfArgsError,
+    BufferFullError,
     BusyLoadingError,
     ChildDeadlockedError,
     ConnectionError,
     DataError,
     InvalidResponse,
+    LockError,
+    LockNotOwnedError,
     PubSubError,
     ReadOnlyError,
     ResponseError,
@@ -15,6 +22,19 @@ from tair.exceptions import (
     TimeoutError,
     WatchError,
 )
+from tair.leaderboard import ShardedLeaderboard
+from tair.localbitmap import LocalBitmap
+from tair.localgis import LocalGis
+from tair.lock import Lock
+from tair.scalablebloom import ScalableBloom
+from tair.searchcache import SearchCache
+from tair.searchindexer import BulkIndexer
+from tair.searchquery import QueryCache, SearchQuery
+from tair.searchreindex import Reindexer
+from tair.searchresult import SearchHit, SearchResult
+from tair.shardedbloom import ShardedBloom
+from tair.shardedcounter import ShardedCounter
+from tair.suggestcache import SuggestionCache
 from tair.taircpc import CpcUpdate2judResult
 from tair.tairgis import TairGisSearchMember, TairGisSearchRadius
 from tair.tairhash import ExhscanResult, FieldValueItem, ValueVersionItem
@@ -24,15 +44,36 @@ from tair.tairstring import ExcasResult, ExgetResult
 from tair.tairts import Aggregation, TairTsSkeyItem
 from tair.tairvector import TairVectorIndex, TairVectorScanResult
 from tair.tairzset import TairZsetItem
+from tair.versioned import ContentionStats
 
 __all__ = [
     "Aggregation",
+    "AudienceEngine",
+    "BloomDedup",
+    "BulkIndexer",
+    "CacheAside",
+    "ContentionStats",
+    "CounterBuffer",
     "CpcUpdate2judResult",
     "ExcasResult",
     "ExgetResult",
     "ExhscanResult",
     "FieldValueItem",
+    "LocalBitmap",
+    "LocalGis",
+    "Lock",
+    "QueryCache",
+    "Reindexer",
+    "ScalableBloom",
     "ScandocidResult",
+    "SearchCache",
+    "SearchHit",
+    "SearchQuery",
+    "SearchResult",
+    "ShardedBloom",
+    "ShardedCounter",
+    "ShardedLeaderboard",
+    "SuggestionCache",
     "Tair",
     "TairCluster",
     "TairGisSearchMember",
@@ -44,11 +85,14 @@ __all__ = [
     # errors
     "AuthenticationError",
     "AuthenticationWrongNumberOfArgsError",
+    "BufferFullError",
     "BusyLoadingError",
     "ChildDeadlockedError",
     "ConnectionError",
     "DataError",
     "InvalidResponse",
+    "LockError",
+    "LockNotOwnedError",
     "PubSubError",
     "ReadOnlyError",
     "ResponseError",
@@ -20,6 +20,8 @@ from redis.exceptions import (
     ConnectionError,
     DataError,
     InvalidResponse,
+    LockError,
+    LockNotOwnedError,
     PubSubError,
     ReadOnlyError,
     RedisError,
@@ -28,8 +30,23 @@ from redis.exceptions import (
     WatchError,
 )
 
+from tair.asyncio.audience import AudienceEngine
+from tair.asyncio.cache import CacheAside
 from tair.asyncio.client import Tair
 from tair.asyncio.cluster import TairCluster
+from tair.asyncio.counter import CounterBuffer
+from tair.asyncio.dedup import BloomDedup
+from tair.asyncio.leaderboard import ShardedLeaderboard
+from tair.asyncio.localgis import LocalGis
+from tair.asyncio.lock import Lock
+from tair.asyncio.scalablebloom import ScalableBloom
+from tair.asyncio.searchcache import SearchCache
+from tair.asyncio.searchindexer import BulkIndexer
+from tair.asyncio.searchreindex import Reindexer
+from tair.asyncio.shardedbloom import ShardedBloom
+from tair.asyncio.shardedcounter import ShardedCounter
+from tair.asyncio.suggestcache import SuggestionCache
+from tair.exceptions import BufferFullError
 
 TairError = RedisError
 
@@ -37,27 +54,44 @@ __all__ = [
     "Tair",
     "TairCluster",
     "TairError",
+    "AudienceEngine",
     "AuthenticationError",
     "AuthenticationWrongNumberOfArgsError",
     "BlockingConnectionPool",
+    "BloomDedup",
+    "BufferFullError",
+    "BulkIndexer",
     "BusyLoadingError",
+    "CacheAside",
     "ChildDeadlockedError",
     "CommandsParser",
     "Connection",
     "ConnectionError",
     "ConnectionPool",
+    "CounterBuffer",
     "DataError",
     "from_url",
     "InvalidResponse",
+    "LocalGis",
+    "Lock",
+    "LockError",
+    "LockNotOwnedError",
     "PubSubError",
     "ReadOnlyError",
+    "Reindexer",
     "ResponseError",
+    "ScalableBloom",
+    "SearchCache",
     "Sentinel",
     "SentinelConnectionPool",
     "SentinelManagedConnection",
     "SentinelManagedSSLConnection",
+    "ShardedBloom",
+    "ShardedCounter",
+    "ShardedLeaderboard",
     "SSLConnection",
     "StrictRedis",
+    "SuggestionCache",
     "TimeoutError",
     "UnixDomainSocketConnection",
     "WatchError",
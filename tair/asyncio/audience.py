@@ -0,0 +1,178 @@
+from typing import Dict, List, Optional, Tuple
+
+from tair.asyncio.roaringbitop import cluster_bitop, cluster_bitopcard
+from tair.audience import (
+    BITOP_EXPIRE,
+    And,
+    AudienceStats,
+    ExprT,
+    Or,
+    Plan,
+    cache_key,
+    canonical,
+    normalize,
+    split_and,
+    subexpressions,
+)
+from tair.roaringbitop import same_slot
+from tair.typing import KeyT
+
+
+class AudienceEngine:
+    def __init__(
+        self, client, prefix: str = "audience:", ttl: int = 300, min_ttl: int = 1
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.min_ttl = min_ttl
+        self.stats = AudienceStats()
+
+    def key_of(self, expr: ExprT) -> KeyT:
+        return cache_key(self.prefix, expr)
+
+    async def count(self, expr: ExprT) -> int:
+        expr = normalize(expr)
+        plan = await self.prepare(expr)
+        return await self._count(expr, plan)
+
+    # select returns the key holding the result, or None if it is empty.
+    async def select(self, expr: ExprT) -> Optional[KeyT]:
+        expr = normalize(expr)
+        plan = await self.prepare(expr)
+        return await self._materialize(expr, plan)
+
+    async def prepare(self, expr: ExprT) -> Plan:
+        self.stats.queries += 1
+        leaves: Dict[str, KeyT] = {}
+        nodes: Dict[str, ExprT] = {}
+        subexpressions(expr, leaves, nodes)
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in leaves.values():
+                pipe.tr_bitcount(key)
+            for node in nodes.values():
+                pipe.pttl(self.key_of(node))
+                pipe.tr_bitcount(self.key_of(node))
+            replies = await pipe.execute()
+
+        plan = Plan()
+        for key, card in zip(leaves.values(), replies):
+            plan.record(key, key, card)
+        replies = replies[len(leaves) :]
+        for i, node in enumerate(nodes.values()):
+            pttl, card = replies[2 * i], replies[2 * i + 1]
+            if pttl >= self.min_ttl * 1000:
+                self.stats.cache_hits += 1
+                plan.record(node, self.key_of(node), card)
+        return plan
+
+    async def _count(self, expr: ExprT, plan: Plan) -> int:
+        if plan.known(expr):
+            return plan.cards[canonical(expr)]
+        if isinstance(expr, Or):
+            keys = await self._materialize_all(expr.children, plan)
+            return await self._bitopcard("OR", keys) if keys else 0
+        if isinstance(expr, And):
+            operands = await self._and_operands(expr, plan)
+            if operands is None:
+                return 0
+            positives, negative = operands
+            if negative is None:
+                return await self._bitopcard("AND", positives)
+            key = await self._intersection(expr, positives, plan)
+            return (
+                await self._bitopcard("DIFF", [key, negative]) if key is not None else 0
+            )
+        key = await self._materialize(expr.child, plan)
+        return await self._bitopcard("NOT", [key]) if key is not None else 0
+
+    async def _materialize(self, expr: ExprT, plan: Plan) -> Optional[KeyT]:
+        c = canonical(expr)
+        if c in plan.keys:
+            return plan.keys[c]
+
+        dest = self.key_of(expr)
+        card = 0
+        if isinstance(expr, Or):
+            children = [
+                child for child in expr.children if await self._materialize(child, plan)
+            ]
+            if len(children) == 1:
+                dest = plan.keys[canonical(children[0])]
+                card = plan.cards[canonical(children[0])]
+            elif children:
+                keys = [plan.keys[canonical(child)] for child in children]
+                card = await self._bitop(dest, "OR", keys)
+        elif isinstance(expr, And):
+            operands = await self._and_operands(expr, plan)
+            if operands is not None:
+                positives, negative = operands
+                if negative is None:
+                    card = await self._bitop(dest, "AND", positives)
+                else:
+                    key = await self._intersection(expr, positives, plan)
+                    if key is not None:
+                        card = await self._bitop(dest, "DIFF", [key, negative])
+        else:
+            key = await self._materialize(expr.child, plan)
+            if key is not None:
+                card = await self._bitop(dest, "NOT", [key])
+        plan.record(expr, dest, card)
+        return dest if card else None
+
+    async def _materialize_all(self, exprs: List[ExprT], plan: Plan) -> List[KeyT]:
+        keys = [await self._materialize(expr, plan) for expr in exprs]
+        return [key for key in keys if key is not None]
+
+    # _and_operands returns the keys of the positive operands of an AND,
+    # smallest first, and a key holding the union of the negated ones, or
+    # None if the AND is known to be empty.
+    async def _and_operands(
+        self, expr: And, plan: Plan
+    ) -> Optional[Tuple[List[KeyT], Optional[KeyT]]]:
+        positives, negatives = split_and(expr)
+        positives = sorted(positives, key=plan.estimate)
+        if plan.estimate(positives[0]) == 0:
+            return None
+
+        keys = []
+        for child in positives:
+            key = await self._materialize(child, plan)
+            if key is None:
+                return None
+            keys.append(key)
+
+        negative = None
+        if negatives:
+            negative = await self._materialize(normalize(Or(*negatives)), plan)
+        return keys, negative
+
+    # _intersection returns the key holding the intersection of the positive
+    # operands of expr, which are already materialized.
+    async def _intersection(
+        self, expr: And, positives: List[KeyT], plan: Plan
+    ) -> Optional[KeyT]:
+        if len(positives) == 1:
+            return positives[0]
+        return await self._materialize(normalize(And(*split_and(expr)[0])), plan)
+
+    async def _bitop(self, dest: KeyT, operation: str, keys: List[KeyT]) -> int:
+        self.stats.bitops += 1
+        self.stats.temp_keys += 1
+        if not same_slot(self.client, [dest, *keys]):
+            card = await cluster_bitop(self.client, dest, operation, keys)
+            await self.client.expire(dest, self.ttl)
+            return card
+        if hasattr(self.client, "keyslot"):
+            return await self.client.eval(
+                BITOP_EXPIRE, len(keys) + 1, dest, *keys, operation, self.ttl
+            )
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.tr_bitop(dest, operation, keys)
+            pipe.expire(dest, self.ttl)
+            return (await pipe.execute())[0]
+
+    async def _bitopcard(self, operation: str, keys: List[KeyT]) -> int:
+        self.stats.bitops += 1
+        return await cluster_bitopcard(self.client, operation, keys)
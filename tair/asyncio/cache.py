@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from tair.cache import CacheStats, lease_key, should_refresh_early, stale_key
+from tair.typing import KeyT
+
+
+class CacheAside:
+    def __init__(
+        self,
+        client,
+        ttl: float = 60,
+        stale_ttl: float = 300,
+        lease: float = 5,
+        early_refresh: bool = False,
+        beta: float = 1.0,
+        poll_interval: float = 0.05,
+        dumps: Optional[Callable[[Any], Any]] = None,
+        loads: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lease = lease
+        self.early_refresh = early_refresh
+        self.beta = beta
+        self.poll_interval = poll_interval
+        self.dumps = dumps if dumps is not None else json.dumps
+        self.loads = loads if loads is not None else json.loads
+        self.stats = CacheStats()
+
+        self._flights: Dict[KeyT, asyncio.Future] = {}
+        self._deltas: Dict[KeyT, float] = {}
+
+    async def get(self, key: KeyT, loader: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exget(key)
+            pipe.pttl(key)
+            current, pttl = await pipe.execute()
+
+        if current is None:
+            self.stats.misses += 1
+            return await self._single_flight(key, loader)
+
+        self.stats.hits += 1
+        if self.early_refresh and should_refresh_early(
+            self._deltas.get(key, 0), self.beta, pttl
+        ):
+            token = str(uuid.uuid4())
+            if await self._acquire_lease(key, token):
+                self.stats.early_refreshes += 1
+                try:
+                    return await self._recompute(key, loader)
+                finally:
+                    await self.client.cad(lease_key(key), token)
+        return self.loads(current.value)
+
+    async def invalidate(self, key: KeyT) -> None:
+        await self.client.delete(key, stale_key(key))
+
+    async def _single_flight(
+        self, key: KeyT, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        flight = self._flights.get(key)
+        while flight is not None:
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # only the leader was cancelled: the first follower to resume
+                # leads a new flight and the others follow it.
+                if not flight.cancelled():
+                    raise
+            flight = self._flights.get(key)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            value = await self._load(key, loader)
+            flight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # the leader re-raises, so the exception is always retrieved.
+            flight.exception()
+            raise
+        finally:
+            del self._flights[key]
+
+    async def _acquire_lease(self, key: KeyT, token: str) -> bool:
+        return bool(
+            await self.client.set(
+                lease_key(key), token, px=int(self.lease * 1000), nx=True
+            )
+        )
+
+    async def _load(self, key: KeyT, loader: Callable[[], Awaitable[Any]]) -> Any:
+        token = str(uuid.uuid4())
+        if await self._acquire_lease(key, token):
+            try:
+                return await self._recompute(key, loader)
+            finally:
+                await self.client.cad(lease_key(key), token)
+
+        stale = await self.client.exget(stale_key(key))
+        if stale is not None:
+            self.stats.stale_hits += 1
+            return self.loads(stale.value)
+
+        # nothing to serve yet, wait for the lease holder to fill the key.
+        deadline = time.monotonic() + self.lease
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            current = await self.client.exget(key)
+            if current is not None:
+                return self.loads(current.value)
+        return await self._recompute(key, loader)
+
+    async def _recompute(self, key: KeyT, loader: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        value = await loader()
+        delta = time.perf_counter() - start
+        self.stats.loads += 1
+        if self.early_refresh:
+            if len(self._deltas) >= 10000:
+                self._deltas.clear()
+            self._deltas[key] = delta
+
+        data = self.dumps(value)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exset(key, data, px=int(self.ttl * 1000))
+            pipe.exset(stale_key(key), data, px=int((self.ttl + self.stale_ttl) * 1000))
+            await pipe.execute()
+        return value
@@ -0,0 +1,148 @@
+import asyncio
+from typing import Dict, Optional
+
+from tair.counter import CounterT, merge_increments, queue_increments
+from tair.exceptions import BufferFullError, DataError, TairError
+from tair.typing import FieldT, KeyT, ResponseT
+
+
+class CounterBuffer:
+    def __init__(
+        self,
+        client,
+        flush_size: int = 1000,
+        max_size: int = 100000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if flush_size > max_size:
+            raise DataError("flush_size must not be greater than max_size")
+        self.client = client
+        self.flush_size = flush_size
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+
+        self.increments = 0
+        self.flushes = 0
+        self.commands = 0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+
+        self._pending: Dict[CounterT, int] = {}
+        self._inflight = 0
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "CounterBuffer":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # the flusher task is bound to the running event loop, so it is created
+    # lazily instead of in __init__.
+    def start(self) -> None:
+        if self._task is None:
+            self._flush_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    # bounded counters are sent to the server immediately, since their
+    # MIN/MAX checks only hold if every increment is applied individually.
+    async def incr(
+        self,
+        key: KeyT,
+        amount: int = 1,
+        field: Optional[FieldT] = None,
+        minval: Optional[int] = None,
+        maxval: Optional[int] = None,
+    ) -> ResponseT:
+        if minval is not None or maxval is not None:
+            if field is None:
+                return await self.client.exincrby(
+                    key, amount, minval=minval, maxval=maxval
+                )
+            return await self.client.exhincrby(
+                key, field, amount, minval=minval, maxval=maxval
+            )
+
+        if self._closed:
+            raise TairError("CounterBuffer is closed")
+        self.start()
+
+        counter = (key, field)
+        while counter not in self._pending and self._size() >= self.max_size:
+            # the flusher cannot keep up, apply backpressure to the caller.
+            try:
+                await self.flush()
+            except Exception as e:
+                raise BufferFullError("CounterBuffer is full") from e
+            if self._closed:
+                raise TairError("CounterBuffer is closed")
+        self.increments += 1
+        self._pending[counter] = self._pending.get(counter, 0) + amount
+
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+        return None
+
+    async def flush(self) -> int:
+        self.start()
+        async with self._flush_lock:
+            batch = {c: n for c, n in self._pending.items() if n != 0}
+            self._pending = {}
+            self._inflight = len(batch)
+            if not batch:
+                return 0
+
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    queue_increments(pipe, batch)
+                    responses = await pipe.execute(raise_on_error=False)
+            except Exception:
+                # which commands were applied is unknown, so the whole batch
+                # is retried: delivery is at least once.
+                merge_increments(self._pending, batch)
+                raise
+            finally:
+                self._inflight = 0
+
+            self.flushes += 1
+            self.commands += len(batch)
+            for resp in responses:
+                if isinstance(resp, Exception):
+                    self.errors += 1
+                    self.last_error = resp
+            return len(batch)
+
+    def _size(self) -> int:
+        return len(self._pending) + self._inflight
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                await self.flush()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
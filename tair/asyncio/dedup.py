@@ -0,0 +1,83 @@
+import time
+from typing import AsyncIterable, AsyncIterator, Iterable, List, Optional, Union
+
+from tair.asyncio.inflight import iter_in_flight
+from tair.asyncio.shardedbloom import ShardedBloom
+from tair.dedup import DedupStats, batch_items, check_dedup_args, item_size
+from tair.typing import EncodableT, KeyT
+
+
+async def abatch_items(
+    items: AsyncIterable[EncodableT], batch_size: int, batch_bytes: int
+) -> AsyncIterator[List[EncodableT]]:
+    batch: List[EncodableT] = []
+    size = 0
+    async for item in items:
+        batch.append(item)
+        size += item_size(item)
+        if len(batch) >= batch_size or size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+async def iter_batches(
+    items: Union[Iterable[EncodableT], AsyncIterable[EncodableT]],
+    batch_size: int,
+    batch_bytes: int,
+) -> AsyncIterator[List[EncodableT]]:
+    if hasattr(items, "__aiter__"):
+        async for batch in abatch_items(items, batch_size, batch_bytes):
+            yield batch
+    else:
+        for batch in batch_items(items, batch_size, batch_bytes):
+            yield batch
+
+
+class BloomDedup:
+    def __init__(
+        self,
+        client,
+        target: Union[KeyT, ShardedBloom],
+        batch_size: int = 5000,
+        batch_bytes: int = 1024 * 1024,
+        in_flight: int = 4,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+    ) -> None:
+        check_dedup_args(batch_size, batch_bytes, in_flight)
+        self.client = client
+        self.target = target
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.in_flight = in_flight
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.stats = DedupStats()
+
+    async def insert(self, batch: List[EncodableT]) -> List[int]:
+        if isinstance(self.target, ShardedBloom):
+            return await self.target.madd(batch)
+        return await self.client.bf_insert(
+            self.target, batch, capacity=self.capacity, error_rate=self.error_rate
+        )
+
+    async def dedup(
+        self, items: Union[Iterable[EncodableT], AsyncIterable[EncodableT]]
+    ) -> AsyncIterator[EncodableT]:
+        start = time.perf_counter()
+        elapsed = self.stats.elapsed
+        batches = iter_batches(items, self.batch_size, self.batch_bytes)
+        flights = iter_in_flight(self.insert, batches, self.in_flight)
+        try:
+            async for batch, task in flights:
+                flags = await task
+                unseen = [item for item, flag in zip(batch, flags) if flag]
+                self.stats.record(batch, len(unseen))
+                self.stats.elapsed = elapsed + time.perf_counter() - start
+                for item in unseen:
+                    yield item
+        finally:
+            await flights.aclose()
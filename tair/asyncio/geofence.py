@@ -0,0 +1,40 @@
+import asyncio
+from typing import Any, List, Sequence
+
+from tair.geofence import (
+    MatchesT,
+    check_geofence_args,
+    collect_matches,
+    point_wkts,
+)
+from tair.typing import KeyT
+
+
+async def contains_chunk(client, area: KeyT, wkts: Sequence[str]) -> List[Any]:
+    async with client.pipeline(transaction=False) as pipe:
+        for wkt in wkts:
+            pipe.gis_contains(area, wkt, withoutwkts=True)
+        return await pipe.execute()
+
+
+async def contains_points(
+    client,
+    area: KeyT,
+    lons: Any,
+    lats: Any,
+    chunk_size: int = 1000,
+    workers: int = 4,
+    sparse: bool = False,
+    precision: int = 6,
+) -> MatchesT:
+    check_geofence_args(chunk_size, workers)
+    wkts = point_wkts(lons, lats, precision)
+    chunks = [wkts[i : i + chunk_size] for i in range(0, len(wkts), chunk_size)]
+    semaphore = asyncio.Semaphore(workers)
+
+    async def send(chunk: Sequence[str]) -> List[Any]:
+        async with semaphore:
+            return await contains_chunk(client, area, chunk)
+
+    replies = await asyncio.gather(*(send(chunk) for chunk in chunks))
+    return collect_matches(list(replies), sparse)
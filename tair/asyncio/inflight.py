@@ -0,0 +1,27 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Tuple
+
+from tair.inflight import ItemT
+
+
+# iter_in_flight runs fn(item) as a task for every item and yields each item
+# with its task, in input order, keeping at most in_flight tasks ahead of the
+# caller like its sync twin. The tasks not yet yielded are cancelled when the
+# iteration stops early, so the caller closes it with aclose.
+async def iter_in_flight(
+    fn: Callable[[ItemT], Awaitable[Any]],
+    items: AsyncIterable[ItemT],
+    in_flight: int,
+) -> AsyncIterator[Tuple[ItemT, "asyncio.Future"]]:
+    pending: "deque[Tuple[ItemT, asyncio.Future]]" = deque()
+    try:
+        async for item in items:
+            pending.append((item, asyncio.ensure_future(fn(item))))
+            if len(pending) >= in_flight:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, task in pending:
+            task.cancel()
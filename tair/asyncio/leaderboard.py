@@ -0,0 +1,140 @@
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from tair.exceptions import DataError
+from tair.leaderboard import (
+    RANK,
+    check_range,
+    merge_items,
+    rank_by_score,
+    shard_index,
+)
+from tair.roaringbitop import same_slot
+from tair.tairzset import ScoreT, TairZsetItem
+from tair.typing import AnyKeyT, EncodableT, KeyT, ResponseT
+
+
+class ShardedLeaderboard:
+    def __init__(self, client, name: KeyT, shards: int = 16) -> None:
+        if shards <= 0:
+            raise DataError("shards must be positive")
+        self.client = client
+        self.name = name
+        self.shards = shards
+        self.keys = [f"{name}:{i}" for i in range(shards)]
+
+    def key_of(self, member: EncodableT) -> str:
+        return self.keys[shard_index(member, self.shards)]
+
+    def group(self, members: Iterable[AnyKeyT]) -> Dict[int, List[AnyKeyT]]:
+        groups: Dict[int, List[AnyKeyT]] = {}
+        for member in members:
+            groups.setdefault(shard_index(member, self.shards), []).append(member)
+        return groups
+
+    async def exzadd(
+        self,
+        mapping: Mapping[AnyKeyT, ScoreT],
+        nx: bool = False,
+        xx: bool = False,
+        ch: bool = False,
+        incr: bool = False,
+    ) -> ResponseT:
+        groups = self.group(mapping)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i, members in groups.items():
+                pipe.exzadd(
+                    self.keys[i],
+                    {m: mapping[m] for m in members},
+                    nx=nx,
+                    xx=xx,
+                    ch=ch,
+                    incr=incr,
+                )
+            replies = await pipe.execute()
+        if incr:
+            return replies[0] if replies else None
+        return sum(replies)
+
+    async def exzincrby(self, increment: ScoreT, member: EncodableT) -> ResponseT:
+        return await self.client.exzincrby(self.key_of(member), increment, member)
+
+    async def exzscore(self, member: EncodableT) -> ResponseT:
+        return await self.client.exzscore(self.key_of(member), member)
+
+    async def exzrem(self, members: Iterable[EncodableT]) -> ResponseT:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i, group in self.group(members).items():
+                pipe.exzrem(self.keys[i], group)
+            return sum(await pipe.execute())
+
+    async def exzcard(self) -> int:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                pipe.exzcard(key)
+            return sum(await pipe.execute())
+
+    async def exzrange(
+        self, start: int, stop: int, withscores: bool = False
+    ) -> List[TairZsetItem]:
+        return await self._range(start, stop, withscores, reverse=False)
+
+    async def exzrevrange(
+        self, start: int, stop: int, withscores: bool = False
+    ) -> List[TairZsetItem]:
+        return await self._range(start, stop, withscores, reverse=True)
+
+    async def top(self, k: int, withscores: bool = True) -> List[TairZsetItem]:
+        if k <= 0:
+            return []
+        return await self.exzrevrange(0, k - 1, withscores)
+
+    async def exzrank(self, member: EncodableT) -> Optional[int]:
+        return await self._rank(member, reverse=False)
+
+    async def exzrevrank(self, member: EncodableT) -> Optional[int]:
+        return await self._rank(member, reverse=True)
+
+    # every shard may hold the whole window, so each one is asked for its
+    # first stop + 1 members and the replies are merged.
+    async def _range(
+        self, start: int, stop: int, withscores: bool, reverse: bool
+    ) -> List[TairZsetItem]:
+        check_range(start, stop)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                if reverse:
+                    pipe.exzrevrange(key, 0, stop, withscores=True)
+                else:
+                    pipe.exzrange(key, 0, stop, withscores=True)
+            replies = await pipe.execute()
+        return merge_items(replies, start, stop, withscores, reverse)
+
+    async def _rank(self, member: EncodableT, reverse: bool) -> Optional[int]:
+        own = shard_index(member, self.shards)
+        if same_slot(self.client, self.keys):
+            return await self.client.eval(
+                RANK, len(self.keys), *self.keys, own + 1, member, int(reverse)
+            )
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exzscore(self.keys[own], member)
+            if reverse:
+                pipe.exzrevrank(self.keys[own], member)
+            else:
+                pipe.exzrank(self.keys[own], member)
+            score, rank = await pipe.execute()
+        if score is None or rank is None:
+            return None
+        if self.shards == 1:
+            return rank
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i, key in enumerate(self.keys):
+                if i == own:
+                    continue
+                if reverse:
+                    pipe.exzrevrankbyscore(key, score)
+                else:
+                    pipe.exzrankbyscore(key, score)
+                if i < own:
+                    pipe.exzcount(key, score, score)
+            return rank + sum(rank_by_score(reply) for reply in await pipe.execute())
@@ -0,0 +1,52 @@
+from typing import Any, Optional, Tuple
+
+from tair.asyncio.roaringbulk import bulk_setbits
+from tair.asyncio.roaringscan import iter_tr_scan
+from tair.asyncio.zsetiter import iter_pages
+from tair.localbitmap import (
+    LocalBitmap,
+    bitarray_page,
+    check_page_args,
+    concat_pages,
+    np,
+)
+from tair.typing import KeyT
+
+
+async def fetch_bitmap(
+    client, key: KeyT, page_size: int = 65536, prefetch: bool = True
+) -> LocalBitmap:
+    check_page_args(page_size)
+    if np is None:
+        stream = iter_tr_scan(client, key, count=page_size, prefetch=prefetch)
+        return LocalBitmap([offset async for offset in stream], True)
+    pages = iter_tr_scan(client, key, count=page_size, prefetch=prefetch, chunks=True)
+    return concat_pages([page async for page in pages])
+
+
+async def fetch_dense_bitmap(
+    client, key: KeyT, window: int = 1 << 20, prefetch: bool = True
+) -> LocalBitmap:
+    check_page_args(window)
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.tr_min(key)
+        pipe.tr_max(key)
+        low, high = await pipe.execute()
+    if low is None or low < 0:
+        return concat_pages([])
+
+    async def fetch(start: int) -> Tuple[int, Any]:
+        end = min(start + window - 1, high)
+        return start, await client.tr_rangebitarray(key, start, end)
+
+    def advance(start: int, page: Tuple[int, Any]) -> Optional[int]:
+        return start + window if start + window <= high else None
+
+    pages = []
+    async for start, bitarray in iter_pages(fetch, advance, low, prefetch):
+        pages.append(bitarray_page(start, bitarray))
+    return concat_pages(pages)
+
+
+async def store_bitmap(client, key: KeyT, bitmap: LocalBitmap, **kwargs) -> int:
+    return await bulk_setbits(client, key, bitmap.offsets, replace=True, **kwargs)
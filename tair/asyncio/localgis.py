@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from tair.localgis import AreaIndex, LocalGisStats, check_gis_args, parse_wkt
+from tair.typing import EncodableT, KeyT, ResponseT
+
+
+class LocalGis:
+    def __init__(
+        self,
+        client,
+        ttl: float = 60.0,
+        version_key: Optional[Callable[[KeyT], KeyT]] = None,
+        check_interval: float = 1.0,
+    ) -> None:
+        check_gis_args(ttl, check_interval)
+        self.client = client
+        self.ttl = ttl
+        self.version_key = version_key
+        self.check_interval = check_interval
+        self.stats = LocalGisStats()
+
+        self._areas: Dict[KeyT, AreaIndex] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    # the lock is bound to the running event loop, so it is created lazily
+    # instead of in __init__.
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def load(self, area: KeyT) -> AreaIndex:
+        if self.version_key is None:
+            index = AreaIndex(await self.client.gis_getall(area))
+        else:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self.version_key(area))
+                pipe.gis_getall(area)
+                version, reply = await pipe.execute()
+            index = AreaIndex(reply, version)
+        self._areas[area] = index
+        self.stats.loads += 1
+        return index
+
+    async def area_index(self, area: KeyT) -> AreaIndex:
+        index = self._areas.get(area)
+        now = time.monotonic()
+        if index is not None and now - index.loaded_at < self.ttl:
+            if self.version_key is None or now - index.checked_at < self.check_interval:
+                return index
+            self.stats.version_checks += 1
+            if await self.client.get(self.version_key(area)) == index.version:
+                index.checked_at = now
+                return index
+        async with self._get_lock():
+            current = self._areas.get(area)
+            if current is not index and current is not None:
+                return current
+            return await self.load(area)
+
+    async def query(
+        self, command: str, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool
+    ) -> ResponseT:
+        index = await self.area_index(area)
+        geom = parse_wkt(polygon_wkt) if index.supported else None
+        if geom is None:
+            self.stats.fallbacks += 1
+            return await getattr(self.client, "gis_" + command)(
+                area, polygon_wkt, withoutwkts
+            )
+        self.stats.hits += 1
+        return index.reply(getattr(index, command)(geom), withoutwkts)
+
+    async def gis_contains(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return await self.query("contains", area, polygon_wkt, withoutwkts)
+
+    async def gis_within(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return await self.query("within", area, polygon_wkt, withoutwkts)
+
+    async def gis_intersects(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return await self.query("intersects", area, polygon_wkt, withoutwkts)
+
+    async def gis_add(self, area: KeyT, mapping: Dict[KeyT, str]) -> ResponseT:
+        try:
+            return await self.client.gis_add(area, mapping)
+        finally:
+            await self.invalidate(area)
+
+    async def gis_del(self, area: KeyT, polygen_name) -> ResponseT:
+        try:
+            return await self.client.gis_del(area, polygen_name)
+        finally:
+            await self.invalidate(area)
+
+    async def invalidate(self, area: KeyT) -> None:
+        async with self._get_lock():
+            self._areas.pop(area, None)
+        if self.version_key is not None:
+            await self.client.incr(self.version_key(area))
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+from tair.exceptions import (
+    ConnectionError,
+    LockError,
+    LockNotOwnedError,
+    TimeoutError,
+)
+from tair.lock import RENEW, fence_key, wait_seconds, wake_key
+from tair.typing import KeyT
+
+
+class Lock:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        lease: float = 10.0,
+        renew: bool = True,
+    ) -> None:
+        self.client = client
+        self.name = name
+        self.lease = lease
+        self.renew = renew
+        self.owner = str(uuid.uuid4())
+        self.token: Optional[int] = None
+        self.lost = False
+
+        self._lease_ms = int(lease * 1000)
+        self._state_lock: Optional[asyncio.Lock] = None
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "Lock":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.release()
+
+    def locked(self) -> bool:
+        return self.token is not None and not self.lost
+
+    async def acquire(
+        self, blocking: bool = True, timeout: Optional[float] = None
+    ) -> bool:
+        if self.token is not None:
+            raise LockError("Cannot acquire an already acquired lock")
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            token = await self.client.exincrby(fence_key(self.name), 1)
+            if await self.client.exset(
+                self.name, self.owner, px=self._lease_ms, nx=True, abs=token
+            ):
+                self.token = token
+                self.lost = False
+                if self.renew:
+                    self._renewer = asyncio.ensure_future(self._renew_loop())
+                return True
+
+            if not blocking:
+                return False
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+
+            pttl = await self.client.pttl(self.name)
+            if pttl == -2:
+                continue
+            wait = wait_seconds(pttl, self.lease, remaining)
+            if wait >= 1:
+                await self.client.blpop([wake_key(self.name)], int(wait))
+            else:
+                await asyncio.sleep(wait)
+
+    async def release(self) -> None:
+        if self.token is None:
+            raise LockError("Cannot release an unlocked lock")
+        if self._renewer is not None:
+            self._renewer.cancel()
+            try:
+                await self._renewer
+            except (asyncio.CancelledError, Exception):
+                # whatever stopped the renewer, the lease is still ours to
+                # delete and the waiters still need their wakeup.
+                pass
+            self._renewer = None
+
+        async with self._get_state_lock():
+            token = self.token
+            self.token = None
+
+        deleted = await self.client.excad(self.name, token)
+        # keep at most one pending wakeup so that releases without waiters
+        # do not pile up stale wakeups.
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.rpush(wake_key(self.name), token)
+            pipe.ltrim(wake_key(self.name), -1, -1)
+            pipe.pexpire(wake_key(self.name), self._lease_ms)
+            await pipe.execute()
+
+        if deleted != 1:
+            self.lost = True
+            raise LockNotOwnedError("Cannot release a lock that's no longer owned")
+
+    async def extend(self) -> bool:
+        async with self._get_state_lock():
+            if self.token is None or self.lost:
+                return False
+            if not await self.client.eval(
+                RENEW, 1, self.name, self.token, self._lease_ms
+            ):
+                self.lost = True
+                return False
+            return True
+
+    # the lock is bound to the running event loop, so it is created lazily
+    # instead of in __init__.
+    def _get_state_lock(self) -> asyncio.Lock:
+        if self._state_lock is None:
+            self._state_lock = asyncio.Lock()
+        return self._state_lock
+
+    async def _renew_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await self.extend():
+                    return
+            except (ConnectionError, TimeoutError):
+                # try again on the next tick, the lease is still valid.
+                continue
@@ -0,0 +1,114 @@
+import heapq
+from typing import AsyncIterator, Collection, List, Sequence, Tuple
+
+from tair.asyncio.roaringscan import iter_tr_scan
+from tair.roaringbitop import (
+    check_emulated,
+    check_operation,
+    required_streams,
+    same_slot,
+    selected,
+    temp_key,
+)
+from tair.typing import KeyT
+
+
+async def next_offset(stream: AsyncIterator[int]):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def merge_groups(
+    streams: Sequence[AsyncIterator[int]], required: Collection[int]
+) -> AsyncIterator[Tuple[int, List[int]]]:
+    heap = []
+    for i, stream in enumerate(streams):
+        offset = await next_offset(stream)
+        if offset is not None:
+            heap.append((offset, i))
+        elif i in required:
+            return
+    heapq.heapify(heap)
+
+    while heap:
+        offset = heap[0][0]
+        group = []
+        done = False
+        while heap and heap[0][0] == offset:
+            _, i = heapq.heappop(heap)
+            group.append(i)
+            following = await next_offset(streams[i])
+            if following is not None:
+                heapq.heappush(heap, (following, i))
+            elif i in required:
+                done = True
+        group.sort()
+        yield offset, group
+        if done:
+            return
+
+
+async def iter_bitop(
+    client, operation: str, keys: Sequence[KeyT], page_size: int = 65536
+) -> AsyncIterator[int]:
+    op = check_operation(operation, keys)
+    check_emulated(op)
+    streams = [iter_tr_scan(client, key, count=page_size) for key in keys]
+    required = required_streams(op, len(keys))
+    try:
+        async for offset, group in merge_groups(streams, required):
+            if selected(op, group, len(keys)):
+                yield offset
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+async def cluster_bitop(
+    client,
+    destkey: KeyT,
+    operation: str,
+    keys: Sequence[KeyT],
+    page_size: int = 65536,
+    chunk_size: int = 65536,
+) -> int:
+    op = check_operation(operation, keys)
+    if same_slot(client, [destkey, *keys]):
+        return await client.tr_bitop(destkey, op, keys)
+
+    temp = temp_key(destkey)
+    count = 0
+    chunk = []
+    try:
+        async for offset in iter_bitop(client, op, keys, page_size):
+            chunk.append(offset)
+            if len(chunk) >= chunk_size:
+                await client.tr_setbits(temp, chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            await client.tr_setbits(temp, chunk)
+            count += len(chunk)
+        if count:
+            await client.tr_optimize(temp)
+            await client.rename(temp, destkey)
+        else:
+            await client.delete(destkey)
+    except Exception:
+        await client.delete(temp)
+        raise
+    return count
+
+
+async def cluster_bitopcard(
+    client, operation: str, keys: Sequence[KeyT], page_size: int = 65536
+) -> int:
+    op = check_operation(operation, keys)
+    if same_slot(client, keys):
+        return await client.tr_bitopcard(op, keys)
+    count = 0
+    async for _ in iter_bitop(client, op, keys, page_size):
+        count += 1
+    return count
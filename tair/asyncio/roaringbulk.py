@@ -0,0 +1,69 @@
+import asyncio
+import itertools
+from typing import Iterable, List, Optional
+
+from tair.roaringbulk import CommandT, check_bulk_args, iter_batches, plan_setbits
+from tair.typing import KeyT
+
+
+async def bulk_setbits(
+    client,
+    key: KeyT,
+    offsets: Iterable[int],
+    chunk_size: int = 65536,
+    min_run: int = 64,
+    pipeline_size: int = 8,
+    connections: int = 4,
+    replace: bool = False,
+) -> int:
+    check_bulk_args(chunk_size, min_run, pipeline_size)
+    commands = plan_setbits(offsets, chunk_size, min_run)
+    first = next(commands, None)
+    if replace:
+        await client.delete(key)
+    if first is None:
+        return await client.tr_bitcount(key)
+
+    # the batches are handed to connections workers through a queue bounded
+    # by their number. After an error, the workers drain the queue without
+    # sending, so that the producer stops instead of blocking.
+    queue: "asyncio.Queue[Optional[List[CommandT]]]" = asyncio.Queue(
+        maxsize=max(1, connections)
+    )
+    errors: List[Exception] = []
+
+    async def worker() -> None:
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            if errors:
+                continue
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for name, args in batch:
+                        getattr(pipe, name)(key, *args)
+                    await pipe.execute()
+            except Exception as e:
+                errors.append(e)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, connections))]
+    try:
+        for batch in iter_batches(itertools.chain([first], commands), pipeline_size):
+            if errors:
+                break
+            await queue.put(batch)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+    if errors:
+        raise errors[0]
+
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.tr_optimize(key)
+        pipe.tr_bitcount(key)
+        return (await pipe.execute())[1]
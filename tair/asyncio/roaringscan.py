@@ -0,0 +1,40 @@
+from typing import Any, AsyncIterator, Optional
+
+from tair.asyncio.zsetiter import iter_pages
+from tair.roaringscan import (
+    ScanCursorT,
+    check_scan_args,
+    next_adaptive_cursor,
+    scan_page,
+)
+from tair.tairroaring import TrScanResult
+from tair.typing import KeyT
+
+
+async def iter_tr_scan(
+    client,
+    key: KeyT,
+    start_offset: int = 0,
+    count: int = 1024,
+    target_bytes: int = 1 << 20,
+    max_count: int = 1 << 20,
+    prefetch: bool = True,
+    chunks: bool = False,
+) -> AsyncIterator[Any]:
+    check_scan_args(count, target_bytes, max_count, chunks)
+
+    async def fetch(cursor: ScanCursorT) -> TrScanResult:
+        return await client.tr_scan(key, cursor[0], cursor[1])
+
+    def advance(cursor: ScanCursorT, resp: TrScanResult) -> Optional[ScanCursorT]:
+        return next_adaptive_cursor(cursor, resp, target_bytes, max_count)
+
+    first = (start_offset, min(count, max_count))
+    async for resp in iter_pages(fetch, advance, first, prefetch):
+        if not resp.offsets:
+            continue
+        if chunks:
+            yield scan_page(resp)
+        else:
+            for offset in resp.offsets:
+                yield offset
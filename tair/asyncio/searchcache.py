@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, Optional
+
+from tair.exceptions import DataError
+from tair.searchcache import (
+    WRITE_COMMANDS,
+    ResultStore,
+    SearchCacheStats,
+    search_key,
+)
+from tair.searchquery import QueryT, query_text
+from tair.typing import KeyT, ResponseT
+
+
+class SearchCache:
+    def __init__(self, client, ttl: float = 30, max_bytes: int = 64 * 1024 * 1024):
+        self.client = client
+        self.store = ResultStore(ttl, max_bytes)
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        return self.store.stats
+
+    async def tft_search(
+        self, index: KeyT, query: QueryT, use_cache: bool = False
+    ) -> ResponseT:
+        key = search_key((index,), query, use_cache)
+        hit, reply = self.store.get(key)
+        if hit:
+            return reply
+        generations = self.store.generations(key[0])
+        reply = await self.client.tft_search(index, query_text(query), use_cache)
+        self.store.put(key, generations, reply)
+        return reply
+
+    async def tft_msearch(
+        self, index_count: int, index: Iterable[KeyT], query: QueryT
+    ) -> ResponseT:
+        indexes = tuple(index)
+        key = search_key(indexes, query, False)
+        hit, reply = self.store.get(key)
+        if hit:
+            return reply
+        generations = self.store.generations(key[0])
+        reply = await self.client.tft_msearch(index_count, indexes, query_text(query))
+        self.store.put(key, generations, reply)
+        return reply
+
+    def invalidate(self, index: Optional[KeyT] = None) -> None:
+        if index is None:
+            self.store.clear()
+        else:
+            self.store.bump(index)
+
+    async def write(self, command: str, index: KeyT, *args, **kwargs) -> ResponseT:
+        if command not in WRITE_COMMANDS:
+            raise DataError(f"{command} is not a TairSearch write command")
+        try:
+            return await getattr(self.client, command)(index, *args, **kwargs)
+        finally:
+            # the write may have been applied even if its reply was lost.
+            self.store.bump(index)
+
+    async def tft_updateindex(self, index: KeyT, mappings: str) -> ResponseT:
+        return await self.write("tft_updateindex", index, mappings)
+
+    async def tft_adddoc(
+        self, index: KeyT, document: str, doc_id: Optional[str] = None
+    ) -> ResponseT:
+        return await self.write("tft_adddoc", index, document, doc_id)
+
+    async def tft_madddoc(self, index: KeyT, mapping: Dict[str, str]) -> ResponseT:
+        return await self.write("tft_madddoc", index, mapping)
+
+    async def tft_updatedocfield(
+        self, index: KeyT, doc_id: str, document: str
+    ) -> ResponseT:
+        return await self.write("tft_updatedocfield", index, doc_id, document)
+
+    async def tft_deldocfield(
+        self, index: KeyT, doc_id: str, fields: Iterable
+    ) -> ResponseT:
+        return await self.write("tft_deldocfield", index, doc_id, fields)
+
+    async def tft_incrlongdocfield(
+        self, index: KeyT, doc_id: str, field: str, increment: int
+    ) -> ResponseT:
+        return await self.write("tft_incrlongdocfield", index, doc_id, field, increment)
+
+    async def tft_incrfloatdocfield(
+        self, index: KeyT, doc_id: str, field: str, increment: float
+    ) -> ResponseT:
+        return await self.write(
+            "tft_incrfloatdocfield", index, doc_id, field, increment
+        )
+
+    async def tft_deldoc(self, index: KeyT, doc_id: Iterable[str]) -> ResponseT:
+        return await self.write("tft_deldoc", index, doc_id)
+
+    async def tft_delall(self, index: KeyT) -> ResponseT:
+        return await self.write("tft_delall", index)
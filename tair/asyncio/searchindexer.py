@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from tair.asyncio.inflight import iter_in_flight
+from tair.searchindexer import (
+    RETRYABLE_ERRORS,
+    DocBatchT,
+    IndexStats,
+    batch_docs,
+    check_indexer_args,
+    dumps_doc,
+    encode_doc,
+    madddoc_args,
+)
+from tair.typing import KeyT
+
+DocsT = Union[Iterable[Tuple[str, Any]], AsyncIterable[Tuple[str, Any]]]
+
+
+async def abatch_docs(
+    docs: AsyncIterable[Tuple[str, Any]],
+    batch_size: int,
+    batch_bytes: int,
+    dumps: Callable[[Any], Any],
+) -> AsyncIterator[DocBatchT]:
+    batch: DocBatchT = []
+    size = 0
+    async for doc_id, doc in docs:
+        data = encode_doc(doc, dumps)
+        batch.append((doc_id, data))
+        size += len(data)
+        if len(batch) >= batch_size or size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+async def iter_doc_batches(
+    docs: DocsT, batch_size: int, batch_bytes: int, dumps: Callable[[Any], Any]
+) -> AsyncIterator[DocBatchT]:
+    if hasattr(docs, "__aiter__"):
+        async for batch in abatch_docs(docs, batch_size, batch_bytes, dumps):
+            yield batch
+    else:
+        for batch in batch_docs(docs, batch_size, batch_bytes, dumps):
+            yield batch
+
+
+class BulkIndexer:
+    def __init__(
+        self,
+        client,
+        index: KeyT,
+        batch_size: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.1,
+        raise_on_error: bool = True,
+        dumps: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        check_indexer_args(batch_size, batch_bytes, in_flight, retries)
+        self.client = client
+        self.index = index
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.in_flight = in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self.raise_on_error = raise_on_error
+        self.dumps = dumps if dumps is not None else dumps_doc
+        self.stats = IndexStats()
+        self.failed_ids: List[str] = []
+
+    async def send(self, batch: DocBatchT) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                await self.client.execute_command(
+                    "TFT.MADDDOC", *madddoc_args(self.index, batch)
+                )
+                return
+            except RETRYABLE_ERRORS:
+                if attempt == self.retries:
+                    raise
+                self.stats.retries += 1
+                await asyncio.sleep(self.backoff * 2**attempt)
+
+    async def add(self, docs: DocsT) -> IndexStats:
+        batches = iter_doc_batches(docs, self.batch_size, self.batch_bytes, self.dumps)
+        return await self.add_batches(batches)
+
+    # add_batches sends batches already cut by batch_docs, and calls done
+    # after each one has been sent or has failed, in the order of batches.
+    async def add_batches(
+        self,
+        batches: AsyncIterable[DocBatchT],
+        done: Optional[Callable[[], None]] = None,
+    ) -> IndexStats:
+        start = time.perf_counter()
+        elapsed = self.stats.elapsed
+        flights = iter_in_flight(self.send, batches, self.in_flight)
+        try:
+            async for batch, task in flights:
+                try:
+                    await task
+                    self.stats.record(batch, True)
+                except Exception:
+                    self.stats.record(batch, False)
+                    if self.raise_on_error:
+                        raise
+                    self.failed_ids.extend(doc_id for doc_id, _ in batch)
+                finally:
+                    self.stats.elapsed = elapsed + time.perf_counter() - start
+                if done is not None:
+                    done()
+        finally:
+            await flights.aclose()
+        self.stats.elapsed = elapsed + time.perf_counter() - start
+        return self.stats
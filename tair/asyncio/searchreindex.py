@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from tair.asyncio.searchindexer import BulkIndexer
+from tair.asyncio.zsetiter import iter_pages
+from tair.searchindexer import DocBatchT, batch_docs
+from tair.searchreindex import (
+    ReindexStats,
+    TransformT,
+    check_reindex_args,
+    next_scan_cursor,
+    page_docs,
+    throttle_delay,
+)
+from tair.tairsearch import ScandocidResult
+from tair.typing import KeyT
+
+
+class Reindexer:
+    def __init__(
+        self,
+        source,
+        source_index: KeyT,
+        dest_index: KeyT,
+        dest=None,
+        transform: Optional[TransformT] = None,
+        match: Optional[str] = None,
+        scan_count: int = 1000,
+        batch_size: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_docs_per_sec: Optional[float] = None,
+        raise_on_error: bool = True,
+    ) -> None:
+        check_reindex_args(scan_count, max_docs_per_sec)
+        self.source = source
+        self.source_index = source_index
+        self.transform = transform
+        self.match = match
+        self.scan_count = scan_count
+        self.max_docs_per_sec = max_docs_per_sec
+        self.cursor: Optional[str] = "0"
+        self.indexer = BulkIndexer(
+            dest if dest is not None else source,
+            dest_index,
+            batch_size=batch_size,
+            batch_bytes=batch_bytes,
+            in_flight=in_flight,
+            retries=retries,
+            backoff=backoff,
+            raise_on_error=raise_on_error,
+        )
+        self.stats = self.indexer.stats = ReindexStats()
+
+    @property
+    def failed_ids(self) -> List[str]:
+        return self.indexer.failed_ids
+
+    async def scan(self, cursor: str) -> ScandocidResult:
+        return await self.source.tft_scandocid(
+            self.source_index, cursor, match=self.match, count=self.scan_count
+        )
+
+    def iter_scan_pages(self, cursor: str) -> AsyncIterator[ScandocidResult]:
+        return iter_pages(self.scan, next_scan_cursor, cursor, prefetch=True)
+
+    async def get_docs(self, doc_ids: List[str]) -> List[Tuple[str, Any]]:
+        if not doc_ids:
+            return []
+        async with self.source.pipeline(transaction=False) as pipe:
+            for doc_id in doc_ids:
+                pipe.tft_getdoc(self.source_index, doc_id)
+            replies = await pipe.execute()
+        return page_docs(doc_ids, replies, self.transform, self.stats)
+
+    async def run(
+        self,
+        cursor: Optional[str] = "0",
+        checkpoint: Optional[Callable[[Optional[str]], None]] = None,
+    ) -> ReindexStats:
+        self.cursor = cursor
+        if cursor is None:
+            return self.stats
+        indexer = self.indexer
+        start = time.perf_counter()
+        # the cursor reached after each page, with the number of batches
+        # that had been sent by then.
+        marks: "deque[Tuple[int, Optional[str]]]" = deque()
+        submitted = 0
+        finished = 0
+
+        def commit() -> None:
+            while marks and marks[0][0] <= finished:
+                self.cursor = marks.popleft()[1]
+                if checkpoint is not None:
+                    checkpoint(self.cursor)
+
+        async def batches() -> AsyncIterator[DocBatchT]:
+            nonlocal submitted
+            sent = 0
+            async for page in self.iter_scan_pages(cursor):
+                self.stats.scanned += len(page.doc_ids)
+                docs = await self.get_docs(page.doc_ids)
+                for batch in batch_docs(
+                    docs, indexer.batch_size, indexer.batch_bytes, indexer.dumps
+                ):
+                    delay = throttle_delay(start, sent, self.max_docs_per_sec)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    submitted += 1
+                    sent += len(batch)
+                    yield batch
+                marks.append((submitted, next_scan_cursor(cursor, page)))
+                commit()
+
+        def done() -> None:
+            nonlocal finished
+            finished += 1
+            commit()
+
+        await indexer.add_batches(batches(), done)
+        return self.stats
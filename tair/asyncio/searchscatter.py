@@ -0,0 +1,28 @@
+import asyncio
+from typing import Any, List, Sequence
+
+from tair.exceptions import DataError
+from tair.searchquery import QueryT, dumps_query, query_text
+from tair.searchresult import loads_json
+from tair.searchscatter import group_indexes, merge_replies, shard_query
+from tair.typing import KeyT
+
+
+async def search_group(client, group: List[KeyT], query: str) -> Any:
+    if len(group) == 1:
+        return await client.tft_search(group[0], query)
+    return await client.tft_msearch(len(group), group, query)
+
+
+async def scatter_search(client, indexes: Sequence[KeyT], query: QueryT) -> str:
+    if not indexes:
+        raise DataError("at least one index is required")
+    if len(indexes) == 1:
+        return await client.tft_search(indexes[0], query_text(query))
+    parsed = loads_json(query_text(query))
+    shard, offset, size = shard_query(parsed)
+    text = dumps_query(shard)
+    replies = await asyncio.gather(
+        *(search_group(client, group, text) for group in group_indexes(client, indexes))
+    )
+    return merge_replies(parsed, list(replies), offset, size)
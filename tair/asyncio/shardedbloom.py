@@ -0,0 +1,66 @@
+from typing import Iterable, List, Optional
+
+from tair.exceptions import DataError
+from tair.leaderboard import shard_index
+from tair.shardedbloom import default_shards, reassemble, shard_capacity, split_items
+from tair.typing import EncodableT, KeyT
+
+
+class ShardedBloom:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        capacity: int,
+        error_rate: float = 0.01,
+        shards: Optional[int] = None,
+        batch_size: int = 10000,
+    ) -> None:
+        if capacity <= 0:
+            raise DataError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise DataError("error_rate must be between 0 and 1")
+        if shards is None:
+            shards = default_shards(capacity, error_rate)
+        if shards <= 0:
+            raise DataError("shards must be positive")
+        if batch_size <= 0:
+            raise DataError("batch_size must be positive")
+        self.client = client
+        self.name = name
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.shards = shards
+        self.batch_size = batch_size
+        self.shard_capacity = shard_capacity(capacity, shards)
+        self.keys = [f"{name}:{i}" for i in range(shards)]
+
+    def key_of(self, item: EncodableT) -> str:
+        return self.keys[shard_index(item, self.shards)]
+
+    async def add(self, item: EncodableT) -> int:
+        return (await self.madd([item]))[0]
+
+    async def exists(self, item: EncodableT) -> int:
+        return await self.client.bf_exists(self.key_of(item), item)
+
+    # madd uses BF.INSERT with the shard sizing, so that a shard is created
+    # with the right capacity and error rate on its first write.
+    async def madd(self, items: Iterable[EncodableT]) -> List[int]:
+        batches = split_items(items, self.shards, self.batch_size)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i, group, _ in batches:
+                pipe.bf_insert(
+                    self.keys[i],
+                    group,
+                    capacity=self.shard_capacity,
+                    error_rate=self.error_rate,
+                )
+            return reassemble(batches, await pipe.execute())
+
+    async def mexists(self, items: Iterable[EncodableT]) -> List[int]:
+        batches = split_items(items, self.shards, self.batch_size)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for i, group, _ in batches:
+                pipe.bf_mexists(self.keys[i], group)
+            return reassemble(batches, await pipe.execute())
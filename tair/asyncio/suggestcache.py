@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from tair.exceptions import DataError
+from tair.suggestcache import (
+    DEFAULT_MAX_COUNT,
+    GroupKeyT,
+    GroupStore,
+    SuggestionCacheStats,
+    group_of,
+    group_texts,
+    install_groups,
+    rank_weights,
+)
+from tair.typing import KeyT, ResponseT
+
+
+class SuggestionCache:
+    def __init__(
+        self,
+        client,
+        max_entries: int = 100000,
+        refresh_interval: Optional[float] = 60.0,
+    ) -> None:
+        if refresh_interval is not None and refresh_interval <= 0:
+            raise DataError("refresh_interval must be positive")
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.store = GroupStore(max_entries)
+        self.last_error: Optional[Exception] = None
+
+        self._dirty: Set[GroupKeyT] = set()
+        self._missing: Set[GroupKeyT] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "SuggestionCache":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    @property
+    def stats(self) -> SuggestionCacheStats:
+        return self.store.stats
+
+    @property
+    def staleness(self) -> float:
+        oldest = self.store.oldest()
+        return 0.0 if oldest is None else time.monotonic() - oldest
+
+    # the refresher task is bound to the running event loop, so it is
+    # created lazily instead of in __init__.
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def load(self, index: KeyT) -> int:
+        generations = self.store.generations(index)
+        groups = group_texts(await self.client.tft_getallsugs(index))
+        return install_groups(self.store, index, groups, generations)
+
+    async def load_groups(self, keys: List[GroupKeyT]) -> None:
+        if not keys:
+            return
+        generations = [self.store.generation(key) for key in keys]
+        limit = self.store.max_entries + 1
+        async with self.client.pipeline(transaction=False) as pipe:
+            for index, group in keys:
+                pipe.tft_getsug(index, group, max_count=limit)
+            replies = await pipe.execute()
+        for key, generation, texts in zip(keys, generations, replies):
+            suggestions = rank_weights(texts) if len(texts) < limit else None
+            self.store.put(key, generation, suggestions)
+
+    async def tft_getsug(
+        self,
+        index: KeyT,
+        prefix: str,
+        max_count: Optional[int] = None,
+        fuzzy: bool = False,
+    ) -> ResponseT:
+        self.start()
+        key = (index, group_of(prefix))
+        group = self.store.get(key)
+        if group is None:
+            if prefix and not self.store.is_oversized(key):
+                self._missing.add(key)
+                self._wakeup.set()
+            self.stats.misses += 1
+            return await self.client.tft_getsug(index, prefix, max_count, fuzzy)
+        self.stats.hits += 1
+        count = DEFAULT_MAX_COUNT if max_count is None else max_count
+        if fuzzy:
+            return group.trie.fuzzy(prefix, count)
+        return group.trie.complete(prefix, count)
+
+    async def tft_addsug(self, index: KeyT, mapping: Dict[str, int]) -> ResponseT:
+        try:
+            return await self.client.tft_addsug(index, mapping)
+        finally:
+            self.invalidate(index, mapping)
+
+    async def tft_delsug(self, index: KeyT, text: Iterable[str]) -> ResponseT:
+        texts = list(text)
+        try:
+            return await self.client.tft_delsug(index, texts)
+        finally:
+            self.invalidate(index, texts)
+
+    def invalidate(self, index: KeyT, texts: Iterable[str]) -> None:
+        keys = {(index, group_of(text)) for text in texts}
+        self._dirty.update(key for key in keys if self.store.invalidate(key))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def refresh(self, full: bool = False) -> None:
+        keys = set(self._dirty)
+        keys.update(key for key in self._missing if key not in self.store)
+        self._dirty.clear()
+        self._missing.clear()
+        keys = {key for key in keys if not self.store.is_oversized(key)}
+        if full:
+            keys.update(self.store.keys())
+        await self.load_groups(sorted(keys, key=str))
+        self.stats.refreshes += 1
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+        self.store.clear()
+
+    async def _run(self) -> None:
+        interval = self.refresh_interval
+        deadline = None if interval is None else time.monotonic() + interval
+        while not self._closed:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._closed:
+                return
+            full = deadline is not None and time.monotonic() >= deadline
+            if full:
+                deadline = time.monotonic() + interval
+            try:
+                await self.refresh(full)
+            except Exception as e:
+                self.stats.errors += 1
+                self.last_error = e
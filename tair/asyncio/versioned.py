@@ -0,0 +1,115 @@
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from tair.exceptions import ResponseError, WatchError
+from tair.typing import EncodableT, FieldT, KeyT
+from tair.versioned import (
+    ContentionStats,
+    TargetT,
+    backoff_delay,
+    is_version_conflict,
+    read_versioned,
+    split_target,
+    write_succeeded,
+    write_versioned,
+)
+
+
+async def versioned_update(
+    client,
+    key: KeyT,
+    fn: Callable[[Any], EncodableT],
+    field: Optional[FieldT] = None,
+    retries: int = 16,
+    backoff: float = 0.005,
+    max_backoff: float = 0.5,
+    stats: Optional[ContentionStats] = None,
+) -> EncodableT:
+    target = key if field is None else (key, field)
+    conflicts = 0
+    for attempt in range(retries + 1):
+        current = await read_versioned(client, key, field)
+        value = fn(None if current is None else current.value)
+        version = None if current is None else current.version
+
+        try:
+            resp = await write_versioned(client, key, field, value, version)
+            succeeded = write_succeeded(field, resp)
+        except ResponseError as e:
+            if not is_version_conflict(e):
+                raise
+            succeeded = False
+
+        if succeeded:
+            if stats is not None:
+                stats.record(target, attempt + 1, conflicts, False)
+            return value
+
+        conflicts += 1
+        if attempt < retries:
+            await asyncio.sleep(backoff_delay(backoff, attempt, max_backoff))
+
+    if stats is not None:
+        stats.record(target, retries + 1, conflicts, True)
+    raise WatchError(f"version conflict on {target!r} after {retries} retries")
+
+
+async def versioned_update_many(
+    client,
+    targets: Iterable[TargetT],
+    fn: Callable[[Any], EncodableT],
+    retries: int = 16,
+    backoff: float = 0.005,
+    max_backoff: float = 0.5,
+    stats: Optional[ContentionStats] = None,
+) -> Dict[TargetT, EncodableT]:
+    pending: List[TargetT] = list(dict.fromkeys(targets))
+    attempts: Dict[TargetT, int] = {t: 0 for t in pending}
+    conflicts: Dict[TargetT, int] = {t: 0 for t in pending}
+    results: Dict[TargetT, EncodableT] = {}
+    if not pending:
+        return results
+
+    for attempt in range(retries + 1):
+        async with client.pipeline(transaction=False) as pipe:
+            for target in pending:
+                read_versioned(pipe, *split_target(target))
+            currents = await pipe.execute()
+
+        values = []
+        async with client.pipeline(transaction=False) as pipe:
+            for target, current in zip(pending, currents):
+                key, field = split_target(target)
+                value = fn(None if current is None else current.value)
+                version = None if current is None else current.version
+                values.append(value)
+                write_versioned(pipe, key, field, value, version)
+            responses = await pipe.execute(raise_on_error=False)
+
+        retry: List[TargetT] = []
+        for target, value, resp in zip(pending, values, responses):
+            attempts[target] += 1
+            if isinstance(resp, Exception):
+                if not is_version_conflict(resp):
+                    raise resp
+            elif write_succeeded(split_target(target)[1], resp):
+                results[target] = value
+                if stats is not None:
+                    stats.record(target, attempts[target], conflicts[target], False)
+                continue
+            conflicts[target] += 1
+            retry.append(target)
+
+        pending = retry
+        if not pending:
+            return results
+        if attempt < retries:
+            await asyncio.sleep(backoff_delay(backoff, attempt, max_backoff))
+
+    if stats is not None:
+        for target in pending:
+            stats.record(target, attempts[target], conflicts[target], True)
+    raise WatchError(
+        f"version conflict on {len(pending)} targets after {retries} retries: "
+        + f"{pending!r}"
+    )
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from tair.exceptions import DataError
+from tair.tairzset import ScoreT, encode_score
+from tair.typing import EncodableT, KeyT
+from tair.zsetiter import (
+    ZsetEntryT,
+    check_page_size,
+    index_page_end,
+    next_index_cursor,
+    next_lex_cursor,
+    next_score_cursor,
+    to_entries,
+)
+
+
+# iter_pages yields the pages returned by fetch, and with prefetch requests
+# the next page while the current one is consumed.
+async def iter_pages(
+    fetch: Callable[[Any], Awaitable[List[Any]]],
+    advance: Callable[[Any, List[Any]], Any],
+    cursor: Any,
+    prefetch: bool = False,
+) -> AsyncIterator[List[Any]]:
+    if not prefetch:
+        while cursor is not None:
+            page = await fetch(cursor)
+            cursor = advance(cursor, page)
+            yield page
+        return
+
+    task = asyncio.ensure_future(fetch(cursor))
+    try:
+        while task is not None:
+            page = await task
+            cursor = advance(cursor, page)
+            task = asyncio.ensure_future(fetch(cursor)) if cursor is not None else None
+            yield page
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+async def iter_exzrange(
+    client,
+    key: KeyT,
+    start: int = 0,
+    stop: int = -1,
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> AsyncIterator[ZsetEntryT]:
+    check_page_size(page_size)
+    if start < 0 or stop < -1:
+        raise DataError("start must not be negative and stop must be -1 or more")
+    if stop >= 0 and start > stop:
+        return
+    command = client.exzrevrange if reverse else client.exzrange
+
+    async def fetch(cursor: int) -> List[ZsetEntryT]:
+        end = index_page_end(cursor, page_size, stop)
+        return to_entries(await command(key, cursor, end, withscores=True))
+
+    def advance(cursor: int, page: List[ZsetEntryT]) -> Optional[int]:
+        return next_index_cursor(cursor, page, page_size, stop)
+
+    async for page in iter_pages(fetch, advance, start, prefetch):
+        for entry in page:
+            yield entry
+
+
+async def iter_exzrangebyscore(
+    client,
+    key: KeyT,
+    minval: ScoreT = "-inf",
+    maxval: ScoreT = "+inf",
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> AsyncIterator[ZsetEntryT]:
+    check_page_size(page_size)
+
+    async def fetch(cursor) -> List[ZsetEntryT]:
+        bound, offset, _ = cursor
+        if reverse:
+            items = await client.exzrevrangebyscore(
+                key, bound, minval, True, offset=offset, count=page_size
+            )
+        else:
+            items = await client.exzrangebyscore(
+                key, bound, maxval, True, offset=offset, count=page_size
+            )
+        return to_entries(items)
+
+    def advance(cursor, page: List[ZsetEntryT]):
+        return next_score_cursor(cursor, page, page_size)
+
+    first = encode_score(maxval if reverse else minval)
+    async for page in iter_pages(fetch, advance, (first, 0, None), prefetch):
+        for entry in page:
+            yield entry
+
+
+# a lex range carries no scores, so iter_exzrangebylex yields members only.
+async def iter_exzrangebylex(
+    client,
+    key: KeyT,
+    minval: EncodableT = "-",
+    maxval: EncodableT = "+",
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> AsyncIterator[bytes]:
+    check_page_size(page_size)
+
+    async def fetch(bound: EncodableT) -> List[bytes]:
+        if reverse:
+            return await client.exzrevrangebylex(key, bound, minval, 0, page_size)
+        return await client.exzrangebylex(key, bound, maxval, 0, page_size)
+
+    def advance(bound: EncodableT, page: List[bytes]):
+        return next_lex_cursor(bound, page, page_size)
+
+    first = maxval if reverse else minval
+    async for page in iter_pages(fetch, advance, first, prefetch):
+        for entry in page:
+            yield entry
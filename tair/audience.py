@@ -0,0 +1,328 @@
+import hashlib
+import math
+from typing import Dict, List, Optional, Tuple, Union
+
+from redis.utils import str_if_bytes
+
+from tair.exceptions import DataError
+from tair.roaringbitop import cluster_bitop, cluster_bitopcard, same_slot, slot_tag
+from tair.stats import Stats
+from tair.typing import KeyT
+
+
+class And:
+    def __init__(self, *children: "ExprT") -> None:
+        self.children = list(children)
+
+    def __repr__(self) -> str:
+        return canonical(self)
+
+
+class Or:
+    def __init__(self, *children: "ExprT") -> None:
+        self.children = list(children)
+
+    def __repr__(self) -> str:
+        return canonical(self)
+
+
+class Not:
+    def __init__(self, child: "ExprT") -> None:
+        self.child = child
+
+    def __repr__(self) -> str:
+        return canonical(self)
+
+
+ExprT = Union[KeyT, And, Or, Not]
+
+
+def is_leaf(expr: ExprT) -> bool:
+    return not isinstance(expr, (And, Or, Not))
+
+
+# normalize flattens nested ANDs and ORs, drops duplicate operands and
+# double negations, and unwraps operations with a single operand.
+def normalize(expr: ExprT) -> ExprT:
+    if is_leaf(expr):
+        return expr
+    if isinstance(expr, Not):
+        child = normalize(expr.child)
+        return child.child if isinstance(child, Not) else Not(child)
+
+    children: Dict[str, ExprT] = {}
+    for child in expr.children:
+        child = normalize(child)
+        nested = child.children if type(child) is type(expr) else [child]
+        for c in nested:
+            children.setdefault(canonical(c), c)
+    if not children:
+        raise DataError(f"{type(expr).__name__.upper()} needs at least one operand")
+    if len(children) == 1:
+        return next(iter(children.values()))
+    return type(expr)(*children.values())
+
+
+# canonical is the same for equivalent expressions, whatever the order of
+# the operands of ANDs and ORs.
+def canonical(expr: ExprT) -> str:
+    if is_leaf(expr):
+        return repr(str_if_bytes(expr))
+    if isinstance(expr, Not):
+        return f"NOT({canonical(expr.child)})"
+    name = "AND" if isinstance(expr, And) else "OR"
+    return f"{name}({','.join(sorted(canonical(c) for c in expr.children))})"
+
+
+def subexpressions(expr: ExprT, leaves: Dict[str, KeyT], nodes: Dict[str, ExprT]):
+    if is_leaf(expr):
+        leaves[canonical(expr)] = expr
+        return
+    nodes[canonical(expr)] = expr
+    for child in [expr.child] if isinstance(expr, Not) else expr.children:
+        subexpressions(child, leaves, nodes)
+
+
+def leaves_of(expr: ExprT) -> List[KeyT]:
+    if is_leaf(expr):
+        return [expr]
+    children = [expr.child] if isinstance(expr, Not) else expr.children
+    return [leaf for child in children for leaf in leaves_of(child)]
+
+
+# cache_key is the key caching the result of expr. When all the keys of expr
+# share a slot, it carries their hash tag, so that the result is computed
+# with a single TR.BITOP on TairCluster. prefix should have no hash tag.
+def cache_key(prefix: str, expr: ExprT) -> KeyT:
+    digest = hashlib.sha1(canonical(expr).encode()).hexdigest()
+    tags = {slot_tag(key) for key in leaves_of(expr)}
+    tag = tags.pop() if len(tags) == 1 else None
+    if tag is None:
+        return f"{prefix}{digest}"
+    return prefix.encode() + b"{" + tag + b"}:" + digest.encode()
+
+
+# BITOP_EXPIRE runs TR.BITOP into KEYS[1] and sets its TTL at once, where
+# a cluster pipeline cannot be a transaction.
+BITOP_EXPIRE = """
+local card = redis.call('TR.BITOP', KEYS[1], ARGV[1], unpack(KEYS, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return card
+"""
+
+
+def split_and(expr: And) -> Tuple[List[ExprT], List[ExprT]]:
+    positives = [c for c in expr.children if not isinstance(c, Not)]
+    negatives = [c.child for c in expr.children if isinstance(c, Not)]
+    if not positives:
+        raise DataError("AND needs at least one operand that is not negated")
+    return positives, negatives
+
+
+class AudienceStats(Stats):
+    FIELDS = ("queries", "bitops", "cache_hits", "temp_keys")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.bitops = 0
+        self.cache_hits = 0
+        self.temp_keys = 0
+
+
+# Plan holds the cardinalities known for one query: those of the tags, read
+# with one pipelined TR.BITCOUNT round along with the cached results of the
+# subexpressions, and those of the results computed so far.
+class Plan:
+    def __init__(self) -> None:
+        self.keys: Dict[str, Optional[KeyT]] = {}
+        self.cards: Dict[str, int] = {}
+
+    def known(self, expr: ExprT) -> bool:
+        return canonical(expr) in self.cards
+
+    def record(self, expr: ExprT, key: Optional[KeyT], card: int) -> None:
+        self.keys[canonical(expr)] = key if card else None
+        self.cards[canonical(expr)] = card
+
+    # estimate is the exact cardinality when known, and otherwise an upper
+    # bound, which is what ordering the operands of an AND needs.
+    def estimate(self, expr: ExprT) -> float:
+        c = canonical(expr)
+        if c in self.cards:
+            return self.cards[c]
+        if isinstance(expr, Or):
+            return sum(self.estimate(child) for child in expr.children)
+        if isinstance(expr, And):
+            return min(self.estimate(child) for child in split_and(expr)[0])
+        return math.inf
+
+
+# AudienceEngine evaluates AND/OR/NOT expressions over TairRoaring keys.
+#
+# Intersections run from the smallest operand up and stop at the first empty
+# one, negated operands of an AND become a single DIFF, and a count only
+# materializes the subexpressions below the root, which is counted with
+# TR.BITOPCARD. Every intermediate result is stored in "<prefix><digest>",
+# or "<prefix>{<tag>}:<digest>" when its keys share the hash tag <tag>, with
+# a TTL, and is reused by later queries while it lives. On TairCluster, the
+# keys of an expression should share a hash tag: operands in different
+# slots go through the much slower cross-slot emulation of cluster_bitop.
+class AudienceEngine:
+    def __init__(
+        self, client, prefix: str = "audience:", ttl: int = 300, min_ttl: int = 1
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.min_ttl = min_ttl
+        self.stats = AudienceStats()
+
+    def key_of(self, expr: ExprT) -> KeyT:
+        return cache_key(self.prefix, expr)
+
+    def count(self, expr: ExprT) -> int:
+        expr = normalize(expr)
+        plan = self.prepare(expr)
+        return self._count(expr, plan)
+
+    # select returns the key holding the result, or None if it is empty.
+    def select(self, expr: ExprT) -> Optional[KeyT]:
+        expr = normalize(expr)
+        plan = self.prepare(expr)
+        return self._materialize(expr, plan)
+
+    def prepare(self, expr: ExprT) -> Plan:
+        self.stats.queries += 1
+        leaves: Dict[str, KeyT] = {}
+        nodes: Dict[str, ExprT] = {}
+        subexpressions(expr, leaves, nodes)
+
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in leaves.values():
+                pipe.tr_bitcount(key)
+            for node in nodes.values():
+                pipe.pttl(self.key_of(node))
+                pipe.tr_bitcount(self.key_of(node))
+            replies = pipe.execute()
+
+        plan = Plan()
+        for key, card in zip(leaves.values(), replies):
+            plan.record(key, key, card)
+        replies = replies[len(leaves) :]
+        for i, node in enumerate(nodes.values()):
+            pttl, card = replies[2 * i], replies[2 * i + 1]
+            if pttl >= self.min_ttl * 1000:
+                self.stats.cache_hits += 1
+                plan.record(node, self.key_of(node), card)
+        return plan
+
+    def _count(self, expr: ExprT, plan: Plan) -> int:
+        if plan.known(expr):
+            return plan.cards[canonical(expr)]
+        if isinstance(expr, Or):
+            keys = self._materialize_all(expr.children, plan)
+            return self._bitopcard("OR", keys) if keys else 0
+        if isinstance(expr, And):
+            operands = self._and_operands(expr, plan)
+            if operands is None:
+                return 0
+            positives, negative = operands
+            if negative is None:
+                return self._bitopcard("AND", positives)
+            key = self._intersection(expr, positives, plan)
+            return self._bitopcard("DIFF", [key, negative]) if key is not None else 0
+        key = self._materialize(expr.child, plan)
+        return self._bitopcard("NOT", [key]) if key is not None else 0
+
+    def _materialize(self, expr: ExprT, plan: Plan) -> Optional[KeyT]:
+        c = canonical(expr)
+        if c in plan.keys:
+            return plan.keys[c]
+
+        dest = self.key_of(expr)
+        card = 0
+        if isinstance(expr, Or):
+            children = [
+                child for child in expr.children if self._materialize(child, plan)
+            ]
+            if len(children) == 1:
+                dest = plan.keys[canonical(children[0])]
+                card = plan.cards[canonical(children[0])]
+            elif children:
+                keys = [plan.keys[canonical(child)] for child in children]
+                card = self._bitop(dest, "OR", keys)
+        elif isinstance(expr, And):
+            operands = self._and_operands(expr, plan)
+            if operands is not None:
+                positives, negative = operands
+                if negative is None:
+                    card = self._bitop(dest, "AND", positives)
+                else:
+                    key = self._intersection(expr, positives, plan)
+                    if key is not None:
+                        card = self._bitop(dest, "DIFF", [key, negative])
+        else:
+            key = self._materialize(expr.child, plan)
+            if key is not None:
+                card = self._bitop(dest, "NOT", [key])
+        plan.record(expr, dest, card)
+        return dest if card else None
+
+    def _materialize_all(self, exprs: List[ExprT], plan: Plan) -> List[KeyT]:
+        keys = [self._materialize(expr, plan) for expr in exprs]
+        return [key for key in keys if key is not None]
+
+    # _and_operands returns the keys of the positive operands of an AND,
+    # smallest first, and a key holding the union of the negated ones, or
+    # None if the AND is known to be empty.
+    def _and_operands(
+        self, expr: And, plan: Plan
+    ) -> Optional[Tuple[List[KeyT], Optional[KeyT]]]:
+        positives, negatives = split_and(expr)
+        positives = sorted(positives, key=plan.estimate)
+        if plan.estimate(positives[0]) == 0:
+            return None
+
+        keys = []
+        for child in positives:
+            key = self._materialize(child, plan)
+            if key is None:
+                return None
+            keys.append(key)
+
+        negative = None
+        if negatives:
+            negative = self._materialize(normalize(Or(*negatives)), plan)
+        return keys, negative
+
+    # _intersection returns the key holding the intersection of the positive
+    # operands of expr, which are already materialized.
+    def _intersection(
+        self, expr: And, positives: List[KeyT], plan: Plan
+    ) -> Optional[KeyT]:
+        if len(positives) == 1:
+            return positives[0]
+        return self._materialize(normalize(And(*split_and(expr)[0])), plan)
+
+    # _bitop stores the result in dest along with its TTL, in one MULTI, or
+    # one script on a cluster. The cross-slot emulation writes dest over
+    # many commands, and only sets the TTL after them.
+    def _bitop(self, dest: KeyT, operation: str, keys: List[KeyT]) -> int:
+        self.stats.bitops += 1
+        self.stats.temp_keys += 1
+        if not same_slot(self.client, [dest, *keys]):
+            card = cluster_bitop(self.client, dest, operation, keys)
+            self.client.expire(dest, self.ttl)
+            return card
+        if hasattr(self.client, "keyslot"):
+            return self.client.eval(
+                BITOP_EXPIRE, len(keys) + 1, dest, *keys, operation, self.ttl
+            )
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.tr_bitop(dest, operation, keys)
+            pipe.expire(dest, self.ttl)
+            return pipe.execute()[0]
+
+    def _bitopcard(self, operation: str, keys: List[KeyT]) -> int:
+        self.stats.bitops += 1
+        return cluster_bitopcard(self.client, operation, keys)
@@ -0,0 +1,184 @@
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from tair.stats import Stats
+from tair.typing import KeyT
+
+
+def stale_key(key: KeyT) -> str:
+    return f"{key}:stale"
+
+
+def lease_key(key: KeyT) -> str:
+    return f"{key}:lease"
+
+
+# should_refresh_early implements probabilistic early expiration (XFetch):
+# the closer the key is to expiring and the longer it takes to recompute, the
+# more likely a reader refreshes it ahead of time, so that the recomputations
+# of concurrent readers are spread out instead of happening all at once.
+def should_refresh_early(delta: float, beta: float, pttl: int) -> bool:
+    if pttl < 0 or delta <= 0:
+        return False
+    return -delta * beta * math.log(1.0 - random.random()) >= pttl / 1000
+
+
+class CacheStats(Stats):
+    FIELDS = ("hits", "misses", "stale_hits", "loads", "early_refreshes")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.loads = 0
+        self.early_refreshes = 0
+
+
+class Flight:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+# CacheAside caches the result of a loader in a TairString key, encoded with
+# dumps and decoded with loads, JSON by default.
+#
+# Concurrent misses on the same key in one process share a single load.
+# Across processes, only the holder of a short SET NX lease, released with
+# CAD, recomputes the value, while the others serve the copy in
+# "<key>:stale", which outlives the value by stale_ttl. invalidate deletes
+# both, so a stale copy is only ever served in place of an expired value.
+# With early_refresh, hits occasionally recompute a key shortly before it
+# expires.
+class CacheAside:
+    def __init__(
+        self,
+        client,
+        ttl: float = 60,
+        stale_ttl: float = 300,
+        lease: float = 5,
+        early_refresh: bool = False,
+        beta: float = 1.0,
+        poll_interval: float = 0.05,
+        dumps: Optional[Callable[[Any], Any]] = None,
+        loads: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lease = lease
+        self.early_refresh = early_refresh
+        self.beta = beta
+        self.poll_interval = poll_interval
+        self.dumps = dumps if dumps is not None else json.dumps
+        self.loads = loads if loads is not None else json.loads
+        self.stats = CacheStats()
+
+        self._flights: Dict[KeyT, Flight] = {}
+        self._deltas: Dict[KeyT, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: KeyT, loader: Callable[[], Any]) -> Any:
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.exget(key)
+            pipe.pttl(key)
+            current, pttl = pipe.execute()
+
+        if current is None:
+            with self._lock:
+                self.stats.misses += 1
+            return self._single_flight(key, lambda: self._load(key, loader))
+
+        with self._lock:
+            self.stats.hits += 1
+        if self.early_refresh and should_refresh_early(
+            self._deltas.get(key, 0), self.beta, pttl
+        ):
+            token = str(uuid.uuid4())
+            if self._acquire_lease(key, token):
+                with self._lock:
+                    self.stats.early_refreshes += 1
+                try:
+                    return self._recompute(key, loader)
+                finally:
+                    self.client.cad(lease_key(key), token)
+        return self.loads(current.value)
+
+    def invalidate(self, key: KeyT) -> None:
+        self.client.delete(key, stale_key(key))
+
+    def _single_flight(self, key: KeyT, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    def _acquire_lease(self, key: KeyT, token: str) -> bool:
+        return bool(
+            self.client.set(lease_key(key), token, px=int(self.lease * 1000), nx=True)
+        )
+
+    def _load(self, key: KeyT, loader: Callable[[], Any]) -> Any:
+        token = str(uuid.uuid4())
+        if self._acquire_lease(key, token):
+            try:
+                return self._recompute(key, loader)
+            finally:
+                self.client.cad(lease_key(key), token)
+
+        stale = self.client.exget(stale_key(key))
+        if stale is not None:
+            with self._lock:
+                self.stats.stale_hits += 1
+            return self.loads(stale.value)
+
+        # nothing to serve yet, wait for the lease holder to fill the key.
+        deadline = time.monotonic() + self.lease
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            current = self.client.exget(key)
+            if current is not None:
+                return self.loads(current.value)
+        return self._recompute(key, loader)
+
+    def _recompute(self, key: KeyT, loader: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        value = loader()
+        delta = time.perf_counter() - start
+        with self._lock:
+            self.stats.loads += 1
+            if self.early_refresh:
+                if len(self._deltas) >= 10000:
+                    self._deltas.clear()
+                self._deltas[key] = delta
+
+        data = self.dumps(value)
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.exset(key, data, px=int(self.ttl * 1000))
+            pipe.exset(stale_key(key), data, px=int((self.ttl + self.stale_ttl) * 1000))
+            pipe.execute()
+        return value
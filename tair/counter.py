@@ -0,0 +1,166 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from tair.exceptions import BufferFullError, DataError, TairError
+from tair.typing import FieldT, KeyT, ResponseT
+
+CounterT = Tuple[KeyT, Optional[FieldT]]
+
+
+def queue_increments(pipe, batch: Dict[CounterT, int]) -> None:
+    for (key, field), amount in batch.items():
+        if field is None:
+            pipe.exincrby(key, amount)
+        else:
+            pipe.exhincrby(key, field, amount)
+
+
+def merge_increments(into: Dict[CounterT, int], batch: Dict[CounterT, int]) -> None:
+    for counter, amount in batch.items():
+        into[counter] = into.get(counter, 0) + amount
+
+
+# CounterBuffer sums the increments of every counter in memory and applies
+# them with pipelined EXINCRBY/EXHINCRBY, when flush_size counters are
+# pending or every flush_interval seconds.
+#
+# Delivery is at least once: when the connection fails during a flush, part
+# of the pipeline may already have been applied, but the replies that would
+# tell which are lost, so the whole batch goes back into the buffer and is
+# sent again, counting the applied increments twice.
+#
+# At most max_size counters are buffered, including the batch being flushed.
+# A new counter that does not fit makes incr flush first; when that flush
+# fails, incr raises BufferFullError without recording the increment, so the
+# caller may retry it.
+class CounterBuffer:
+    def __init__(
+        self,
+        client,
+        flush_size: int = 1000,
+        max_size: int = 100000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if flush_size > max_size:
+            raise DataError("flush_size must not be greater than max_size")
+        self.client = client
+        self.flush_size = flush_size
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+
+        self.increments = 0
+        self.flushes = 0
+        self.commands = 0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+
+        self._pending: Dict[CounterT, int] = {}
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "CounterBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # bounded counters are sent to the server immediately, since their
+    # MIN/MAX checks only hold if every increment is applied individually.
+    def incr(
+        self,
+        key: KeyT,
+        amount: int = 1,
+        field: Optional[FieldT] = None,
+        minval: Optional[int] = None,
+        maxval: Optional[int] = None,
+    ) -> ResponseT:
+        if minval is not None or maxval is not None:
+            if field is None:
+                return self.client.exincrby(key, amount, minval=minval, maxval=maxval)
+            return self.client.exhincrby(
+                key, field, amount, minval=minval, maxval=maxval
+            )
+
+        counter = (key, field)
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise TairError("CounterBuffer is closed")
+                if counter in self._pending or self._size() < self.max_size:
+                    self.increments += 1
+                    self._pending[counter] = self._pending.get(counter, 0) + amount
+                    size = len(self._pending)
+                    break
+            # the flusher cannot keep up, apply backpressure to the caller.
+            try:
+                self.flush()
+            except Exception as e:
+                raise BufferFullError("CounterBuffer is full") from e
+
+        if size >= self.flush_size:
+            self._wakeup.set()
+        return None
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch = {c: n for c, n in self._pending.items() if n != 0}
+                self._pending = {}
+                self._inflight = len(batch)
+            if not batch:
+                return 0
+
+            try:
+                with self.client.pipeline(transaction=False) as pipe:
+                    queue_increments(pipe, batch)
+                    responses = pipe.execute(raise_on_error=False)
+            except Exception:
+                # which commands were applied is unknown, so the whole batch
+                # is retried: delivery is at least once.
+                with self._lock:
+                    merge_increments(self._pending, batch)
+                    self._inflight = 0
+                raise
+
+            with self._lock:
+                self._inflight = 0
+                self.flushes += 1
+                self.commands += len(batch)
+                for resp in responses:
+                    if isinstance(resp, Exception):
+                        self.errors += 1
+                        self.last_error = resp
+            return len(batch)
+
+    def _size(self) -> int:
+        return len(self._pending) + self._inflight
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = e
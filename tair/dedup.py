@@ -0,0 +1,106 @@
+import time
+from typing import Iterable, Iterator, List, Optional, Union
+
+from tair.exceptions import DataError
+from tair.inflight import iter_in_flight
+from tair.shardedbloom import ShardedBloom
+from tair.stats import Stats
+from tair.typing import EncodableT, KeyT
+
+
+def item_size(item: EncodableT) -> int:
+    if isinstance(item, (bytes, str)):
+        return len(item)
+    return len(str(item))
+
+
+# batch_items cuts the items into batches of at most batch_size items or
+# batch_bytes bytes, whichever comes first.
+def batch_items(
+    items: Iterable[EncodableT], batch_size: int, batch_bytes: int
+) -> Iterator[List[EncodableT]]:
+    batch: List[EncodableT] = []
+    size = 0
+    for item in items:
+        batch.append(item)
+        size += item_size(item)
+        if len(batch) >= batch_size or size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+class DedupStats(Stats):
+    FIELDS = ("items", "unseen", "batches", "elapsed:.3f", "throughput:.0f")
+
+    def __init__(self) -> None:
+        self.items = 0
+        self.unseen = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+    def record(self, batch: List[EncodableT], unseen: int) -> None:
+        self.items += len(batch)
+        self.unseen += unseen
+        self.batches += 1
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def check_dedup_args(batch_size: int, batch_bytes: int, in_flight: int) -> None:
+    if batch_size <= 0:
+        raise DataError("batch_size must be positive")
+    if batch_bytes <= 0:
+        raise DataError("batch_bytes must be positive")
+    if in_flight <= 0:
+        raise DataError("in_flight must be positive")
+
+
+# BloomDedup filters a stream down to the items it has never seen. The
+# stream is cut into batches, each of which is checked and added at once
+# with BF.INSERT, whose reply tells for every item whether it was newly
+# added. Up to in_flight batches are sent concurrently, and the unseen items
+# are yielded in input order. The target is either a BF key, created with
+# capacity and error_rate if given, or a ShardedBloom.
+class BloomDedup:
+    def __init__(
+        self,
+        client,
+        target: Union[KeyT, ShardedBloom],
+        batch_size: int = 5000,
+        batch_bytes: int = 1024 * 1024,
+        in_flight: int = 4,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+    ) -> None:
+        check_dedup_args(batch_size, batch_bytes, in_flight)
+        self.client = client
+        self.target = target
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.in_flight = in_flight
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.stats = DedupStats()
+
+    def insert(self, batch: List[EncodableT]) -> List[int]:
+        if isinstance(self.target, ShardedBloom):
+            return self.target.madd(batch)
+        return self.client.bf_insert(
+            self.target, batch, capacity=self.capacity, error_rate=self.error_rate
+        )
+
+    def dedup(self, items: Iterable[EncodableT]) -> Iterator[EncodableT]:
+        start = time.perf_counter()
+        elapsed = self.stats.elapsed
+        batches = batch_items(items, self.batch_size, self.batch_bytes)
+        for batch, future in iter_in_flight(self.insert, batches, self.in_flight):
+            flags = future.result()
+            unseen = [item for item, flag in zip(batch, flags) if flag]
+            self.stats.record(batch, len(unseen))
+            self.stats.elapsed = elapsed + time.perf_counter() - start
+            yield from unseen
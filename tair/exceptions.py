@@ -6,6 +6,8 @@ from redis.exceptions import (
     ConnectionError,
     DataError,
     InvalidResponse,
+    LockError,
+    LockNotOwnedError,
     PubSubError,
     ReadOnlyError,
     RedisError,
@@ -15,3 +17,9 @@ from redis.exceptions import (
 )
 
 TairError = RedisError
+
+
+# BufferFullError is raised when an increment is refused because a client-side
+# buffer is full and could not be flushed. The increment was not recorded.
+class BufferFullError(TairError):
+    pass
@@ -0,0 +1,101 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Union
+
+from tair.exceptions import DataError
+from tair.typing import KeyT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MatchesT = Union[List[List[Any]], Dict[int, List[Any]]]
+
+
+def interleave(lons: Any, lats: Any) -> List[float]:
+    if np is not None:
+        coords = np.column_stack((np.asarray(lons, float), np.asarray(lats, float)))
+        if not np.isfinite(coords).all():
+            raise DataError("coordinates must be finite")
+        return coords.ravel().tolist()
+    coords = [float(c) for pair in zip(lons, lats) for c in pair]
+    if not all(map(math.isfinite, coords)):
+        raise DataError("coordinates must be finite")
+    return coords
+
+
+# point_wkts formats the points as WKT with a single % over the whole batch,
+# which costs about a third of formatting them one by one. precision is the
+# number of decimals kept, 6 being about 0.1m.
+def point_wkts(lons: Any, lats: Any, precision: int = 6) -> List[str]:
+    if len(lons) != len(lats):
+        raise DataError("lons and lats must have the same length")
+    if not len(lons):
+        return []
+    coords = interleave(lons, lats)
+    template = "\n".join([f"POINT(%.{precision}f %.{precision}f)"] * len(lons))
+    return (template % tuple(coords)).split("\n")
+
+
+def check_geofence_args(chunk_size: int, workers: int) -> None:
+    if chunk_size <= 0:
+        raise DataError("chunk_size must be positive")
+    if workers <= 0:
+        raise DataError("workers must be positive")
+
+
+# the names of the polygons in a GIS.CONTAINS ... WITHOUTWKT reply.
+def contained_in(reply: Any) -> List[Any]:
+    return list(reply[1]) if reply else []
+
+
+def collect_matches(chunks: List[List[Any]], sparse: bool) -> MatchesT:
+    if not sparse:
+        return [contained_in(reply) for replies in chunks for reply in replies]
+    matches = {}
+    i = 0
+    for replies in chunks:
+        for reply in replies:
+            names = contained_in(reply)
+            if names:
+                matches[i] = names
+            i += 1
+    return matches
+
+
+def contains_chunk(client, area: KeyT, wkts: Sequence[str]) -> List[Any]:
+    with client.pipeline(transaction=False) as pipe:
+        for wkt in wkts:
+            pipe.gis_contains(area, wkt, withoutwkts=True)
+        return pipe.execute()
+
+
+# contains_points tells which polygons of area contain each point given by
+# lons and lats, NumPy arrays or sequences. The points are sent as
+# GIS.CONTAINS ... WITHOUTWKT, in pipelines of chunk_size commands with up
+# to workers of them in flight, each on a connection of its own. It returns
+# the names of the polygons for every point, in the order of the points, or
+# with sparse=True a mapping from the index of a point to its names that
+# leaves out the points no polygon contains.
+def contains_points(
+    client,
+    area: KeyT,
+    lons: Any,
+    lats: Any,
+    chunk_size: int = 1000,
+    workers: int = 4,
+    sparse: bool = False,
+    precision: int = 6,
+) -> MatchesT:
+    check_geofence_args(chunk_size, workers)
+    wkts = point_wkts(lons, lats, precision)
+    chunks = [wkts[i : i + chunk_size] for i in range(0, len(wkts), chunk_size)]
+    if len(chunks) <= 1 or workers == 1:
+        replies = [contains_chunk(client, area, chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            replies = list(
+                executor.map(lambda chunk: contains_chunk(client, area, chunk), chunks)
+            )
+    return collect_matches(replies, sparse)
@@ -0,0 +1,23 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Tuple, TypeVar
+
+ItemT = TypeVar("ItemT")
+
+
+# iter_in_flight submits fn(item) for every item to a pool of in_flight
+# threads and yields each item with its future, in input order. At most
+# in_flight items are submitted and not yet yielded, so the next item is
+# only taken once the oldest one was handed to the caller, whose handling
+# of its result applies backpressure to items.
+def iter_in_flight(
+    fn: Callable[[ItemT], Any], items: Iterable[ItemT], in_flight: int
+) -> Iterator[Tuple[ItemT, Future]]:
+    pending: "deque[Tuple[ItemT, Future]]" = deque()
+    with ThreadPoolExecutor(max_workers=in_flight) as executor:
+        for item in items:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= in_flight:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
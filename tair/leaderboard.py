@@ -0,0 +1,211 @@
+import heapq
+import zlib
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from tair.exceptions import DataError
+from tair.roaringbitop import same_slot
+from tair.tairzset import ScoreT, TairZsetItem, decode_score
+from tair.typing import AnyKeyT, EncodableT, KeyT, ResponseT
+
+
+def shard_index(member: EncodableT, shards: int) -> int:
+    if isinstance(member, str):
+        member = member.encode()
+    elif not isinstance(member, bytes):
+        member = str(member).encode()
+    # crc32 instead of hash(), which is randomized per process.
+    return zlib.crc32(member) % shards
+
+
+def check_range(start: int, stop: int) -> None:
+    if start < 0 or stop < 0:
+        raise DataError("start and stop must not be negative in a sharded leaderboard")
+
+
+# merge_items merges the per-shard replies, each of them already sorted, and
+# returns the global window [start, stop].
+def merge_items(
+    replies: Iterable[List[TairZsetItem]],
+    start: int,
+    stop: int,
+    withscores: bool,
+    reverse: bool,
+) -> List[TairZsetItem]:
+    merged = heapq.merge(
+        *replies, key=lambda item: decode_score(item.score), reverse=reverse
+    )
+    result: List[TairZsetItem] = []
+    for i, item in enumerate(merged):
+        if i > stop:
+            break
+        if i >= start:
+            result.append(item if withscores else TairZsetItem(item.member, None))
+    return result
+
+
+def rank_by_score(reply) -> int:
+    return 0 if reply is None else reply
+
+
+# RANK computes the rank of ARGV[2], held by the shard KEYS[ARGV[1]], in one
+# round trip when all the shards are in the same slot, as _rank does in two
+# otherwise. ARGV[3] is 1 for the rank in descending order.
+RANK = """
+local own = tonumber(ARGV[1])
+local reverse = ARGV[3] == '1'
+local score = redis.call('EXZSCORE', KEYS[own], ARGV[2])
+if not score then
+    return false
+end
+local rank = redis.call(reverse and 'EXZREVRANK' or 'EXZRANK', KEYS[own], ARGV[2])
+local by_score = reverse and 'EXZREVRANKBYSCORE' or 'EXZRANKBYSCORE'
+for i, key in ipairs(KEYS) do
+    if i ~= own then
+        rank = rank + (redis.call(by_score, key, score) or 0)
+        if i < own then
+            rank = rank + redis.call('EXZCOUNT', key, score, score)
+        end
+    end
+end
+return rank
+"""
+
+
+# ShardedLeaderboard partitions the members of one logical TairZset over
+# several keys by a hash of the member, so that no single key grows
+# unbounded or becomes a hot key. Its methods mirror the exz* commands.
+class ShardedLeaderboard:
+    def __init__(self, client, name: KeyT, shards: int = 16) -> None:
+        if shards <= 0:
+            raise DataError("shards must be positive")
+        self.client = client
+        self.name = name
+        self.shards = shards
+        self.keys = [f"{name}:{i}" for i in range(shards)]
+
+    def key_of(self, member: EncodableT) -> str:
+        return self.keys[shard_index(member, self.shards)]
+
+    def group(self, members: Iterable[AnyKeyT]) -> Dict[int, List[AnyKeyT]]:
+        groups: Dict[int, List[AnyKeyT]] = {}
+        for member in members:
+            groups.setdefault(shard_index(member, self.shards), []).append(member)
+        return groups
+
+    def exzadd(
+        self,
+        mapping: Mapping[AnyKeyT, ScoreT],
+        nx: bool = False,
+        xx: bool = False,
+        ch: bool = False,
+        incr: bool = False,
+    ) -> ResponseT:
+        groups = self.group(mapping)
+        with self.client.pipeline(transaction=False) as pipe:
+            for i, members in groups.items():
+                pipe.exzadd(
+                    self.keys[i],
+                    {m: mapping[m] for m in members},
+                    nx=nx,
+                    xx=xx,
+                    ch=ch,
+                    incr=incr,
+                )
+            replies = pipe.execute()
+        if incr:
+            return replies[0] if replies else None
+        return sum(replies)
+
+    def exzincrby(self, increment: ScoreT, member: EncodableT) -> ResponseT:
+        return self.client.exzincrby(self.key_of(member), increment, member)
+
+    def exzscore(self, member: EncodableT) -> ResponseT:
+        return self.client.exzscore(self.key_of(member), member)
+
+    def exzrem(self, members: Iterable[EncodableT]) -> ResponseT:
+        with self.client.pipeline(transaction=False) as pipe:
+            for i, group in self.group(members).items():
+                pipe.exzrem(self.keys[i], group)
+            return sum(pipe.execute())
+
+    def exzcard(self) -> int:
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                pipe.exzcard(key)
+            return sum(pipe.execute())
+
+    def exzrange(
+        self, start: int, stop: int, withscores: bool = False
+    ) -> List[TairZsetItem]:
+        return self._range(start, stop, withscores, reverse=False)
+
+    def exzrevrange(
+        self, start: int, stop: int, withscores: bool = False
+    ) -> List[TairZsetItem]:
+        return self._range(start, stop, withscores, reverse=True)
+
+    def top(self, k: int, withscores: bool = True) -> List[TairZsetItem]:
+        if k <= 0:
+            return []
+        return self.exzrevrange(0, k - 1, withscores)
+
+    def exzrank(self, member: EncodableT) -> Optional[int]:
+        return self._rank(member, reverse=False)
+
+    def exzrevrank(self, member: EncodableT) -> Optional[int]:
+        return self._rank(member, reverse=True)
+
+    # every shard may hold the whole window, so each one is asked for its
+    # first stop + 1 members and the replies are merged.
+    def _range(
+        self, start: int, stop: int, withscores: bool, reverse: bool
+    ) -> List[TairZsetItem]:
+        check_range(start, stop)
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                if reverse:
+                    pipe.exzrevrange(key, 0, stop, withscores=True)
+                else:
+                    pipe.exzrange(key, 0, stop, withscores=True)
+            replies = pipe.execute()
+        return merge_items(replies, start, stop, withscores, reverse)
+
+    # the rank of a member is its rank in its own shard plus, for every other
+    # shard, the number of members ranked before its score there, as given by
+    # EXZRANKBYSCORE/EXZREVRANKBYSCORE, which leave out the members tied with
+    # it. The members tied with it in the shards before its own are counted
+    # too, with EXZCOUNT, so that tied members rank by shard and then by
+    # member within a shard, the order exzrange and exzrevrange merge them in.
+    #
+    # The other shards can only be asked once the score is known, so when the
+    # shards span several slots of a cluster this takes two round trips, and
+    # one with the RANK script otherwise.
+    def _rank(self, member: EncodableT, reverse: bool) -> Optional[int]:
+        own = shard_index(member, self.shards)
+        if same_slot(self.client, self.keys):
+            return self.client.eval(
+                RANK, len(self.keys), *self.keys, own + 1, member, int(reverse)
+            )
+
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.exzscore(self.keys[own], member)
+            if reverse:
+                pipe.exzrevrank(self.keys[own], member)
+            else:
+                pipe.exzrank(self.keys[own], member)
+            score, rank = pipe.execute()
+        if score is None or rank is None:
+            return None
+        if self.shards == 1:
+            return rank
+        with self.client.pipeline(transaction=False) as pipe:
+            for i, key in enumerate(self.keys):
+                if i == own:
+                    continue
+                if reverse:
+                    pipe.exzrevrankbyscore(key, score)
+                else:
+                    pipe.exzrankbyscore(key, score)
+                if i < own:
+                    pipe.exzcount(key, score, score)
+            return rank + sum(rank_by_score(reply) for reply in pipe.execute())
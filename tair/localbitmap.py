@@ -0,0 +1,183 @@
+import bisect
+import itertools
+from typing import Any, Iterator, List, Optional, Tuple
+
+from redis.utils import str_if_bytes
+
+from tair.exceptions import DataError
+from tair.roaringbulk import bulk_setbits, unique_offsets
+from tair.roaringscan import iter_tr_scan
+from tair.typing import KeyT
+from tair.zsetiter import iter_pages
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# LocalBitmap is an immutable set of offsets held as a sorted array of
+# uint64, or as a sorted list when numpy is not installed, so that it takes
+# 8 bytes per set bit whatever the offsets are. It is meant for running many
+# set operations over a few bitmaps pulled from TairRoaring without a round
+# trip or a temporary key per operation.
+class LocalBitmap:
+    def __init__(self, offsets: Any = (), presorted: bool = False) -> None:
+        if presorted:
+            self.offsets = offsets
+        else:
+            self.offsets = unique_offsets(offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[int]:
+        if np is not None and isinstance(self.offsets, np.ndarray):
+            return iter(self.offsets.tolist())
+        return iter(self.offsets)
+
+    def __contains__(self, offset: int) -> bool:
+        i = self._search(offset)
+        return i < len(self.offsets) and self.offsets[i] == offset
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LocalBitmap):
+            return False
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        head = list(itertools.islice(self, 8))
+        more = ", ..." if len(self) > 8 else ""
+        return f"{{cardinality: {len(self)}, offsets: {head}{more}}}"
+
+    def __and__(self, other: "LocalBitmap") -> "LocalBitmap":
+        if self._vectorized(other):
+            return LocalBitmap(
+                np.intersect1d(self.offsets, other.offsets, assume_unique=True),
+                presorted=True,
+            )
+        return LocalBitmap(sorted(set(self.offsets) & set(other.offsets)), True)
+
+    def __or__(self, other: "LocalBitmap") -> "LocalBitmap":
+        if self._vectorized(other):
+            return LocalBitmap(np.concatenate((self.offsets, other.offsets)))
+        return LocalBitmap(sorted(set(self.offsets) | set(other.offsets)), True)
+
+    def __xor__(self, other: "LocalBitmap") -> "LocalBitmap":
+        if self._vectorized(other):
+            return LocalBitmap(
+                np.setxor1d(self.offsets, other.offsets, assume_unique=True),
+                presorted=True,
+            )
+        return LocalBitmap(sorted(set(self.offsets) ^ set(other.offsets)), True)
+
+    def __sub__(self, other: "LocalBitmap") -> "LocalBitmap":
+        if self._vectorized(other):
+            return LocalBitmap(
+                np.setdiff1d(self.offsets, other.offsets, assume_unique=True),
+                presorted=True,
+            )
+        return LocalBitmap(sorted(set(self.offsets) - set(other.offsets)), True)
+
+    # rank returns the number of set bits at or before offset, like TR.RANK.
+    def rank(self, offset: int) -> int:
+        if offset < 0:
+            return 0
+        i = self._search(offset)
+        if i < len(self.offsets) and self.offsets[i] == offset:
+            i += 1
+        return i
+
+    def jaccard(self, other: "LocalBitmap") -> float:
+        union = len(self | other)
+        return len(self & other) / union if union else 0.0
+
+    def min(self) -> int:
+        return int(self.offsets[0]) if len(self) else -1
+
+    def max(self) -> int:
+        return int(self.offsets[-1]) if len(self) else -1
+
+    def _vectorized(self, other: "LocalBitmap") -> bool:
+        return (
+            np is not None
+            and isinstance(self.offsets, np.ndarray)
+            and isinstance(other.offsets, np.ndarray)
+        )
+
+    def _search(self, offset: int) -> int:
+        if offset < 0:
+            return 0
+        if np is not None and isinstance(self.offsets, np.ndarray):
+            return int(np.searchsorted(self.offsets, np.uint64(offset)))
+        return bisect.bisect_left(self.offsets, offset)
+
+
+def concat_pages(pages: List[Any]) -> LocalBitmap:
+    if np is None:
+        return LocalBitmap([offset for page in pages for offset in page], True)
+    if not pages:
+        return LocalBitmap(np.zeros(0, dtype=np.uint64), True)
+    return LocalBitmap(np.concatenate(pages), True)
+
+
+def bitarray_page(start: int, bitarray: Any) -> Any:
+    bitarray = str_if_bytes(bitarray)
+    if np is None:
+        return [start + i for i, bit in enumerate(bitarray) if bit == "1"]
+    bits = np.frombuffer(bitarray.encode(), dtype=np.uint8) == ord("1")
+    return np.flatnonzero(bits).astype(np.uint64) + np.uint64(start)
+
+
+def check_page_args(page_size: int) -> None:
+    if page_size <= 0:
+        raise DataError("page_size must be positive")
+
+
+# fetch_bitmap pulls key with TR.SCAN through iter_tr_scan, starting with
+# page_size offsets per page, and with prefetch requests the next page while
+# the current one is converted.
+def fetch_bitmap(
+    client, key: KeyT, page_size: int = 65536, prefetch: bool = True
+) -> LocalBitmap:
+    check_page_args(page_size)
+    if np is None:
+        stream = iter_tr_scan(client, key, count=page_size, prefetch=prefetch)
+        return LocalBitmap(list(stream), True)
+    pages = iter_tr_scan(client, key, count=page_size, prefetch=prefetch, chunks=True)
+    return concat_pages(list(pages))
+
+
+# fetch_dense_bitmap pulls key with TR.RANGEBITARRAY, window bits at a time
+# from its minimum to its maximum, which transfers one byte per bit instead
+# of one number per set bit and suits dense bitmaps better.
+def fetch_dense_bitmap(
+    client, key: KeyT, window: int = 1 << 20, prefetch: bool = True
+) -> LocalBitmap:
+    check_page_args(window)
+    with client.pipeline(transaction=False) as pipe:
+        pipe.tr_min(key)
+        pipe.tr_max(key)
+        low, high = pipe.execute()
+    if low is None or low < 0:
+        return concat_pages([])
+
+    def fetch(start: int) -> Tuple[int, Any]:
+        end = min(start + window - 1, high)
+        return start, client.tr_rangebitarray(key, start, end)
+
+    def advance(start: int, page: Tuple[int, Any]) -> Optional[int]:
+        return start + window if start + window <= high else None
+
+    pages = [
+        bitarray_page(start, bitarray)
+        for start, bitarray in iter_pages(fetch, advance, low, prefetch)
+    ]
+    return concat_pages(pages)
+
+
+def store_bitmap(client, key: KeyT, bitmap: LocalBitmap, **kwargs) -> int:
+    return bulk_setbits(client, key, bitmap.offsets, replace=True, **kwargs)
@@ -0,0 +1,415 @@
+import math
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from tair.exceptions import DataError
+from tair.stats import Stats
+from tair.typing import EncodableT, KeyT, ResponseT
+
+PointT = Tuple[float, float]
+BBoxT = Tuple[float, float, float, float]
+
+WKT = re.compile(r"\s*([A-Za-z]+)\s*(\(.*\))\s*$", re.S)
+RING = re.compile(r"\(([^()]*)\)")
+# a geometry spanning more cells of the grid than this is kept out of it and
+# checked by every query instead.
+MAX_CELLS = 64
+
+
+# Geometry is a POINT, a LINESTRING or a POLYGON, given by its rings: the
+# single point, the line, or the exterior ring followed by the holes.
+class Geometry:
+    def __init__(self, kind: str, rings: List[List[PointT]]) -> None:
+        self.kind = kind
+        self.rings = rings
+        xs = [x for x, _ in rings[0]]
+        ys = [y for _, y in rings[0]]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def __repr__(self) -> str:
+        return f"{{kind: {self.kind}, rings: {self.rings}}}"
+
+
+def parse_points(text: str) -> List[PointT]:
+    points = []
+    for pair in text.split(","):
+        coords = pair.split()
+        points.append((float(coords[0]), float(coords[1])))
+    return points
+
+
+# parse_wkt returns None for the WKT it does not support, such as the MULTI
+# geometries, and for malformed WKT, which is left to the server to reject.
+def parse_wkt(wkt: EncodableT) -> Optional[Geometry]:
+    if isinstance(wkt, bytes):
+        wkt = wkt.decode()
+    m = WKT.match(wkt)
+    if m is None:
+        return None
+    kind, body = m.group(1).upper(), m.group(2)[1:-1]
+    try:
+        if kind == "POINT":
+            points = parse_points(body)
+            return Geometry(kind, [points]) if len(points) == 1 else None
+        if kind == "LINESTRING":
+            points = parse_points(body)
+            return Geometry(kind, [points]) if len(points) >= 2 else None
+        if kind == "POLYGON":
+            rings = [parse_points(ring) for ring in RING.findall(body)]
+            if not rings or any(len(ring) < 3 for ring in rings):
+                return None
+            for ring in rings:
+                if ring[0] != ring[-1]:
+                    ring.append(ring[0])
+            return Geometry(kind, rings)
+    except (ValueError, IndexError):
+        return None
+    return None
+
+
+def orient(a: PointT, b: PointT, c: PointT) -> int:
+    v = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return (v > 0) - (v < 0)
+
+
+# between tells whether c, collinear with a and b, lies on the segment ab.
+def between(a: PointT, b: PointT, c: PointT) -> bool:
+    if not min(a[0], b[0]) <= c[0] <= max(a[0], b[0]):
+        return False
+    return min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+
+
+def segments_intersect(a: PointT, b: PointT, c: PointT, d: PointT) -> bool:
+    o1, o2 = orient(a, b, c), orient(a, b, d)
+    o3, o4 = orient(c, d, a), orient(c, d, b)
+    if o1 * o2 < 0 and o3 * o4 < 0:
+        return True
+    return (
+        (o1 == 0 and between(a, b, c))
+        or (o2 == 0 and between(a, b, d))
+        or (o3 == 0 and between(c, d, a))
+        or (o4 == 0 and between(c, d, b))
+    )
+
+
+# segments_cross tells whether the segments cross at a point inside both.
+def segments_cross(a: PointT, b: PointT, c: PointT, d: PointT) -> bool:
+    if orient(a, b, c) * orient(a, b, d) >= 0:
+        return False
+    return orient(c, d, a) * orient(c, d, b) < 0
+
+
+def edges(rings: Sequence[List[PointT]]) -> List[Tuple[PointT, PointT]]:
+    return [(ring[i], ring[i + 1]) for ring in rings for i in range(len(ring) - 1)]
+
+
+# locate returns 1 when the point is inside the polygon, 0 when it is on its
+# boundary and -1 when it is outside, holes being outside.
+def locate(x: float, y: float, rings: Sequence[List[PointT]]) -> int:
+    inside = False
+    for ring in rings:
+        x1, y1 = ring[0]
+        for x2, y2 in ring[1:]:
+            if (y1 > y) != (y2 > y):
+                # the ray from the point towards +x crosses the edge when the
+                # point is on the left of an upward edge, or on the right of
+                # a downward one.
+                cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+                if cross == 0:
+                    return 0
+                if (cross > 0) == (y2 > y1):
+                    inside = not inside
+            elif y1 == y2 == y and min(x1, x2) <= x <= max(x1, x2):
+                return 0
+            elif (x2, y2) == (x, y):
+                return 0
+            x1, y1 = x2, y2
+    return 1 if inside else -1
+
+
+def bbox_overlaps(a: BBoxT, b: BBoxT) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def bbox_covers(a: BBoxT, b: BBoxT) -> bool:
+    return a[0] <= b[0] and a[1] <= b[1] and b[2] <= a[2] and b[3] <= a[3]
+
+
+def outline(geom: Geometry) -> List[List[PointT]]:
+    return geom.rings[:1]
+
+
+# polygon_contains tells whether the polygon contains the geometry, its
+# boundary included: every vertex and the middle of every edge of the
+# geometry are inside, none of its edges crosses the boundary, and no hole
+# of the polygon is inside the geometry.
+def polygon_contains(polygon: Geometry, geom: Geometry) -> bool:
+    if not bbox_covers(polygon.bbox, geom.bbox):
+        return False
+    rings = polygon.rings
+    for ring in outline(geom):
+        for x, y in ring:
+            if locate(x, y, rings) < 0:
+                return False
+    if geom.kind == "POINT":
+        return True
+    boundary = edges(rings)
+    for a, b in edges(outline(geom)):
+        if locate((a[0] + b[0]) / 2, (a[1] + b[1]) / 2, rings) < 0:
+            return False
+        for c, d in boundary:
+            if segments_cross(a, b, c, d):
+                return False
+    if geom.kind == "POLYGON":
+        for hole in rings[1:]:
+            if any(locate(x, y, outline(geom)) > 0 for x, y in hole):
+                return False
+    return True
+
+
+def intersects(polygon: Geometry, geom: Geometry) -> bool:
+    if not bbox_overlaps(polygon.bbox, geom.bbox):
+        return False
+    for x, y in geom.rings[0]:
+        if locate(x, y, polygon.rings) >= 0:
+            return True
+    if geom.kind == "POLYGON":
+        for x, y in polygon.rings[0]:
+            if locate(x, y, geom.rings) >= 0:
+                return True
+    boundary = edges(polygon.rings)
+    for a, b in edges(geom.rings):
+        for c, d in boundary:
+            if segments_intersect(a, b, c, d):
+                return True
+    return False
+
+
+# GridIndex files the bounding boxes of the geometries of an area into the
+# cells of a uniform grid, sized after the average box, so that a query
+# only looks at the geometries of the cells it covers.
+class GridIndex:
+    def __init__(self, bboxes: List[BBoxT]) -> None:
+        self.bboxes = bboxes
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.large: List[int] = []
+        if bboxes:
+            width = sum(b[2] - b[0] for b in bboxes) / len(bboxes)
+            height = sum(b[3] - b[1] for b in bboxes) / len(bboxes)
+            self.size = max(width, height) or 1.0
+        else:
+            self.size = 1.0
+        for i, bbox in enumerate(bboxes):
+            x0, y0, x1, y1 = self.cell_range(bbox)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_CELLS:
+                self.large.append(i)
+                continue
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    def cell_range(self, bbox: BBoxT) -> Tuple[int, int, int, int]:
+        size = self.size
+        return (
+            math.floor(bbox[0] / size),
+            math.floor(bbox[1] / size),
+            math.floor(bbox[2] / size),
+            math.floor(bbox[3] / size),
+        )
+
+    # candidates returns, in ascending order, the geometries whose bounding
+    # box overlaps bbox.
+    def candidates(self, bbox: BBoxT) -> List[int]:
+        x0, y0, x1, y1 = self.cell_range(bbox)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.bboxes):
+            found = range(len(self.bboxes))
+        elif x0 == x1 and y0 == y1 and not self.large:
+            found = self.cells.get((x0, y0), ())
+        else:
+            seen = set(self.large)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    seen.update(self.cells.get((cx, cy), ()))
+            found = sorted(seen)
+        return [i for i in found if bbox_overlaps(self.bboxes[i], bbox)]
+
+
+# AreaIndex is a snapshot of the polygons of an area. supported is False
+# when the area holds anything but polygons, and it is then left to the
+# server.
+class AreaIndex:
+    def __init__(self, reply: Optional[List[Any]], version: Any = None) -> None:
+        reply = reply or []
+        self.names = reply[0::2]
+        self.wkts = reply[1::2]
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.geoms = [parse_wkt(wkt) for wkt in self.wkts]
+        self.supported = all(
+            geom is not None and geom.kind == "POLYGON" for geom in self.geoms
+        )
+        self.grid = GridIndex([geom.bbox for geom in self.geoms if self.supported])
+
+    def contains(self, geom: Geometry) -> List[int]:
+        return [
+            i
+            for i in self.grid.candidates(geom.bbox)
+            if polygon_contains(self.geoms[i], geom)
+        ]
+
+    def within(self, geom: Geometry) -> List[int]:
+        if geom.kind != "POLYGON":
+            return []
+        return [
+            i
+            for i in self.grid.candidates(geom.bbox)
+            if polygon_contains(geom, self.geoms[i])
+        ]
+
+    def intersects(self, geom: Geometry) -> List[int]:
+        return [
+            i
+            for i in self.grid.candidates(geom.bbox)
+            if intersects(self.geoms[i], geom)
+        ]
+
+    # reply builds the reply of GIS.CONTAINS, GIS.WITHIN and GIS.INTERSECTS.
+    def reply(self, matches: List[int], withoutwkts: bool = False) -> List[Any]:
+        if withoutwkts:
+            return [len(matches), [self.names[i] for i in matches]]
+        members = []
+        for i in matches:
+            members.append(self.names[i])
+            members.append(self.wkts[i])
+        return [len(matches), members]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class LocalGisStats(Stats):
+    FIELDS = ("hits", "fallbacks", "loads", "version_checks")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.fallbacks = 0
+        self.loads = 0
+        self.version_checks = 0
+
+
+def check_gis_args(ttl: float, check_interval: float) -> None:
+    if ttl <= 0:
+        raise DataError("ttl must be positive")
+    if check_interval <= 0:
+        raise DataError("check_interval must be positive")
+
+
+# LocalGis answers gis_contains, gis_within and gis_intersects from a copy of
+# the area held in process, loaded with GIS.GETALL and indexed by a grid, so
+# that a point-in-polygon check does not cost a round trip. It is meant for
+# areas that change rarely. Queries and polygons other than POINT,
+# LINESTRING and POLYGON are sent to the server, as are the areas holding
+# any. The predicates are computed in the plane of the coordinates, and the
+# boundary of a polygon counts as inside it.
+#
+# An area is loaded again ttl seconds after it was. With version_key, which
+# maps an area to a key its writers increment on every change, the version
+# is also read at most every check_interval seconds and the area reloaded as
+# soon as it moves. gis_add and gis_del through LocalGis increment it and
+# drop the local copy.
+class LocalGis:
+    def __init__(
+        self,
+        client,
+        ttl: float = 60.0,
+        version_key: Optional[Callable[[KeyT], KeyT]] = None,
+        check_interval: float = 1.0,
+    ) -> None:
+        check_gis_args(ttl, check_interval)
+        self.client = client
+        self.ttl = ttl
+        self.version_key = version_key
+        self.check_interval = check_interval
+        self.stats = LocalGisStats()
+
+        self._areas: Dict[KeyT, AreaIndex] = {}
+        self._lock = threading.Lock()
+
+    def load(self, area: KeyT) -> AreaIndex:
+        if self.version_key is None:
+            index = AreaIndex(self.client.gis_getall(area))
+        else:
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self.version_key(area))
+                pipe.gis_getall(area)
+                version, reply = pipe.execute()
+            index = AreaIndex(reply, version)
+        self._areas[area] = index
+        self.stats.loads += 1
+        return index
+
+    def area_index(self, area: KeyT) -> AreaIndex:
+        index = self._areas.get(area)
+        now = time.monotonic()
+        if index is not None and now - index.loaded_at < self.ttl:
+            if self.version_key is None or now - index.checked_at < self.check_interval:
+                return index
+            self.stats.version_checks += 1
+            if self.client.get(self.version_key(area)) == index.version:
+                index.checked_at = now
+                return index
+        with self._lock:
+            current = self._areas.get(area)
+            if current is not index and current is not None:
+                return current
+            return self.load(area)
+
+    def query(
+        self, command: str, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool
+    ) -> ResponseT:
+        index = self.area_index(area)
+        geom = parse_wkt(polygon_wkt) if index.supported else None
+        if geom is None:
+            self.stats.fallbacks += 1
+            return getattr(self.client, "gis_" + command)(
+                area, polygon_wkt, withoutwkts
+            )
+        self.stats.hits += 1
+        return index.reply(getattr(index, command)(geom), withoutwkts)
+
+    def gis_contains(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return self.query("contains", area, polygon_wkt, withoutwkts)
+
+    def gis_within(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return self.query("within", area, polygon_wkt, withoutwkts)
+
+    def gis_intersects(
+        self, area: KeyT, polygon_wkt: EncodableT, withoutwkts: bool = False
+    ) -> ResponseT:
+        return self.query("intersects", area, polygon_wkt, withoutwkts)
+
+    def gis_add(self, area: KeyT, mapping: Dict[KeyT, str]) -> ResponseT:
+        try:
+            return self.client.gis_add(area, mapping)
+        finally:
+            self.invalidate(area)
+
+    def gis_del(self, area: KeyT, polygen_name) -> ResponseT:
+        try:
+            return self.client.gis_del(area, polygen_name)
+        finally:
+            self.invalidate(area)
+
+    # invalidate waits for a load of the area already under way, which may
+    # have read it before the write, so that its copy is dropped as well.
+    def invalidate(self, area: KeyT) -> None:
+        with self._lock:
+            self._areas.pop(area, None)
+        if self.version_key is not None:
+            self.client.incr(self.version_key(area))
@@ -0,0 +1,176 @@
+import threading
+import time
+import uuid
+from typing import Optional
+
+from tair.exceptions import (
+    ConnectionError,
+    LockError,
+    LockNotOwnedError,
+    TimeoutError,
+)
+from tair.typing import KeyT
+
+
+def fence_key(name: KeyT) -> str:
+    return f"{name}:fence"
+
+
+def wake_key(name: KeyT) -> str:
+    return f"{name}:wake"
+
+
+# wait_seconds returns how long a waiter may block before trying again. The
+# wait is bounded by the holder's lease so that a crashed holder never blocks
+# the waiters longer than its lock would have lived anyway. BLPOP only takes
+# whole seconds on older servers, so waits under a second are slept instead.
+def wait_seconds(pttl: int, lease: float, remaining: Optional[float]) -> float:
+    wait = lease if pttl < 0 else pttl / 1000
+    if remaining is not None:
+        wait = min(wait, remaining)
+    return max(0.0, wait)
+
+
+# RENEW extends the lease of KEYS[1] while its version is still the fencing
+# token ARGV[1]. PEXPIRE leaves the version alone, so the version of the lock
+# key stays the token of its holder and never enters the range of the tokens
+# handed to later holders.
+RENEW = """
+local current = redis.call('EXGET', KEYS[1])
+if current and current[2] == tonumber(ARGV[1]) then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+# Lock is a lease-based mutex on a TairString key.
+#
+# Every acquisition takes a fencing token from EXINCRBY on a companion key
+# and stamps it into the lock key as its version (EXSET NX ABS), so tokens
+# strictly increase across holders and can be checked by the protected
+# resource. While held, the lease is renewed in the background by the RENEW
+# script, and release deletes the key through EXCAD with the token. Both
+# only act while the version is still the holder's token, so a holder whose
+# lease already expired can never delete or extend someone else's lock.
+# Waiters block in BLPOP on a wake list that release pushes to, instead of
+# sleep-polling.
+class Lock:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        lease: float = 10.0,
+        renew: bool = True,
+    ) -> None:
+        self.client = client
+        self.name = name
+        self.lease = lease
+        self.renew = renew
+        self.owner = str(uuid.uuid4())
+        self.token: Optional[int] = None
+        self.lost = False
+
+        self._lease_ms = int(lease * 1000)
+        self._state_lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+        self._renewer: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Lock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def locked(self) -> bool:
+        return self.token is not None and not self.lost
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        if self.token is not None:
+            raise LockError("Cannot acquire an already acquired lock")
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            token = self.client.exincrby(fence_key(self.name), 1)
+            if self.client.exset(
+                self.name, self.owner, px=self._lease_ms, nx=True, abs=token
+            ):
+                self.token = token
+                self.lost = False
+                if self.renew:
+                    self._start_renewer()
+                return True
+
+            if not blocking:
+                return False
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+
+            pttl = self.client.pttl(self.name)
+            if pttl == -2:
+                continue
+            wait = wait_seconds(pttl, self.lease, remaining)
+            if wait >= 1:
+                self.client.blpop([wake_key(self.name)], int(wait))
+            else:
+                time.sleep(wait)
+
+    def release(self) -> None:
+        if self.token is None:
+            raise LockError("Cannot release an unlocked lock")
+        self._stop_renewer()
+
+        with self._state_lock:
+            token = self.token
+            self.token = None
+
+        deleted = self.client.excad(self.name, token)
+        # keep at most one pending wakeup so that releases without waiters
+        # do not pile up stale wakeups.
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.rpush(wake_key(self.name), token)
+            pipe.ltrim(wake_key(self.name), -1, -1)
+            pipe.pexpire(wake_key(self.name), self._lease_ms)
+            pipe.execute()
+
+        if deleted != 1:
+            self.lost = True
+            raise LockNotOwnedError("Cannot release a lock that's no longer owned")
+
+    def extend(self) -> bool:
+        with self._state_lock:
+            if self.token is None or self.lost:
+                return False
+            if not self.client.eval(RENEW, 1, self.name, self.token, self._lease_ms):
+                self.lost = True
+                return False
+            return True
+
+    def _start_renewer(self) -> None:
+        self._stop = threading.Event()
+        self._renewer = threading.Thread(
+            target=self._renew_loop, args=(self._stop,), daemon=True
+        )
+        self._renewer.start()
+
+    def _stop_renewer(self) -> None:
+        if self._renewer is None:
+            return
+        self._stop.set()
+        if self._renewer is not threading.current_thread():
+            self._renewer.join()
+        self._renewer = None
+        self._stop = None
+
+    def _renew_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.lease / 3):
+            try:
+                if not self.extend():
+                    return
+            except (ConnectionError, TimeoutError):
+                # try again on the next tick, the lease is still valid.
+                continue
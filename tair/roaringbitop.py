@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import uuid
+from typing import Collection, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tair.exceptions import DataError
+from tair.roaringscan import iter_tr_scan
+from tair.typing import KeyT
+
+# ANDNOT is accepted as another name for DIFF: the bits of the first key
+# that are in none of the others. NOT is only run on the server.
+OPERATIONS = {
+    "AND": "AND",
+    "OR": "OR",
+    "XOR": "XOR",
+    "DIFF": "DIFF",
+    "ANDNOT": "DIFF",
+    "NOT": "NOT",
+}
+
+
+def check_operation(operation: str, keys: Sequence[KeyT]) -> str:
+    if not keys:
+        raise DataError("at least one key is required")
+    op = OPERATIONS.get(operation.upper())
+    if op is None:
+        raise DataError(f"unsupported operation {operation}")
+    return op
+
+
+def check_emulated(op: str) -> None:
+    if op == "NOT":
+        raise DataError("NOT requires destkey and key to share a slot")
+
+
+def same_slot(client, keys: Iterable[KeyT]) -> bool:
+    if not hasattr(client, "keyslot"):
+        return True
+    return len({client.keyslot(key) for key in keys}) <= 1
+
+
+# the streams whose end also ends the result.
+def required_streams(op: str, n: int) -> Collection[int]:
+    if op == "AND":
+        return range(n)
+    if op == "DIFF":
+        return (0,)
+    return ()
+
+
+def selected(op: str, group: List[int], n: int) -> bool:
+    if op == "AND":
+        return len(group) == n
+    if op == "XOR":
+        return len(group) % 2 == 1
+    if op == "DIFF":
+        return group == [0]
+    return True
+
+
+# merge_groups merges sorted streams of unique offsets, and yields every
+# offset along with the indexes of the streams that hold it.
+def merge_groups(
+    streams: Sequence[Iterator[int]], required: Collection[int]
+) -> Iterator[Tuple[int, List[int]]]:
+    heap = []
+    for i, stream in enumerate(streams):
+        offset = next(stream, None)
+        if offset is not None:
+            heap.append((offset, i))
+        elif i in required:
+            return
+    heapq.heapify(heap)
+
+    while heap:
+        offset = heap[0][0]
+        group = []
+        done = False
+        while heap and heap[0][0] == offset:
+            _, i = heapq.heappop(heap)
+            group.append(i)
+            following = next(streams[i], None)
+            if following is not None:
+                heapq.heappush(heap, (following, i))
+            elif i in required:
+                done = True
+        group.sort()
+        yield offset, group
+        if done:
+            return
+
+
+# iter_bitop yields the offsets of the result of operation over keys. Every
+# key is paged through with TR.SCAN in a thread of its own, which prefetches
+# its next page, and the pages are merged on the fly.
+def iter_bitop(
+    client, operation: str, keys: Sequence[KeyT], page_size: int = 65536
+) -> Iterator[int]:
+    op = check_operation(operation, keys)
+    check_emulated(op)
+    streams = [iter_tr_scan(client, key, count=page_size) for key in keys]
+    for offset, group in merge_groups(streams, required_streams(op, len(keys))):
+        if selected(op, group, len(keys)):
+            yield offset
+
+
+# slot_tag returns the part of key that decides its slot: its hash tag, or
+# the whole key when it has none. It returns None for a key with no hash tag
+# but a "}", which no other key can be made to share the slot of.
+def slot_tag(key: KeyT) -> Optional[bytes]:
+    if isinstance(key, str):
+        key = key.encode()
+    key = bytes(key)
+    start = key.find(b"{")
+    if start >= 0:
+        end = key.find(b"}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return None if b"}" in key else key
+
+
+# temp_key returns a new key in the slot of key.
+def temp_key(key: KeyT) -> bytes:
+    tag = slot_tag(key)
+    if tag is None:
+        raise DataError(f"no key can be made to share the slot of {key!r}")
+    return b"{" + tag + b"}:bitop:" + uuid.uuid4().hex.encode()
+
+
+# cluster_bitop runs TR.BITOP when destkey and keys share a slot, and
+# otherwise streams the operands and writes the result in TR.SETBITS of
+# chunk_size offsets to a key in the slot of destkey, renamed over destkey
+# at the end, so that destkey may be one of keys. It returns the cardinality
+# of the result.
+def cluster_bitop(
+    client,
+    destkey: KeyT,
+    operation: str,
+    keys: Sequence[KeyT],
+    page_size: int = 65536,
+    chunk_size: int = 65536,
+) -> int:
+    op = check_operation(operation, keys)
+    if same_slot(client, [destkey, *keys]):
+        return client.tr_bitop(destkey, op, keys)
+
+    temp = temp_key(destkey)
+    count = 0
+    try:
+        offsets = iter_bitop(client, op, keys, page_size)
+        while True:
+            chunk = list(itertools.islice(offsets, chunk_size))
+            if not chunk:
+                break
+            client.tr_setbits(temp, chunk)
+            count += len(chunk)
+        if count:
+            client.tr_optimize(temp)
+            client.rename(temp, destkey)
+        else:
+            client.delete(destkey)
+    except Exception:
+        client.delete(temp)
+        raise
+    return count
+
+
+def cluster_bitopcard(
+    client, operation: str, keys: Sequence[KeyT], page_size: int = 65536
+) -> int:
+    op = check_operation(operation, keys)
+    if same_slot(client, keys):
+        return client.tr_bitopcard(op, keys)
+    return sum(1 for _ in iter_bitop(client, op, keys, page_size))
@@ -0,0 +1,158 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from tair.exceptions import DataError
+from tair.typing import KeyT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CommandT = Tuple[str, Tuple[Any, ...]]
+
+
+# unique_offsets sorts and deduplicates the offsets, in a vectorized way
+# when numpy is installed.
+def unique_offsets(offsets: Any) -> Any:
+    if np is None:
+        result = sorted(set(offsets))
+        if result and result[0] < 0:
+            raise DataError("offsets must not be negative")
+        return result
+    if not isinstance(offsets, np.ndarray):
+        offsets = np.fromiter(offsets, dtype=np.int64)
+    if offsets.size and offsets.min() < 0:
+        raise DataError("offsets must not be negative")
+    # sort and drop adjacent duplicates, which is much faster than np.unique
+    # on large arrays.
+    offsets = np.sort(offsets.astype(np.uint64, copy=False))
+    if offsets.size == 0:
+        return offsets
+    keep = np.empty(offsets.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(offsets[1:], offsets[:-1], out=keep[1:])
+    return offsets[keep]
+
+
+# split_runs splits sorted unique offsets into the runs of consecutive
+# offsets of at least min_run offsets, as inclusive (start, end) pairs, and
+# the remaining offsets.
+def split_runs(offsets: Any, min_run: int) -> Tuple[List[Tuple[int, int]], Any]:
+    if np is None or not isinstance(offsets, np.ndarray):
+        runs: List[Tuple[int, int]] = []
+        singles: List[int] = []
+        start = 0
+        for i in range(1, len(offsets) + 1):
+            if i < len(offsets) and offsets[i] == offsets[i - 1] + 1:
+                continue
+            if i - start >= min_run:
+                runs.append((offsets[start], offsets[i - 1]))
+            else:
+                singles.extend(offsets[start:i])
+            start = i
+        return runs, singles
+
+    if offsets.size == 0:
+        return [], offsets
+    breaks = np.flatnonzero(np.diff(offsets) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [offsets.size]))
+    lengths = ends - starts
+    dense = lengths >= min_run
+    runs = list(zip(offsets[starts[dense]].tolist(), offsets[ends[dense] - 1].tolist()))
+    return runs, offsets[np.repeat(~dense, lengths)]
+
+
+# plan_setbits yields TR.SETRANGE commands for the dense runs of the offsets
+# and TR.SETBITS commands of at most chunk_size offsets for the rest, the
+# offsets of a TR.SETBITS being a numpy array when numpy is installed.
+def plan_setbits(offsets: Any, chunk_size: int, min_run: int) -> Iterator[CommandT]:
+    runs, singles = split_runs(unique_offsets(offsets), min_run)
+    for run in runs:
+        yield "tr_setrange", run
+    for i in range(0, len(singles), chunk_size):
+        yield "tr_setbits", (singles[i : i + chunk_size],)
+
+
+def command_args(args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    if np is None:
+        return args
+    return tuple(arg.tolist() if isinstance(arg, np.ndarray) else arg for arg in args)
+
+
+# iter_batches groups the commands into pipelines of pipeline_size, and only
+# then turns their numpy offsets into Python ints, so that the ints of no
+# more than the batches being sent are held at once.
+def iter_batches(
+    commands: Iterator[CommandT], pipeline_size: int
+) -> Iterator[List[CommandT]]:
+    while True:
+        batch = [
+            (name, command_args(args))
+            for name, args in itertools.islice(commands, pipeline_size)
+        ]
+        if not batch:
+            return
+        yield batch
+
+
+def check_bulk_args(chunk_size: int, min_run: int, pipeline_size: int) -> None:
+    if chunk_size <= 0:
+        raise DataError("chunk_size must be positive")
+    if min_run <= 1:
+        raise DataError("min_run must be greater than 1")
+    if pipeline_size <= 0:
+        raise DataError("pipeline_size must be positive")
+
+
+# bulk_setbits sets the bits at offsets, given as an iterable or a numpy
+# integer array, in key and returns its cardinality. The commands are sent
+# in pipelines of pipeline_size commands over up to connections connections,
+# each pipeline being built when a connection is free for it, and the bitmap
+# is optimized once at the end. With replace, the bits that were set before
+# are cleared.
+def bulk_setbits(
+    client,
+    key: KeyT,
+    offsets: Iterable[int],
+    chunk_size: int = 65536,
+    min_run: int = 64,
+    pipeline_size: int = 8,
+    connections: int = 4,
+    replace: bool = False,
+) -> int:
+    check_bulk_args(chunk_size, min_run, pipeline_size)
+    commands = plan_setbits(offsets, chunk_size, min_run)
+    first = next(commands, None)
+    if replace:
+        client.delete(key)
+    if first is None:
+        return client.tr_bitcount(key)
+
+    def run(batch: List[CommandT]) -> None:
+        with client.pipeline(transaction=False) as pipe:
+            for name, args in batch:
+                getattr(pipe, name)(key, *args)
+            pipe.execute()
+
+    batches = iter_batches(itertools.chain([first], commands), pipeline_size)
+    if connections <= 1:
+        for batch in batches:
+            run(batch)
+    else:
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            for batch in batches:
+                if len(pending) >= connections:
+                    pending.popleft().result()
+                pending.append(executor.submit(run, batch))
+            for future in pending:
+                future.result()
+
+    with client.pipeline(transaction=False) as pipe:
+        pipe.tr_optimize(key)
+        pipe.tr_bitcount(key)
+        return pipe.execute()[1]
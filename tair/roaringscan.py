@@ -0,0 +1,85 @@
+from typing import Any, Iterator, Optional, Tuple
+
+from tair.exceptions import DataError
+from tair.tairroaring import TrScanResult
+from tair.typing import KeyT
+from tair.zsetiter import iter_pages
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ScanCursorT = Tuple[int, int]
+
+
+def scan_page(resp: TrScanResult) -> Any:
+    if np is None:
+        return resp.offsets
+    return np.array(resp.offsets, dtype=np.uint64)
+
+
+# a scan stops when TR.SCAN returns the cursor 0 or no longer moves forward.
+def next_scan_cursor(cursor: int, resp: TrScanResult) -> Optional[int]:
+    if not resp.offsets or resp.start_offset <= resp.offsets[-1]:
+        return None
+    return resp.start_offset
+
+
+# every offset of a TR.SCAN reply takes ":<digits>\r\n" on the wire, and the
+# offsets only grow, so the last one of a page bounds the size of the next.
+def scan_count(resp: TrScanResult, target_bytes: int, max_count: int) -> int:
+    per_offset = len(str(resp.offsets[-1])) + 3
+    return max(1, min(max_count, target_bytes // per_offset))
+
+
+def next_adaptive_cursor(
+    cursor: ScanCursorT, resp: TrScanResult, target_bytes: int, max_count: int
+) -> Optional[ScanCursorT]:
+    start = next_scan_cursor(cursor[0], resp)
+    if start is None:
+        return None
+    return start, scan_count(resp, target_bytes, max_count)
+
+
+def check_scan_args(count: int, target_bytes: int, max_count: int, chunks: bool):
+    if count <= 0 or max_count <= 0:
+        raise DataError("count and max_count must be positive")
+    if target_bytes <= 0:
+        raise DataError("target_bytes must be positive")
+    if chunks and np is None:
+        raise DataError("chunks require numpy")
+
+
+# iter_tr_scan yields every set offset of key from start_offset on. The first
+# TR.SCAN asks for count offsets, and every following one for as many as fit
+# in about target_bytes of reply, so that a large bitmap is exported in few
+# round trips and bounded memory. With prefetch the next page is requested
+# while the current one is consumed, and with chunks each page is yielded as
+# a numpy array of uint64 instead of one int at a time.
+def iter_tr_scan(
+    client,
+    key: KeyT,
+    start_offset: int = 0,
+    count: int = 1024,
+    target_bytes: int = 1 << 20,
+    max_count: int = 1 << 20,
+    prefetch: bool = True,
+    chunks: bool = False,
+) -> Iterator[Any]:
+    check_scan_args(count, target_bytes, max_count, chunks)
+
+    def fetch(cursor: ScanCursorT) -> TrScanResult:
+        return client.tr_scan(key, cursor[0], cursor[1])
+
+    def advance(cursor: ScanCursorT, resp: TrScanResult) -> Optional[ScanCursorT]:
+        return next_adaptive_cursor(cursor, resp, target_bytes, max_count)
+
+    first = (start_offset, min(count, max_count))
+    for resp in iter_pages(fetch, advance, first, prefetch):
+        if not resp.offsets:
+            continue
+        if chunks:
+            yield scan_page(resp)
+        else:
+            yield from resp.offsets
@@ -0,0 +1,220 @@
+from typing import Dict, Iterable, List, Optional
+
+from tair.exceptions import DataError, ResponseError
+from tair.typing import EncodableT, KeyT
+from tair.versioned import is_version_conflict
+
+
+def is_exists_error(error: Exception) -> bool:
+    return isinstance(error, ResponseError) and "exist" in str(error).lower()
+
+
+# filter i of a chain holds capacity * growth ** i items with an error rate of
+# error_rate * (1 - tightening) * tightening ** i, so that the error rates of
+# all the filters sum up to less than error_rate however long the chain grows.
+def filter_capacity(capacity: int, growth: float, i: int) -> int:
+    return int(capacity * growth**i)
+
+
+def filter_error_rate(error_rate: float, tightening: float, i: int) -> float:
+    return error_rate * (1 - tightening) * tightening**i
+
+
+def count_field(i: int) -> str:
+    return f"count:{i}"
+
+
+class ChainFilter:
+    def __init__(self, key: str, capacity: int, error_rate: float, count: int) -> None:
+        self.key = key
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = count
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ChainFilter):
+            return False
+        return (
+            self.key == other.key
+            and self.capacity == other.capacity
+            and self.error_rate == other.error_rate
+            and self.count == other.count
+        )
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        return (
+            "{"
+            + f"key: {self.key}, "
+            + f"capacity: {self.capacity}, "
+            + f"error_rate: {self.error_rate}, "
+            + f"count: {self.count}"
+            + "}"
+        )
+
+
+# ScalableBloom grows a chain of TairBloom filters "<name>:0", "<name>:1", ...
+# and writes to the newest one only. The TairHash "<name>:meta" holds the
+# number of filters ever created in the field "filters", whose version always
+# equals its value so that it can only be bumped with VER by one client, and
+# the number of items written to filter i in the field "count:i".
+#
+# With ttl, a filter and its count expire ttl seconds after its last write,
+# so every item is remembered for at least ttl seconds, and the sealed
+# filters drop out of the chain one after the other.
+class ScalableBloom:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        capacity: int = 100000,
+        error_rate: float = 0.01,
+        growth: float = 2,
+        tightening: float = 0.5,
+        ttl: Optional[int] = None,
+    ) -> None:
+        if capacity <= 0:
+            raise DataError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise DataError("error_rate must be between 0 and 1")
+        if growth < 1:
+            raise DataError("growth must not be less than 1")
+        if not 0 < tightening < 1:
+            raise DataError("tightening must be between 0 and 1")
+        self.client = client
+        self.name = name
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.ttl = ttl
+        self.meta = f"{name}:meta"
+
+        # _live lists the live filters, oldest first, as of the last refresh.
+        self._size = 0
+        self._live: List[int] = []
+        self._counts: Dict[int, int] = {}
+
+    def key_of(self, i: int) -> str:
+        return f"{self.name}:{i}"
+
+    def filters(self) -> List[ChainFilter]:
+        self.refresh()
+        return [
+            ChainFilter(
+                self.key_of(i),
+                filter_capacity(self.capacity, self.growth, i),
+                filter_error_rate(self.error_rate, self.tightening, i),
+                self._counts.get(i, 0),
+            )
+            for i in self._live
+        ]
+
+    def fill(self) -> float:
+        if not self._live:
+            self.refresh()
+        i = self._live[-1]
+        return self._counts.get(i, 0) / filter_capacity(self.capacity, self.growth, i)
+
+    def refresh(self) -> None:
+        size = self.client.exhget(self.meta, "filters")
+        if size is None:
+            self._grow(0)
+            return
+        size = int(size)
+        first = self._live[0] if self._live and self._live[0] < size else 0
+        indexes = list(range(first, size))
+        counts = self.client.exhmget(self.meta, [count_field(i) for i in indexes])
+
+        self._size = size
+        self._live = [i for i, c in zip(indexes, counts) if c is not None]
+        self._counts = {i: int(c) for i, c in zip(indexes, counts) if c is not None}
+        # the newest filter expired along with the whole chain.
+        if not self._live or self._live[-1] != size - 1:
+            self._grow(size)
+
+    def exists(self, item: EncodableT) -> bool:
+        return self.mexists([item])[0]
+
+    # mexists asks every live filter, newest first, in one pipelined round.
+    # The number of filters is read in the same round, and the round is
+    # repeated if another client grew the chain in the meantime.
+    def mexists(self, items: Iterable[EncodableT]) -> List[bool]:
+        items = list(items)
+        if not items:
+            return []
+        if not self._live:
+            self.refresh()
+        while True:
+            live = self._live[::-1]
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.exhget(self.meta, "filters")
+                for i in live:
+                    pipe.bf_mexists(self.key_of(i), items)
+                size, *replies = pipe.execute()
+            if size is not None and int(size) == self._size:
+                break
+            self.refresh()
+        return [any(reply[j] for reply in replies) for j in range(len(items))]
+
+    def add(self, item: EncodableT) -> bool:
+        return self.madd([item])[0]
+
+    # madd writes the items that are in none of the filters to the newest
+    # one, and returns for each item whether it was added.
+    def madd(self, items: Iterable[EncodableT]) -> List[bool]:
+        items = list(items)
+        seen = self.mexists(items)
+        added = [False] * len(items)
+        new: Dict[EncodableT, None] = {}
+        for j, (item, found) in enumerate(zip(items, seen)):
+            if not found and item not in new:
+                new[item] = None
+                added[j] = True
+        if not new:
+            return added
+
+        i = self._live[-1]
+        key = self.key_of(i)
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.bf_madd(key, list(new))
+            pipe.exhincrby(self.meta, count_field(i), len(new), ex=self.ttl)
+            if self.ttl is not None:
+                pipe.expire(key, self.ttl)
+                pipe.expire(self.meta, self.ttl)
+            count = pipe.execute()[1]
+
+        self._counts[i] = count
+        if count >= filter_capacity(self.capacity, self.growth, i):
+            self._grow(i + 1)
+        return added
+
+    def _grow(self, n: int) -> None:
+        key = self.key_of(n)
+        try:
+            self.client.bf_reserve(
+                key,
+                filter_error_rate(self.error_rate, self.tightening, n),
+                filter_capacity(self.capacity, self.growth, n),
+            )
+        except ResponseError as e:
+            # another client created it first.
+            if not is_exists_error(e):
+                raise
+
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.exhset(self.meta, count_field(n), 0, ex=self.ttl, nx=True)
+            if n == 0:
+                pipe.exhset(self.meta, "filters", 1, nx=True)
+            else:
+                pipe.exhset(self.meta, "filters", n + 1, ver=n)
+            if self.ttl is not None:
+                pipe.expire(key, self.ttl)
+                pipe.expire(self.meta, self.ttl)
+            replies = pipe.execute(raise_on_error=False)
+        for reply in replies:
+            if isinstance(reply, Exception) and not is_version_conflict(reply):
+                raise reply
+        self.refresh()
@@ -0,0 +1,248 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from tair.exceptions import DataError
+from tair.searchquery import QueryT, query_text
+from tair.stats import Stats
+from tair.typing import KeyT, ResponseT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# the commands that change the documents of their index, and so invalidate
+# the results cached for it.
+WRITE_COMMANDS = (
+    "tft_updateindex",
+    "tft_adddoc",
+    "tft_madddoc",
+    "tft_updatedocfield",
+    "tft_deldocfield",
+    "tft_incrlongdocfield",
+    "tft_incrfloatdocfield",
+    "tft_deldoc",
+    "tft_delall",
+)
+
+
+# normalize_query gives the same text for queries that differ only in
+# whitespace or in the order of keys.
+def normalize_query(query: QueryT) -> str:
+    text = query_text(query)
+    try:
+        if orjson is not None:
+            return orjson.dumps(
+                orjson.loads(text), option=orjson.OPT_SORT_KEYS
+            ).decode()
+        return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return text
+
+
+# index_name gives the name of an index as bytes, so that an index named by
+# str or by bytes has the same generation and the same cached results.
+def index_name(index: KeyT) -> bytes:
+    return index.encode() if isinstance(index, str) else bytes(index)
+
+
+# search_key builds the key a search reply is cached under.
+def search_key(indexes: Iterable[KeyT], query: QueryT, use_cache: bool) -> Tuple:
+    names = tuple(index_name(index) for index in indexes)
+    return names, normalize_query(query), use_cache
+
+
+def entry_size(key: Tuple, reply: Any) -> int:
+    return len(reply) + len(key[1]) + sum(len(index) for index in key[0])
+
+
+class SearchCacheStats(Stats):
+    FIELDS = ("hits", "misses", "stale", "evictions", "invalidations")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SearchCacheEntry:
+    def __init__(
+        self, generations: Tuple[int, ...], expires: float, reply: Any, size: int
+    ) -> None:
+        self.generations = generations
+        self.expires = expires
+        self.reply = reply
+        self.size = size
+
+
+# ResultStore holds search replies in LRU order, bounded by max_bytes, each
+# for at most ttl seconds. Every index has a generation, bumped on each
+# write, and an entry is only served while the generations of its indexes
+# are the ones read before the search was sent. A search that overlaps a
+# write is therefore never served afterwards.
+class ResultStore:
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        if ttl <= 0:
+            raise DataError("ttl must be positive")
+        if max_bytes <= 0:
+            raise DataError("max_bytes must be positive")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = SearchCacheStats()
+
+        self._entries: "OrderedDict[Tuple, SearchCacheEntry]" = OrderedDict()
+        self._generations: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+
+    def generations(self, indexes: Tuple[bytes, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(index, 0) for index in indexes)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return False, None
+            current = tuple(self._generations.get(index, 0) for index in key[0])
+            if entry.generations != current or entry.expires <= time.monotonic():
+                self._remove(key)
+                self.stats.stale += 1
+                self.stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return True, entry.reply
+
+    def put(self, key: Tuple, generations: Tuple[int, ...], reply: Any) -> None:
+        size = entry_size(key, reply)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            current = tuple(self._generations.get(index, 0) for index in key[0])
+            if generations != current:
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = SearchCacheEntry(generations, expires, reply, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def bump(self, index: KeyT) -> None:
+        name = index_name(index)
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Tuple) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+
+# SearchCache caches the replies of tft_search and tft_msearch in process,
+# keyed by the indexes and the normalized query, and can be shared between
+# threads. Its tft_* write methods go through the wrapped client and then
+# invalidate the results of their index. Writes made through other clients
+# or processes are only seen once the entries expire, after ttl seconds.
+class SearchCache:
+    def __init__(self, client, ttl: float = 30, max_bytes: int = 64 * 1024 * 1024):
+        self.client = client
+        self.store = ResultStore(ttl, max_bytes)
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        return self.store.stats
+
+    def tft_search(
+        self, index: KeyT, query: QueryT, use_cache: bool = False
+    ) -> ResponseT:
+        key = search_key((index,), query, use_cache)
+        hit, reply = self.store.get(key)
+        if hit:
+            return reply
+        generations = self.store.generations(key[0])
+        reply = self.client.tft_search(index, query_text(query), use_cache)
+        self.store.put(key, generations, reply)
+        return reply
+
+    def tft_msearch(
+        self, index_count: int, index: Iterable[KeyT], query: QueryT
+    ) -> ResponseT:
+        indexes = tuple(index)
+        key = search_key(indexes, query, False)
+        hit, reply = self.store.get(key)
+        if hit:
+            return reply
+        generations = self.store.generations(key[0])
+        reply = self.client.tft_msearch(index_count, indexes, query_text(query))
+        self.store.put(key, generations, reply)
+        return reply
+
+    def invalidate(self, index: Optional[KeyT] = None) -> None:
+        if index is None:
+            self.store.clear()
+        else:
+            self.store.bump(index)
+
+    def write(self, command: str, index: KeyT, *args, **kwargs) -> ResponseT:
+        if command not in WRITE_COMMANDS:
+            raise DataError(f"{command} is not a TairSearch write command")
+        try:
+            return getattr(self.client, command)(index, *args, **kwargs)
+        finally:
+            # the write may have been applied even if its reply was lost.
+            self.store.bump(index)
+
+    def tft_updateindex(self, index: KeyT, mappings: str) -> ResponseT:
+        return self.write("tft_updateindex", index, mappings)
+
+    def tft_adddoc(
+        self, index: KeyT, document: str, doc_id: Optional[str] = None
+    ) -> ResponseT:
+        return self.write("tft_adddoc", index, document, doc_id)
+
+    def tft_madddoc(self, index: KeyT, mapping: Dict[str, str]) -> ResponseT:
+        return self.write("tft_madddoc", index, mapping)
+
+    def tft_updatedocfield(self, index: KeyT, doc_id: str, document: str) -> ResponseT:
+        return self.write("tft_updatedocfield", index, doc_id, document)
+
+    def tft_deldocfield(self, index: KeyT, doc_id: str, fields: Iterable) -> ResponseT:
+        return self.write("tft_deldocfield", index, doc_id, fields)
+
+    def tft_incrlongdocfield(
+        self, index: KeyT, doc_id: str, field: str, increment: int
+    ) -> ResponseT:
+        return self.write("tft_incrlongdocfield", index, doc_id, field, increment)
+
+    def tft_incrfloatdocfield(
+        self, index: KeyT, doc_id: str, field: str, increment: float
+    ) -> ResponseT:
+        return self.write("tft_incrfloatdocfield", index, doc_id, field, increment)
+
+    def tft_deldoc(self, index: KeyT, doc_id: Iterable[str]) -> ResponseT:
+        return self.write("tft_deldoc", index, doc_id)
+
+    def tft_delall(self, index: KeyT) -> ResponseT:
+        return self.write("tft_delall", index)
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from tair.exceptions import ConnectionError, DataError, TimeoutError
+from tair.inflight import iter_in_flight
+from tair.stats import Stats
+from tair.typing import KeyT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DocBatchT = List[Tuple[str, bytes]]
+
+# errors after which a batch is sent again, every other error fails it.
+RETRYABLE_ERRORS = (ConnectionError, TimeoutError)
+
+
+def dumps_doc(doc: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(doc)
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# documents already given as JSON text are sent as they are.
+def encode_doc(doc: Any, dumps: Callable[[Any], Any]) -> bytes:
+    if isinstance(doc, bytes):
+        return doc
+    if isinstance(doc, str):
+        return doc.encode()
+    data = dumps(doc)
+    return data.encode() if isinstance(data, str) else data
+
+
+# batch_docs encodes the documents and cuts them into batches of at most
+# batch_size documents or batch_bytes bytes, whichever comes first.
+def batch_docs(
+    docs: Iterable[Tuple[str, Any]],
+    batch_size: int,
+    batch_bytes: int,
+    dumps: Callable[[Any], Any],
+) -> Iterator[DocBatchT]:
+    batch: DocBatchT = []
+    size = 0
+    for doc_id, doc in docs:
+        data = encode_doc(doc, dumps)
+        batch.append((doc_id, data))
+        size += len(data)
+        if len(batch) >= batch_size or size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+# madddoc_args builds the arguments of TFT.MADDDOC directly, since the
+# mapping taken by tft_madddoc is keyed by document and would merge
+# identical documents.
+def madddoc_args(index: KeyT, batch: DocBatchT) -> List[Any]:
+    pieces: List[Any] = [index]
+    for doc_id, data in batch:
+        pieces.append(data)
+        pieces.append(doc_id)
+    return pieces
+
+
+class IndexStats(Stats):
+    FIELDS = (
+        "docs",
+        "bytes",
+        "batches",
+        "retries",
+        "failed",
+        "elapsed:.3f",
+        "docs_per_sec:.0f",
+        "bytes_per_sec:.0f",
+    )
+
+    def __init__(self) -> None:
+        self.docs = 0
+        self.bytes = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def record(self, batch: DocBatchT, ok: bool) -> None:
+        if not ok:
+            self.failed += len(batch)
+            return
+        self.docs += len(batch)
+        self.bytes += sum(len(data) for _, data in batch)
+        self.batches += 1
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.docs / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def check_indexer_args(
+    batch_size: int, batch_bytes: int, in_flight: int, retries: int
+) -> None:
+    if batch_size <= 0:
+        raise DataError("batch_size must be positive")
+    if batch_bytes <= 0:
+        raise DataError("batch_bytes must be positive")
+    if in_flight <= 0:
+        raise DataError("in_flight must be positive")
+    if retries < 0:
+        raise DataError("retries must not be negative")
+
+
+# BulkIndexer loads a stream of (doc_id, doc) pairs into a TairSearch index.
+# Documents are serialized with orjson when it is installed, and sent with
+# TFT.MADDDOC in batches bounded by count and by size, so that no single
+# command stalls the server. Up to in_flight batches are sent concurrently,
+# each over a connection of its own. A batch that fails with a connection
+# error or a timeout is sent again up to retries times with exponential
+# backoff. Batches that still fail raise, or with raise_on_error=False have
+# their doc ids collected in failed_ids.
+class BulkIndexer:
+    def __init__(
+        self,
+        client,
+        index: KeyT,
+        batch_size: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.1,
+        raise_on_error: bool = True,
+        dumps: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        check_indexer_args(batch_size, batch_bytes, in_flight, retries)
+        self.client = client
+        self.index = index
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.in_flight = in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self.raise_on_error = raise_on_error
+        self.dumps = dumps if dumps is not None else dumps_doc
+        self.stats = IndexStats()
+        self.failed_ids: List[str] = []
+
+        self._lock = threading.Lock()
+
+    def send(self, batch: DocBatchT) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                self.client.execute_command(
+                    "TFT.MADDDOC", *madddoc_args(self.index, batch)
+                )
+                return
+            except RETRYABLE_ERRORS:
+                if attempt == self.retries:
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+                time.sleep(self.backoff * 2**attempt)
+
+    def add(self, docs: Iterable[Tuple[str, Any]]) -> IndexStats:
+        batches = batch_docs(docs, self.batch_size, self.batch_bytes, self.dumps)
+        return self.add_batches(batches)
+
+    # add_batches sends batches already cut by batch_docs, and calls done
+    # after each one has been sent or has failed, in the order of batches.
+    def add_batches(
+        self,
+        batches: Iterable[DocBatchT],
+        done: Optional[Callable[[], None]] = None,
+    ) -> IndexStats:
+        start = time.perf_counter()
+        elapsed = self.stats.elapsed
+        for batch, future in iter_in_flight(self.send, batches, self.in_flight):
+            try:
+                future.result()
+                self.stats.record(batch, True)
+            except Exception:
+                self.stats.record(batch, False)
+                if self.raise_on_error:
+                    raise
+                self.failed_ids.extend(doc_id for doc_id, _ in batch)
+            finally:
+                self.stats.elapsed = elapsed + time.perf_counter() - start
+            if done is not None:
+                done()
+        self.stats.elapsed = elapsed + time.perf_counter() - start
+        return self.stats
@@ -0,0 +1,326 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from tair.exceptions import DataError
+from tair.stats import Stats
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PARAM_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# a parameter is serialized as this marker, which is then cut out of the text.
+PARAM_MARKER = re.compile(r'"\\u0000param:([A-Za-z0-9_]+)\\u0000"')
+
+
+def dumps_query(data: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=default).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+# Param stands for a value that is only known when the query is run.
+class Param:
+    def __init__(self, name: str) -> None:
+        if not PARAM_NAME.match(name):
+            raise DataError(f"invalid parameter name: {name!r}")
+        self.name = name
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Param) and self.name == other.name
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __repr__(self) -> str:
+        return f"Param({self.name!r})"
+
+
+ValueT = Union[Any, Param]
+
+
+def to_dict(clause: Any) -> Any:
+    return clause.to_dict() if hasattr(clause, "to_dict") else clause
+
+
+def without_none(**kwargs) -> Dict[str, Any]:
+    return {name: value for name, value in kwargs.items() if value is not None}
+
+
+class MatchAll:
+    def to_dict(self) -> Dict[str, Any]:
+        return {"match_all": {}}
+
+
+class Term:
+    def __init__(self, field: str, value: ValueT) -> None:
+        self.field = field
+        self.value = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"term": {self.field: self.value}}
+
+
+class Terms:
+    def __init__(self, field: str, values: Union[Iterable[Any], Param]) -> None:
+        self.field = field
+        self.values = values if isinstance(values, Param) else list(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"terms": {self.field: self.values}}
+
+
+class Prefix:
+    def __init__(self, field: str, value: ValueT) -> None:
+        self.field = field
+        self.value = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"prefix": {self.field: self.value}}
+
+
+class Match:
+    def __init__(
+        self, field: str, query: ValueT, operator: Optional[str] = None
+    ) -> None:
+        if operator is not None and operator.lower() not in ("and", "or"):
+            raise DataError("operator must be 'and' or 'or'")
+        self.field = field
+        self.query = query
+        self.operator = operator
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.operator is None:
+            return {"match": {self.field: self.query}}
+        return {"match": {self.field: {"query": self.query, "operator": self.operator}}}
+
+
+class Range:
+    def __init__(
+        self,
+        field: str,
+        gt: Optional[ValueT] = None,
+        gte: Optional[ValueT] = None,
+        lt: Optional[ValueT] = None,
+        lte: Optional[ValueT] = None,
+    ) -> None:
+        if gt is None and gte is None and lt is None and lte is None:
+            raise DataError("at least one bound is required")
+        self.field = field
+        self.bounds = without_none(gt=gt, gte=gte, lt=lt, lte=lte)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"range": {self.field: self.bounds}}
+
+
+class Bool:
+    def __init__(
+        self,
+        must: Iterable[Any] = (),
+        should: Iterable[Any] = (),
+        must_not: Iterable[Any] = (),
+        filter: Iterable[Any] = (),
+        minimum_should_match: Optional[int] = None,
+    ) -> None:
+        self.must = list(must)
+        self.should = list(should)
+        self.must_not = list(must_not)
+        self.filter = list(filter)
+        self.minimum_should_match = minimum_should_match
+
+    def to_dict(self) -> Dict[str, Any]:
+        clauses = {}
+        for name in ("must", "should", "must_not", "filter"):
+            children = getattr(self, name)
+            if children:
+                clauses[name] = [to_dict(child) for child in children]
+        if self.minimum_should_match is not None:
+            clauses["minimum_should_match"] = self.minimum_should_match
+        return {"bool": clauses}
+
+
+class TermsAgg:
+    def __init__(
+        self, field: str, size: Optional[int] = None, order: Optional[dict] = None
+    ) -> None:
+        self.field = field
+        self.size = size
+        self.order = order
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "terms": without_none(field=self.field, size=self.size, order=self.order)
+        }
+
+
+# MetricAgg is one of the single value aggregations: sum, max, min, avg,
+# value_count, stats and extended_stats.
+class MetricAgg:
+    KINDS = ("sum", "max", "min", "avg", "value_count", "stats", "extended_stats")
+
+    def __init__(self, kind: str, field: str) -> None:
+        if kind not in self.KINDS:
+            raise DataError(f"unknown aggregation: {kind}")
+        self.kind = kind
+        self.field = field
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {self.kind: {"field": self.field}}
+
+
+# SearchQuery builds the DSL passed to tft_search, tft_msearch,
+# tft_explaincost and tft_explainscore, which also accept it in place of
+# the JSON text. Its methods return the query itself so that calls chain.
+class SearchQuery:
+    def __init__(self, query: Any = None) -> None:
+        self.query = query
+        self.sorts: List[Dict[str, Any]] = []
+        self.offset: Optional[ValueT] = None
+        self.size: Optional[ValueT] = None
+        self.aggs: Dict[str, Any] = {}
+        self.includes: Optional[List[str]] = None
+        self.excludes: Optional[List[str]] = None
+
+    def sort(self, field: str, order: str = "asc") -> "SearchQuery":
+        if order not in ("asc", "desc"):
+            raise DataError("order must be 'asc' or 'desc'")
+        self.sorts.append({field: {"order": order}})
+        return self
+
+    def page(self, offset: ValueT = 0, size: ValueT = 10) -> "SearchQuery":
+        self.offset = offset
+        self.size = size
+        return self
+
+    def aggregate(self, name: str, agg: Any) -> "SearchQuery":
+        self.aggs[name] = agg
+        return self
+
+    def source(
+        self,
+        includes: Optional[Iterable[str]] = None,
+        excludes: Optional[Iterable[str]] = None,
+    ) -> "SearchQuery":
+        self.includes = None if includes is None else list(includes)
+        self.excludes = None if excludes is None else list(excludes)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        if self.query is not None:
+            data["query"] = to_dict(self.query)
+        if self.sorts:
+            data["sort"] = self.sorts
+        if self.offset is not None:
+            data["from"] = self.offset
+        if self.size is not None:
+            data["size"] = self.size
+        if self.aggs:
+            data["aggs"] = {name: to_dict(agg) for name, agg in self.aggs.items()}
+        if self.includes is not None or self.excludes is not None:
+            data["_source"] = without_none(
+                includes=self.includes, excludes=self.excludes
+            )
+        return data
+
+    def to_json(self) -> str:
+        return self.compile().render()
+
+    def compile(self) -> "CompiledQuery":
+        return CompiledQuery(self.to_dict())
+
+    def __str__(self) -> str:
+        return self.to_json()
+
+
+def param_marker(value: Any) -> str:
+    if isinstance(value, Param):
+        return f"\x00param:{value.name}\x00"
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+# CompiledQuery serializes a query once, leaving a hole for every Param.
+# render() then only encodes the parameter values and joins the pieces.
+class CompiledQuery:
+    def __init__(self, data: Dict[str, Any]) -> None:
+        pieces = PARAM_MARKER.split(dumps_query(data, default=param_marker))
+        self.parts = pieces[0::2]
+        self.names = pieces[1::2]
+        self.params = list(dict.fromkeys(self.names))
+
+    def render(self, params: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        if not self.names:
+            return self.parts[0]
+        values = kwargs if params is None else dict(params, **kwargs)
+        try:
+            encoded = {name: dumps_query(values[name]) for name in self.params}
+        except KeyError as e:
+            raise DataError(f"missing parameter: {e.args[0]}") from None
+        pieces = [self.parts[0]]
+        for name, part in zip(self.names, self.parts[1:]):
+            pieces.append(encoded[name])
+            pieces.append(part)
+        return "".join(pieces)
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+class QueryCacheStats(Stats):
+    FIELDS = ("hits", "misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+# QueryCache keeps the most recently used compiled queries by key, so that a
+# hot query is built and serialized once. build is only called on a miss.
+class QueryCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize <= 0:
+            raise DataError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.stats = QueryCacheStats()
+
+        self._queries: "OrderedDict[Any, CompiledQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, build: Callable[[], SearchQuery]) -> CompiledQuery:
+        with self._lock:
+            compiled = self._queries.get(key)
+            if compiled is not None:
+                self._queries.move_to_end(key)
+                self.stats.hits += 1
+                return compiled
+            self.stats.misses += 1
+
+        compiled = build().compile()
+        with self._lock:
+            self._queries[key] = compiled
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.maxsize:
+                self._queries.popitem(last=False)
+        return compiled
+
+    def render(self, key: Any, build: Callable[[], SearchQuery], **params) -> str:
+        return self.get(key, build).render(params)
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+
+QueryT = Union[str, SearchQuery, CompiledQuery]
+
+
+def query_text(query: QueryT) -> str:
+    if isinstance(query, (SearchQuery, CompiledQuery)):
+        return str(query)
+    return query
@@ -0,0 +1,206 @@
+import time
+from collections import deque
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from tair.exceptions import DataError
+from tair.searchindexer import BulkIndexer, DocBatchT, IndexStats, batch_docs
+from tair.searchresult import find_value, loads_json, value_end
+from tair.tairsearch import ScandocidResult
+from tair.typing import KeyT
+from tair.zsetiter import iter_pages
+
+TransformT = Callable[[str, Any], Any]
+
+
+class ReindexStats(IndexStats):
+    FIELDS = (
+        "scanned",
+        "missing",
+        "skipped",
+        "docs",
+        "bytes",
+        "batches",
+        "retries",
+        "failed",
+        "elapsed:.3f",
+        "docs_per_sec:.0f",
+    )
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.scanned = 0
+        self.missing = 0
+        self.skipped = 0
+
+
+# source_text cuts the _source out of a TFT.GETDOC reply without decoding it.
+def source_text(reply: str) -> Optional[str]:
+    start = find_value(reply, ("_source",))
+    if start is None:
+        return None
+    return reply[start : value_end(reply, start)]
+
+
+def next_scan_cursor(cursor: str, page: ScandocidResult) -> Optional[str]:
+    return None if page.cursor == "0" else page.cursor
+
+
+# page_docs pairs the doc ids of a page with their documents, as JSON text,
+# or as returned by transform when there is one. Documents deleted since the
+# scan and the ones transform returns None for are left out.
+def page_docs(
+    doc_ids: List[str],
+    replies: List[Optional[str]],
+    transform: Optional[TransformT],
+    stats: ReindexStats,
+) -> List[Tuple[str, Any]]:
+    docs = []
+    for doc_id, reply in zip(doc_ids, replies):
+        source = None if reply is None else source_text(reply)
+        if source is None:
+            stats.missing += 1
+            continue
+        if transform is not None:
+            source = transform(doc_id, loads_json(source))
+            if source is None:
+                stats.skipped += 1
+                continue
+        docs.append((doc_id, source))
+    return docs
+
+
+def check_reindex_args(scan_count: int, max_docs_per_sec: Optional[float]) -> None:
+    if scan_count <= 0:
+        raise DataError("scan_count must be positive")
+    if max_docs_per_sec is not None and max_docs_per_sec <= 0:
+        raise DataError("max_docs_per_sec must be positive")
+
+
+# throttle_delay returns how long to wait before sending more documents, so
+# that no more than max_docs_per_sec are sent on average since start.
+def throttle_delay(start: float, docs: int, max_docs_per_sec: Optional[float]) -> float:
+    if max_docs_per_sec is None:
+        return 0.0
+    return start + docs / max_docs_per_sec - time.perf_counter()
+
+
+# Reindexer copies the documents of a TairSearch index into another one,
+# for instance one created with new mappings, possibly through another
+# client to copy them across clusters. The doc ids are paged with
+# TFT.SCANDOCID, the next page being fetched while the current one is
+# copied, the documents of a page are read with one pipeline of TFT.GETDOC,
+# passed through transform if given, and written by a BulkIndexer: in
+# batches of TFT.MADDDOC, up to in_flight at once, retried on connection
+# errors. Without transform, the _source of a document is copied as it is,
+# never decoded. max_docs_per_sec bounds the rate of the writes.
+#
+# cursor is the TFT.SCANDOCID cursor up to which every document has been
+# written, and None once the whole index has been. A copy that stopped can
+# be resumed by passing it to run again, and checkpoint is called with it
+# every time it moves.
+class Reindexer:
+    def __init__(
+        self,
+        source,
+        source_index: KeyT,
+        dest_index: KeyT,
+        dest=None,
+        transform: Optional[TransformT] = None,
+        match: Optional[str] = None,
+        scan_count: int = 1000,
+        batch_size: int = 1000,
+        batch_bytes: int = 4 * 1024 * 1024,
+        in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_docs_per_sec: Optional[float] = None,
+        raise_on_error: bool = True,
+    ) -> None:
+        check_reindex_args(scan_count, max_docs_per_sec)
+        self.source = source
+        self.source_index = source_index
+        self.transform = transform
+        self.match = match
+        self.scan_count = scan_count
+        self.max_docs_per_sec = max_docs_per_sec
+        self.cursor: Optional[str] = "0"
+        self.indexer = BulkIndexer(
+            dest if dest is not None else source,
+            dest_index,
+            batch_size=batch_size,
+            batch_bytes=batch_bytes,
+            in_flight=in_flight,
+            retries=retries,
+            backoff=backoff,
+            raise_on_error=raise_on_error,
+        )
+        self.stats = self.indexer.stats = ReindexStats()
+
+    @property
+    def failed_ids(self) -> List[str]:
+        return self.indexer.failed_ids
+
+    def scan(self, cursor: str) -> ScandocidResult:
+        return self.source.tft_scandocid(
+            self.source_index, cursor, match=self.match, count=self.scan_count
+        )
+
+    def iter_scan_pages(self, cursor: str) -> Iterator[ScandocidResult]:
+        return iter_pages(self.scan, next_scan_cursor, cursor, prefetch=True)
+
+    def get_docs(self, doc_ids: List[str]) -> List[Tuple[str, Any]]:
+        if not doc_ids:
+            return []
+        with self.source.pipeline(transaction=False) as pipe:
+            for doc_id in doc_ids:
+                pipe.tft_getdoc(self.source_index, doc_id)
+            replies = pipe.execute()
+        return page_docs(doc_ids, replies, self.transform, self.stats)
+
+    def run(
+        self,
+        cursor: Optional[str] = "0",
+        checkpoint: Optional[Callable[[Optional[str]], None]] = None,
+    ) -> ReindexStats:
+        self.cursor = cursor
+        if cursor is None:
+            return self.stats
+        indexer = self.indexer
+        start = time.perf_counter()
+        # the cursor reached after each page, with the number of batches
+        # that had been sent by then.
+        marks: "deque[Tuple[int, Optional[str]]]" = deque()
+        submitted = 0
+        finished = 0
+
+        def commit() -> None:
+            while marks and marks[0][0] <= finished:
+                self.cursor = marks.popleft()[1]
+                if checkpoint is not None:
+                    checkpoint(self.cursor)
+
+        def batches() -> Iterator[DocBatchT]:
+            nonlocal submitted
+            sent = 0
+            for page in self.iter_scan_pages(cursor):
+                self.stats.scanned += len(page.doc_ids)
+                docs = self.get_docs(page.doc_ids)
+                for batch in batch_docs(
+                    docs, indexer.batch_size, indexer.batch_bytes, indexer.dumps
+                ):
+                    delay = throttle_delay(start, sent, self.max_docs_per_sec)
+                    if delay > 0:
+                        time.sleep(delay)
+                    submitted += 1
+                    sent += len(batch)
+                    yield batch
+                marks.append((submitted, next_scan_cursor(cursor, page)))
+                commit()
+
+        def done() -> None:
+            nonlocal finished
+            finished += 1
+            commit()
+
+        indexer.add_batches(batches(), done)
+        return self.stats
@@ -0,0 +1,321 @@
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from tair.exceptions import DataError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+SCALAR = re.compile(r"[^,:}\]\s]+")
+# everything up to the next bracket outside of a string.
+NESTED = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*', re.S)
+
+SpanT = Tuple[int, int]
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def skip_whitespace(s: str, i: int) -> int:
+    return WHITESPACE.match(s, i).end()
+
+
+def expect(s: str, i: int, char: str) -> int:
+    if i >= len(s) or s[i] != char:
+        raise DataError(f"malformed search result: expected {char!r} at {i}")
+    return skip_whitespace(s, i + 1)
+
+
+# value_end returns where the JSON value starting at i ends, without
+# decoding it.
+def value_end(s: str, i: int) -> int:
+    if i >= len(s):
+        raise DataError("malformed search result: truncated")
+    if s[i] == '"':
+        m = STRING.match(s, i)
+    elif s[i] not in "{[":
+        m = SCALAR.match(s, i)
+    else:
+        depth = 0
+        while i < len(s):
+            if s[i] == "{" or s[i] == "[":
+                depth += 1
+            elif s[i] == "}" or s[i] == "]":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            else:
+                break
+            i = NESTED.match(s, i + 1).end()
+        m = None
+    if m is None:
+        raise DataError("malformed search result: truncated")
+    return m.end()
+
+
+def decode_key(token: str) -> str:
+    if "\\" in token:
+        return json.loads(token)
+    return token[1:-1]
+
+
+def read_key(s: str, i: int) -> Tuple[str, int]:
+    m = STRING.match(s, i)
+    if m is None:
+        raise DataError(f"malformed search result: expected a key at {i}")
+    return decode_key(m.group()), expect(s, skip_whitespace(s, m.end()), ":")
+
+
+# next_item returns where the member or element after the value ending at
+# end starts, or None at the end of the object or array.
+def next_item(s: str, end: int, close: str) -> Optional[int]:
+    i = skip_whitespace(s, end)
+    if i < len(s) and s[i] == ",":
+        return skip_whitespace(s, i + 1)
+    expect(s, i, close)
+    return None
+
+
+# iter_members yields the key and the span of the value of every member of
+# the object starting at i.
+def iter_members(s: str, i: int) -> Iterator[Tuple[str, SpanT]]:
+    i = expect(s, i, "{")
+    if i < len(s) and s[i] == "}":
+        return
+    while i is not None:
+        name, start = read_key(s, i)
+        end = value_end(s, start)
+        yield name, (start, end)
+        i = next_item(s, end, "}")
+
+
+# iter_elements yields the span of every element of the array starting at i.
+def iter_elements(s: str, i: int) -> Iterator[SpanT]:
+    i = expect(s, i, "[")
+    if i < len(s) and s[i] == "]":
+        return
+    while i is not None:
+        end = value_end(s, i)
+        yield i, end
+        i = next_item(s, end, "]")
+
+
+# find_value returns where the value at path starts. The values before it
+# are skipped, and the ones after it are not looked at.
+def find_value(s: str, path: Sequence[str]) -> Optional[int]:
+    i = skip_whitespace(s, 0)
+    for key in path:
+        if i >= len(s) or s[i] != "{":
+            return None
+        i = expect(s, i, "{")
+        if i < len(s) and s[i] == "}":
+            return None
+        while True:
+            name, start = read_key(s, i)
+            if name == key:
+                i = start
+                break
+            i = next_item(s, value_end(s, start), "}")
+            if i is None:
+                return None
+    return i
+
+
+# SearchHit is one hit of a search result. When it comes from the text of a
+# reply, its _source is kept as JSON text and decoded on first access.
+class SearchHit:
+    def __init__(
+        self,
+        id: Optional[str],
+        score: Optional[float],
+        index: Optional[str],
+        source: Any = None,
+        fields: Optional[Dict[str, Any]] = None,
+        raw_source: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.score = score
+        self.index = index
+        self.fields = fields if fields is not None else {}
+        self._source = source
+        self._raw_source = raw_source
+
+    @property
+    def source(self) -> Any:
+        if self._raw_source is not None:
+            self._source = loads_json(self._raw_source)
+            self._raw_source = None
+        return self._source
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SearchHit):
+            return False
+        return (
+            self.id == other.id
+            and self.score == other.score
+            and self.index == other.index
+            and self.source == other.source
+            and self.fields == other.fields
+        )
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        return (
+            "{"
+            + f"id: {self.id}, "
+            + f"score: {self.score}, "
+            + f"index: {self.index}, "
+            + f"source: {self.source}"
+            + "}"
+        )
+
+
+HIT_KEYS = ("_id", "_score", "_index", "_source")
+
+
+def to_hit(hit: Dict[str, Any]) -> SearchHit:
+    fields = {name: value for name, value in hit.items() if name not in HIT_KEYS}
+    return SearchHit(
+        hit.get("_id"), hit.get("_score"), hit.get("_index"), hit.get("_source"), fields
+    )
+
+
+def scan_hit(s: str, i: int) -> SearchHit:
+    id = score = index = raw_source = None
+    fields = {}
+    for name, (start, end) in iter_members(s, i):
+        if name == "_source":
+            raw_source = s[start:end]
+        elif name == "_id":
+            id = loads_json(s[start:end])
+        elif name == "_score":
+            score = loads_json(s[start:end])
+        elif name == "_index":
+            index = loads_json(s[start:end])
+        else:
+            fields[name] = loads_json(s[start:end])
+    return SearchHit(id, score, index, fields=fields, raw_source=raw_source)
+
+
+def get_path(data: Any, path: Sequence[str]) -> Any:
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+# SearchResult wraps the JSON reply of TFT.SEARCH or TFT.MSEARCH. The reply
+# is not decoded as a whole: the text is walked to the parts asked for, which
+# are decoded with orjson when it is installed, and a hit is decoded without
+# its _source until that is accessed. data decodes the whole reply, after
+# which every part is read from it.
+#
+# With stream=True, iter_buckets also decodes the buckets of an aggregation
+# one at a time instead of all at once. The walk runs in Python, so it is
+# slower than one orjson decode, but it keeps memory bounded for replies with
+# large sources or aggregations.
+class SearchResult:
+    def __init__(self, reply: Union[str, bytes], stream: bool = False) -> None:
+        if isinstance(reply, bytes):
+            reply = reply.decode()
+        self.raw = reply
+        self.stream = stream
+        self._data = None
+        self._hits: Optional[List[SearchHit]] = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = loads_json(self.raw)
+        return self._data
+
+    def get(self, path: Sequence[str]) -> Any:
+        if self._data is not None:
+            return get_path(self._data, path)
+        start = find_value(self.raw, path)
+        if start is None:
+            return None
+        return loads_json(self.raw[start : value_end(self.raw, start)])
+
+    def iter_hits(self) -> Iterator[SearchHit]:
+        if self._data is not None:
+            for hit in get_path(self._data, ("hits", "hits")) or []:
+                yield to_hit(hit)
+            return
+        start = find_value(self.raw, ("hits", "hits"))
+        if start is not None:
+            for i, _ in iter_elements(self.raw, start):
+                yield scan_hit(self.raw, i)
+
+    def iter_buckets(self, name: str) -> Iterator[Any]:
+        path = ("aggregations", name, "buckets")
+        if not self.stream:
+            yield from self.get(path) or []
+            return
+        start = find_value(self.raw, path)
+        if start is not None:
+            for i, end in iter_elements(self.raw, start):
+                yield loads_json(self.raw[i:end])
+
+    @property
+    def hits(self) -> List[SearchHit]:
+        if self._hits is None:
+            self._hits = list(self.iter_hits())
+        return self._hits
+
+    @property
+    def ids(self) -> List[str]:
+        return [hit.id for hit in self.hits]
+
+    @property
+    def scores(self) -> List[float]:
+        return [hit.score for hit in self.hits]
+
+    @property
+    def total(self) -> int:
+        total = self.get(("hits", "total"))
+        if isinstance(total, dict):
+            return total.get("value", 0)
+        return 0 if total is None else total
+
+    @property
+    def max_score(self) -> Optional[float]:
+        return self.get(("hits", "max_score"))
+
+    @property
+    def aggregations(self) -> Dict[str, Any]:
+        return self.get(("aggregations",)) or {}
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __iter__(self) -> Iterator[SearchHit]:
+        return iter(self.hits)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SearchResult):
+            return False
+        return self.data == other.data
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        return (
+            "{"
+            + f"total: {self.total}, "
+            + f"max_score: {self.max_score}, "
+            + f"ids: {self.ids}"
+            + "}"
+        )
@@ -0,0 +1,222 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tair.exceptions import DataError
+from tair.searchquery import QueryT, dumps_query, query_text
+from tair.searchresult import loads_json
+from tair.typing import KeyT
+
+# the aggregations whose per-shard results can be merged. avg is asked for
+# as stats, which carries the sum and count needed to merge it.
+MERGEABLE_AGGS = ("terms", "sum", "min", "max", "value_count", "avg", "stats")
+
+# a query may name its aggregations under either key.
+AGGS_KEYS = ("aggs", "aggregations")
+
+
+# group_indexes groups the indexes by slot, since TFT.MSEARCH only takes
+# indexes of one slot. Without a cluster they all go in one group.
+def group_indexes(client, indexes: Sequence[KeyT]) -> List[List[KeyT]]:
+    if not hasattr(client, "keyslot"):
+        return [list(indexes)]
+    groups: Dict[int, List[KeyT]] = {}
+    for index in indexes:
+        groups.setdefault(client.keyslot(index), []).append(index)
+    return list(groups.values())
+
+
+def query_aggs(query: Dict[str, Any]) -> Dict[str, Any]:
+    aggs: Dict[str, Any] = {}
+    for key in AGGS_KEYS:
+        aggs.update(query.get(key) or {})
+    return aggs
+
+
+def agg_kind(agg: Dict[str, Any]) -> str:
+    kinds = list(agg)
+    if len(kinds) != 1 or kinds[0] not in MERGEABLE_AGGS:
+        raise DataError(f"aggregation cannot be merged across indexes: {agg}")
+    return kinds[0]
+
+
+# shard_query rewrites the query sent to every group: each one returns the
+# first from + size hits, terms aggregations return more buckets than asked
+# for, so that the merged counts are closer to exact, and avg becomes stats.
+def shard_query(query: Dict[str, Any]) -> Tuple[Dict[str, Any], int, int]:
+    offset = query.get("from", 0)
+    size = query.get("size", 10)
+    if offset < 0 or size < 0:
+        raise DataError("from and size must not be negative")
+    shard = copy.deepcopy(query)
+    shard["from"] = 0
+    shard["size"] = offset + size
+    for agg in query_aggs(shard).values():
+        kind = agg_kind(agg)
+        if kind == "terms":
+            terms = agg["terms"]
+            terms["size"] = terms.get("size", 10) * 3 // 2 + 10
+        elif kind == "avg":
+            agg["stats"] = agg.pop("avg")
+    return shard, offset, size
+
+
+def sort_value(hit: Dict[str, Any], field: str) -> Any:
+    if field == "_score":
+        return hit.get("_score")
+    source = hit.get("_source")
+    return source.get(field) if isinstance(source, dict) else None
+
+
+def missing_last(value: Any, descending: bool) -> Tuple[bool, Any]:
+    if descending:
+        return value is not None, value
+    return value is None, value
+
+
+def sort_specs(query: Dict[str, Any]) -> List[Tuple[str, bool]]:
+    specs = []
+    for spec in query.get("sort", []):
+        if isinstance(spec, str):
+            specs.append((spec, spec == "_score"))
+            continue
+        for field, order in spec.items():
+            if isinstance(order, dict):
+                order = order.get("order", "desc" if field == "_score" else "asc")
+            specs.append((field, order == "desc"))
+    return specs or [("_score", True)]
+
+
+# merge_hits sorts the hits of all groups with the sort of the query, by
+# score when it has none. Fields other than _score are read from _source,
+# and _doc keeps the order of the groups. Hits missing a value come last.
+def merge_hits(
+    replies: List[Dict[str, Any]], specs: List[Tuple[str, bool]]
+) -> List[Dict[str, Any]]:
+    hits = [hit for reply in replies for hit in reply.get("hits", {}).get("hits", [])]
+    for field, descending in reversed(specs):
+        if field != "_doc":
+            hits.sort(
+                key=lambda hit: missing_last(sort_value(hit, field), descending),
+                reverse=descending,
+            )
+    return hits
+
+
+def merge_total(replies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    value = 0
+    relation = "eq"
+    for reply in replies:
+        total = reply.get("hits", {}).get("total", 0)
+        if isinstance(total, dict):
+            value += total.get("value", 0)
+            if total.get("relation", "eq") != "eq":
+                relation = "gte"
+        else:
+            value += total
+    return {"relation": relation, "value": value}
+
+
+def merge_terms(results: List[Dict[str, Any]], size: int) -> Dict[str, Any]:
+    counts: Dict[Any, int] = {}
+    for result in results:
+        for bucket in result.get("buckets", []):
+            counts[bucket["key"]] = counts.get(bucket["key"], 0) + bucket["doc_count"]
+    buckets = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    return {"buckets": [{"key": k, "doc_count": c} for k, c in buckets[:size]]}
+
+
+def merge_stats(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    results = [result for result in results if result.get("count")]
+    if not results:
+        return {"count": 0, "min": None, "max": None, "avg": None, "sum": 0}
+    count = sum(result["count"] for result in results)
+    total = sum(result["sum"] for result in results)
+    return {
+        "count": count,
+        "min": min(result["min"] for result in results),
+        "max": max(result["max"] for result in results),
+        "avg": total / count,
+        "sum": total,
+    }
+
+
+def merge_values(results: List[Dict[str, Any]], fn) -> Dict[str, Any]:
+    values = [r.get("value") for r in results if r.get("value") is not None]
+    return {"value": fn(values) if values else None}
+
+
+def merge_aggs(query: Dict[str, Any], replies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = {}
+    for name, agg in query_aggs(query).items():
+        kind = agg_kind(agg)
+        results = [
+            reply["aggregations"][name]
+            for reply in replies
+            if name in reply.get("aggregations", {})
+        ]
+        if kind == "terms":
+            merged[name] = merge_terms(results, agg["terms"].get("size", 10))
+        elif kind == "stats":
+            merged[name] = merge_stats(results)
+        elif kind == "avg":
+            merged[name] = {"value": merge_stats(results)["avg"]}
+        elif kind == "min":
+            merged[name] = merge_values(results, min)
+        elif kind == "max":
+            merged[name] = merge_values(results, max)
+        else:
+            merged[name] = {"value": sum(r.get("value") or 0 for r in results)}
+    return merged
+
+
+def merge_replies(query: Dict[str, Any], replies: List[Any], offset: int, size: int):
+    replies = [loads_json(reply) for reply in replies]
+    hits = merge_hits(replies, sort_specs(query))
+    scores = [hit["_score"] for hit in hits if hit.get("_score") is not None]
+    merged = {
+        "hits": {
+            "hits": hits[offset : offset + size],
+            "max_score": max(scores) if scores else None,
+            "total": merge_total(replies),
+        }
+    }
+    if query_aggs(query):
+        merged["aggregations"] = merge_aggs(query, replies)
+    return dumps_query(merged)
+
+
+def search_group(client, group: List[KeyT], query: str) -> Any:
+    if len(group) == 1:
+        return client.tft_search(group[0], query)
+    return client.tft_msearch(len(group), group, query)
+
+
+# scatter_search runs query over indexes that may live in different slots
+# and nodes of a cluster, such as one index per day. The indexes of every
+# slot are searched together with TFT.MSEARCH, or TFT.SEARCH for a single
+# one, all groups concurrently, and the replies are merged into one in the
+# format of TFT.SEARCH: hits sorted by score or by the sort of the query and
+# paged with its from and size, and terms, sum, min, max, value_count, avg
+# and stats aggregations combined.
+def scatter_search(
+    client, indexes: Sequence[KeyT], query: QueryT, max_workers: Optional[int] = None
+) -> str:
+    if not indexes:
+        raise DataError("at least one index is required")
+    if len(indexes) == 1:
+        return client.tft_search(indexes[0], query_text(query))
+    parsed = loads_json(query_text(query))
+    shard, offset, size = shard_query(parsed)
+    text = dumps_query(shard)
+    groups = group_indexes(client, indexes)
+    if len(groups) == 1:
+        replies = [search_group(client, groups[0], text)]
+    else:
+        workers = min(len(groups), max_workers or len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(search_group, client, group, text) for group in groups
+            ]
+            replies = [future.result() for future in futures]
+    return merge_replies(parsed, replies, offset, size)
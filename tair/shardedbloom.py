@@ -0,0 +1,119 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tair.exceptions import DataError
+from tair.leaderboard import shard_index
+from tair.typing import EncodableT, KeyT
+
+# a shard is kept below this size so that no key becomes a big key.
+MAX_SHARD_BYTES = 64 * 1024 * 1024
+
+
+def bloom_bytes(capacity: int, error_rate: float) -> int:
+    return math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2 / 8)
+
+
+def default_shards(capacity: int, error_rate: float) -> int:
+    return max(1, math.ceil(bloom_bytes(capacity, error_rate) / MAX_SHARD_BYTES))
+
+
+# shard_capacity leaves room for four standard deviations above the mean
+# load of a shard, so that hashing does not overfill any of them.
+def shard_capacity(capacity: int, shards: int) -> int:
+    mean = capacity / shards
+    return math.ceil(mean + 4 * math.sqrt(mean))
+
+
+# split_items groups the items by shard, in batches of at most batch_size,
+# and remembers the position of every item in the input.
+def split_items(
+    items: Iterable[EncodableT], shards: int, batch_size: int
+) -> List[Tuple[int, List[EncodableT], List[int]]]:
+    groups: Dict[int, Tuple[List[EncodableT], List[int]]] = {}
+    for pos, item in enumerate(items):
+        group = groups.setdefault(shard_index(item, shards), ([], []))
+        group[0].append(item)
+        group[1].append(pos)
+
+    batches = []
+    for i, (group, positions) in groups.items():
+        for start in range(0, len(group), batch_size):
+            end = start + batch_size
+            batches.append((i, group[start:end], positions[start:end]))
+    return batches
+
+
+def reassemble(
+    batches: List[Tuple[int, List[EncodableT], List[int]]], replies: List[List[int]]
+) -> List[int]:
+    result = [0] * sum(len(positions) for _, _, positions in batches)
+    for (_, _, positions), reply in zip(batches, replies):
+        for pos, flag in zip(positions, reply):
+            result[pos] = flag
+    return result
+
+
+# ShardedBloom spreads one logical bloom filter over shards BF keys
+# "<name>:0", "<name>:1", ..., which carry no hash tag and so land on
+# different slots. Every item goes to a single shard, chosen by a hash of the
+# item, so each shard has the error rate of the whole filter. A batch is
+# split per shard, sent in one pipeline, which a cluster client runs on all
+# the nodes concurrently, and the replies come back in input order.
+class ShardedBloom:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        capacity: int,
+        error_rate: float = 0.01,
+        shards: Optional[int] = None,
+        batch_size: int = 10000,
+    ) -> None:
+        if capacity <= 0:
+            raise DataError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise DataError("error_rate must be between 0 and 1")
+        if shards is None:
+            shards = default_shards(capacity, error_rate)
+        if shards <= 0:
+            raise DataError("shards must be positive")
+        if batch_size <= 0:
+            raise DataError("batch_size must be positive")
+        self.client = client
+        self.name = name
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.shards = shards
+        self.batch_size = batch_size
+        self.shard_capacity = shard_capacity(capacity, shards)
+        self.keys = [f"{name}:{i}" for i in range(shards)]
+
+    def key_of(self, item: EncodableT) -> str:
+        return self.keys[shard_index(item, self.shards)]
+
+    def add(self, item: EncodableT) -> int:
+        return self.madd([item])[0]
+
+    def exists(self, item: EncodableT) -> int:
+        return self.client.bf_exists(self.key_of(item), item)
+
+    # madd uses BF.INSERT with the shard sizing, so that a shard is created
+    # with the right capacity and error rate on its first write.
+    def madd(self, items: Iterable[EncodableT]) -> List[int]:
+        batches = split_items(items, self.shards, self.batch_size)
+        with self.client.pipeline(transaction=False) as pipe:
+            for i, group, _ in batches:
+                pipe.bf_insert(
+                    self.keys[i],
+                    group,
+                    capacity=self.shard_capacity,
+                    error_rate=self.error_rate,
+                )
+            return reassemble(batches, pipe.execute())
+
+    def mexists(self, items: Iterable[EncodableT]) -> List[int]:
+        batches = split_items(items, self.shards, self.batch_size)
+        with self.client.pipeline(transaction=False) as pipe:
+            for i, group, _ in batches:
+                pipe.bf_mexists(self.keys[i], group)
+            return reassemble(batches, pipe.execute())
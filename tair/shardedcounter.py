@@ -0,0 +1,146 @@
+import random
+import time
+from typing import List, Optional
+
+from tair.exceptions import DataError, ResponseError
+from tair.typing import ExpiryT, KeyT
+
+
+def is_overflow(error: Exception) -> bool:
+    return isinstance(error, ResponseError) and "overflow" in str(error).lower()
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+# plan_rebalance returns the per-shard deltas that spread the remaining stock
+# over as many shards as can still serve a decrement of amount. Shards that
+# already hold the most keep their stock, so the fewest units move.
+def plan_rebalance(values: List[int], amount: int = 1) -> List[int]:
+    total = sum(values)
+    receivers = max(1, min(len(values), total // amount))
+    order = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    targets = [0] * len(values)
+    for i, target in zip(order, split_evenly(total, receivers)):
+        targets[i] = target
+    return [t - v for t, v in zip(targets, values)]
+
+
+def parse_stock(resp) -> int:
+    return 0 if resp is None else int(resp.value)
+
+
+class ShardedCounter:
+    def __init__(
+        self,
+        client,
+        name: KeyT,
+        shards: int = 8,
+        rebalance_interval: Optional[float] = 1.0,
+    ) -> None:
+        if shards <= 0:
+            raise DataError("shards must be positive")
+        self.client = client
+        self.name = name
+        self.shards = shards
+        self.rebalance_interval = rebalance_interval
+        # the shard keys carry no hash tag, so they spread over the slots.
+        self.keys = [f"{name}:{i}" for i in range(shards)]
+
+        self._exhausted = set()
+        self._last_rebalance = 0.0
+
+    def init(self, total: int, ex: Optional[ExpiryT] = None) -> None:
+        with self.client.pipeline(transaction=False) as pipe:
+            for key, stock in zip(self.keys, split_evenly(total, self.shards)):
+                pipe.exset(key, stock, ex=ex)
+            pipe.execute()
+        self._exhausted.clear()
+
+    def total(self) -> int:
+        return sum(self.stocks())
+
+    def stocks(self) -> List[int]:
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                pipe.exget(key)
+            return [parse_stock(resp) for resp in pipe.execute()]
+
+    def incr(self, amount: int = 1) -> int:
+        i = random.randrange(self.shards)
+        self._exhausted.discard(i)
+        return self.client.exincrby(self.keys[i], amount)
+
+    # decr takes amount units from a random shard with MIN 0, and falls back
+    # to the other shards when that one is exhausted.
+    def decr(self, amount: int = 1) -> bool:
+        for _ in range(2):
+            candidates = [i for i in range(self.shards) if i not in self._exhausted]
+            random.shuffle(candidates)
+            for i in candidates:
+                try:
+                    self.client.exincrby(self.keys[i], -amount, minval=0)
+                    return True
+                except ResponseError as e:
+                    if not is_overflow(e):
+                        raise
+                    self._exhausted.add(i)
+                    self._maybe_rebalance(amount)
+
+            # every shard refused, but the remaining stock may be split in
+            # pieces smaller than amount.
+            if self.rebalance(amount) < amount:
+                return False
+        return False
+
+    def rebalance(self, amount: int = 1) -> int:
+        self._last_rebalance = time.monotonic()
+        values = self.stocks()
+        deltas = plan_rebalance(values, amount)
+
+        # withdraw with MIN 0 first, so that concurrent decrements can only
+        # make a withdrawal fail and never push a shard below zero. Whatever
+        # was withdrawn is deposited even when another withdrawal failed; it
+        # is only lost if the connection fails between the two pipelines.
+        donors = [i for i, d in enumerate(deltas) if d < 0]
+        with self.client.pipeline(transaction=False) as pipe:
+            for i in donors:
+                pipe.exincrby(self.keys[i], deltas[i], minval=0)
+            responses = pipe.execute(raise_on_error=False)
+        collected = -sum(
+            deltas[i]
+            for i, resp in zip(donors, responses)
+            if not isinstance(resp, Exception)
+        )
+        receivers = [i for i, d in enumerate(deltas) if d > 0]
+        try:
+            for resp in responses:
+                if isinstance(resp, Exception) and not is_overflow(resp):
+                    raise resp
+        finally:
+            if collected:
+                self._deposit(receivers, deltas, collected)
+
+        self._exhausted = {i for i, v in enumerate(values) if v + deltas[i] == 0}
+        return sum(values)
+
+    # _deposit spreads collected over the receivers up to their deltas, and
+    # puts what is left on the last one.
+    def _deposit(self, receivers: List[int], deltas: List[int], collected: int) -> None:
+        with self.client.pipeline(transaction=False) as pipe:
+            for n, i in enumerate(receivers):
+                deposit = min(deltas[i], collected)
+                if n == len(receivers) - 1:
+                    deposit = collected
+                pipe.exincrby(self.keys[i], deposit)
+                collected -= deposit
+                if not collected:
+                    break
+            pipe.execute()
+
+    def _maybe_rebalance(self, amount: int) -> None:
+        if self.rebalance_interval is None:
+            return
+        if time.monotonic() - self._last_rebalance >= self.rebalance_interval:
+            self.rebalance(amount)
@@ -0,0 +1,15 @@
+from typing import List, Tuple
+
+
+# Stats is the base of the counters kept by the helpers. Its repr shows the
+# attributes listed in FIELDS, each name optionally followed by a colon and
+# the format spec of its value, as in "elapsed:.3f".
+class Stats:
+    FIELDS: Tuple[str, ...] = ()
+
+    def __repr__(self) -> str:
+        fields: List[str] = []
+        for field in self.FIELDS:
+            name, _, spec = field.partition(":")
+            fields.append(f"{name}: {format(getattr(self, name), spec)}")
+        return "{" + ", ".join(fields) + "}"
@@ -0,0 +1,453 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from tair.exceptions import DataError
+from tair.stats import Stats
+from tair.typing import KeyT, ResponseT
+
+# the number of suggestions returned when max_count is not given, as
+# TFT.GETSUG does.
+DEFAULT_MAX_COUNT = 10
+# the key under which a node of a trie holds the weight of the suggestion
+# ending there. Every other key is a single character.
+TERMINAL = ""
+# the number of answers a trie memoizes before starting over.
+MEMO_SIZE = 4096
+
+GroupKeyT = Tuple[KeyT, str]
+
+
+# SuggestionTrie holds weighted suggestions, one node per character, and
+# answers prefix and fuzzy lookups with the max_count heaviest matches.
+# Answers are memoized until the trie changes.
+class SuggestionTrie:
+    def __init__(self, suggestions: Iterable[Tuple[str, int]] = ()) -> None:
+        self.root: dict = {}
+        self.nodes = 1
+        self._size = 0
+        self._memo: Dict[Tuple[str, int, int], List[str]] = {}
+        for text, weight in suggestions:
+            self.insert(text, weight)
+
+    def insert(self, text: str, weight: int) -> None:
+        node = self.root
+        for char in text:
+            child = node.get(char)
+            if child is None:
+                child = node[char] = {}
+                self.nodes += 1
+            node = child
+        if TERMINAL not in node:
+            self._size += 1
+        node[TERMINAL] = weight
+        self._memo.clear()
+
+    def find(self, prefix: str) -> Optional[dict]:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str, max_count: int = DEFAULT_MAX_COUNT) -> List[str]:
+        key = (prefix, max_count, 0)
+        result = self._memo.get(key)
+        if result is None:
+            node = self.find(prefix)
+            matches = [] if node is None else collect(node, prefix)
+            result = self.memoize(key, heaviest(matches, max_count))
+        return result
+
+    # fuzzy matches the suggestions that start with a string within distance
+    # edits of prefix.
+    def fuzzy(
+        self, prefix: str, max_count: int = DEFAULT_MAX_COUNT, distance: int = 1
+    ) -> List[str]:
+        key = (prefix, max_count, distance)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+        matches = []
+        stack = [(self.root, "", list(range(len(prefix) + 1)))]
+        while stack:
+            node, text, row = stack.pop()
+            if row[-1] <= distance:
+                matches.extend(collect(node, text))
+                continue
+            if min(row) > distance:
+                continue
+            for char, child in node.items():
+                if char != TERMINAL:
+                    stack.append((child, text + char, next_row(row, prefix, char)))
+        return self.memoize(key, heaviest(matches, max_count))
+
+    def memoize(self, key: Tuple[str, int, int], result: List[str]) -> List[str]:
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+    def __len__(self) -> int:
+        return self._size
+
+
+# next_row is the row of the Levenshtein matrix for one more character.
+def next_row(row: List[int], prefix: str, char: str) -> List[int]:
+    new = [row[0] + 1]
+    for i, c in enumerate(prefix, 1):
+        new.append(min(new[i - 1] + 1, row[i] + 1, row[i - 1] + (c != char)))
+    return new
+
+
+def collect(node: dict, text: str) -> List[Tuple[int, str]]:
+    matches = []
+    stack = [(node, text)]
+    while stack:
+        node, text = stack.pop()
+        for char, child in node.items():
+            if char == TERMINAL:
+                matches.append((child, text))
+            else:
+                stack.append((child, text + char))
+    return matches
+
+
+def heaviest(matches: List[Tuple[int, str]], max_count: int) -> List[str]:
+    best = heapq.nsmallest(max_count, matches, key=lambda m: (-m[0], m[1]))
+    return [text for _, text in best]
+
+
+# the suggestions are cached in groups by their first character. A group
+# loaded on demand comes from one TFT.GETSUG of that character: it does not
+# return the weights, but its matches come heaviest first, so the group
+# keeps their order with weights made from their ranks. The groups built
+# from TFT.GETALLSUGS, which returns no order either, weigh all their
+# suggestions the same, and so rank matches by text until they are reloaded.
+def group_of(text: str) -> str:
+    return text[:1]
+
+
+def rank_weights(texts: List[str]) -> List[Tuple[str, int]]:
+    return [(text, len(texts) - i) for i, text in enumerate(texts)]
+
+
+def group_texts(texts: Iterable[str]) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for text in texts:
+        if text:
+            groups.setdefault(group_of(text), []).append(text)
+    return groups
+
+
+class SuggestionGroup:
+    def __init__(self, trie: SuggestionTrie, loaded_at: float) -> None:
+        self.trie = trie
+        self.loaded_at = loaded_at
+
+
+class SuggestionCacheStats(Stats):
+    FIELDS = (
+        "hits",
+        "misses",
+        "loads",
+        "refreshes",
+        "evictions",
+        "invalidations",
+        "errors",
+    )
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# GroupStore holds the loaded groups in LRU order, bounded by the total
+# number of suggestions. Like the ResultStore of SearchCache, every group
+# has a generation bumped by each write to it, and a load only installs a
+# group if its generation did not move while the load was in flight.
+class GroupStore:
+    def __init__(self, max_entries: int) -> None:
+        if max_entries <= 0:
+            raise DataError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.entries = 0
+        self.stats = SuggestionCacheStats()
+
+        self._groups: "OrderedDict[GroupKeyT, SuggestionGroup]" = OrderedDict()
+        self._generations: Dict[GroupKeyT, int] = {}
+        # the groups found to hold more than max_entries suggestions, which
+        # are not tried again until a write through the cache changes them.
+        self._oversized: Set[GroupKeyT] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: GroupKeyT) -> Optional[SuggestionGroup]:
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None:
+                self._groups.move_to_end(key)
+            return group
+
+    def generation(self, key: GroupKeyT) -> int:
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    # generations returns the generation of every group of index that has
+    # one, the others being at 0.
+    def generations(self, index: KeyT) -> Dict[GroupKeyT, int]:
+        with self._lock:
+            return {k: g for k, g in self._generations.items() if k[0] == index}
+
+    def is_oversized(self, key: GroupKeyT) -> bool:
+        return key in self._oversized
+
+    # put installs the group of key, or marks it oversized when suggestions
+    # is None.
+    def put(
+        self,
+        key: GroupKeyT,
+        generation: int,
+        suggestions: Optional[List[Tuple[str, int]]],
+    ) -> None:
+        trie = None if suggestions is None else SuggestionTrie(suggestions)
+        with self._lock:
+            if generation != self._generations.get(key, 0):
+                return
+            if trie is None:
+                self._oversized.add(key)
+                return
+            self._remove(key)
+            self._groups[key] = SuggestionGroup(trie, time.monotonic())
+            self.entries += len(trie)
+            self.stats.loads += 1
+            while self.entries > self.max_entries:
+                self._remove(next(iter(self._groups)))
+                self.stats.evictions += 1
+
+    # invalidate returns whether the group was loaded.
+    def invalidate(self, key: GroupKeyT) -> bool:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._oversized.discard(key)
+            self.stats.invalidations += 1
+            return self._remove(key)
+
+    def keys(self) -> List[GroupKeyT]:
+        with self._lock:
+            return list(self._groups)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups.clear()
+            self._oversized.clear()
+            self.entries = 0
+
+    def oldest(self) -> Optional[float]:
+        with self._lock:
+            return min((g.loaded_at for g in self._groups.values()), default=None)
+
+    def __contains__(self, key: GroupKeyT) -> bool:
+        return key in self._groups
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def _remove(self, key: GroupKeyT) -> bool:
+        group = self._groups.pop(key, None)
+        if group is None:
+            return False
+        self.entries -= len(group.trie)
+        return True
+
+
+# install_groups caches the smallest of groups, the suggestions of index by
+# group, that fit in max_entries, marks the ones larger than that oversized,
+# and returns how many suggestions were cached.
+def install_groups(
+    store: GroupStore,
+    index: KeyT,
+    groups: Dict[str, List[str]],
+    generations: Dict[GroupKeyT, int],
+) -> int:
+    budget = store.max_entries
+    cached = 0
+    for group in sorted(groups, key=lambda g: len(groups[g])):
+        key = (index, group)
+        texts = groups[group]
+        if len(texts) > store.max_entries:
+            store.put(key, generations.get(key, 0), None)
+        elif len(texts) <= budget:
+            budget -= len(texts)
+            cached += len(texts)
+            suggestions = [(text, 0) for text in texts]
+            store.put(key, generations.get(key, 0), suggestions)
+    return cached
+
+
+# SuggestionCache serves tft_getsug from tries held in process, so that
+# typeahead lookups do not each cost a round trip. A lookup of a group that
+# is not cached is answered by the server, and the group is loaded in the
+# background; load fills all the groups of an index from one TFT.GETALLSUGS
+# instead. At most max_entries suggestions are kept, the least recently used
+# groups being evicted, and a group larger than that is always read from the
+# server.
+#
+# The background thread reloads the cached groups every refresh_interval
+# seconds, or never when it is None, and the ones changed by tft_addsug and
+# tft_delsug called through the cache right away; until then they are read
+# from the server. staleness is the age of the oldest group. Local fuzzy
+# lookups match suggestions starting within one edit of the prefix after its
+# first character, which may differ from the fuzzy matching of the server.
+class SuggestionCache:
+    def __init__(
+        self,
+        client,
+        max_entries: int = 100000,
+        refresh_interval: Optional[float] = 60.0,
+    ) -> None:
+        if refresh_interval is not None and refresh_interval <= 0:
+            raise DataError("refresh_interval must be positive")
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.store = GroupStore(max_entries)
+        self.last_error: Optional[Exception] = None
+
+        self._dirty: Set[GroupKeyT] = set()
+        self._missing: Set[GroupKeyT] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "SuggestionCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> SuggestionCacheStats:
+        return self.store.stats
+
+    @property
+    def staleness(self) -> float:
+        oldest = self.store.oldest()
+        return 0.0 if oldest is None else time.monotonic() - oldest
+
+    # load caches the smallest groups of index that fit in max_entries, and
+    # returns how many suggestions they hold.
+    def load(self, index: KeyT) -> int:
+        generations = self.store.generations(index)
+        groups = group_texts(self.client.tft_getallsugs(index))
+        return install_groups(self.store, index, groups, generations)
+
+    def load_groups(self, keys: List[GroupKeyT]) -> None:
+        if not keys:
+            return
+        generations = [self.store.generation(key) for key in keys]
+        limit = self.store.max_entries + 1
+        with self.client.pipeline(transaction=False) as pipe:
+            for index, group in keys:
+                pipe.tft_getsug(index, group, max_count=limit)
+            replies = pipe.execute()
+        for key, generation, texts in zip(keys, generations, replies):
+            suggestions = rank_weights(texts) if len(texts) < limit else None
+            self.store.put(key, generation, suggestions)
+
+    def tft_getsug(
+        self,
+        index: KeyT,
+        prefix: str,
+        max_count: Optional[int] = None,
+        fuzzy: bool = False,
+    ) -> ResponseT:
+        key = (index, group_of(prefix))
+        group = self.store.get(key)
+        if group is None:
+            if prefix and not self.store.is_oversized(key):
+                with self._lock:
+                    self._missing.add(key)
+                self._wakeup.set()
+            self.stats.misses += 1
+            return self.client.tft_getsug(index, prefix, max_count, fuzzy)
+        self.stats.hits += 1
+        count = DEFAULT_MAX_COUNT if max_count is None else max_count
+        if fuzzy:
+            return group.trie.fuzzy(prefix, count)
+        return group.trie.complete(prefix, count)
+
+    def tft_addsug(self, index: KeyT, mapping: Dict[str, int]) -> ResponseT:
+        try:
+            return self.client.tft_addsug(index, mapping)
+        finally:
+            self.invalidate(index, mapping)
+
+    def tft_delsug(self, index: KeyT, text: Iterable[str]) -> ResponseT:
+        texts = list(text)
+        try:
+            return self.client.tft_delsug(index, texts)
+        finally:
+            self.invalidate(index, texts)
+
+    def invalidate(self, index: KeyT, texts: Iterable[str]) -> None:
+        keys = {(index, group_of(text)) for text in texts}
+        loaded = [key for key in keys if self.store.invalidate(key)]
+        with self._lock:
+            self._dirty.update(loaded)
+        self._wakeup.set()
+
+    def refresh(self, full: bool = False) -> None:
+        with self._lock:
+            keys = set(self._dirty)
+            keys.update(key for key in self._missing if key not in self.store)
+            self._dirty.clear()
+            self._missing.clear()
+        keys = {key for key in keys if not self.store.is_oversized(key)}
+        if full:
+            keys.update(self.store.keys())
+        self.load_groups(sorted(keys, key=str))
+        self.stats.refreshes += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.store.clear()
+
+    def _run(self) -> None:
+        interval = self.refresh_interval
+        deadline = None if interval is None else time.monotonic() + interval
+        while not self._closed:
+            if deadline is None:
+                self._wakeup.wait()
+            else:
+                self._wakeup.wait(max(deadline - time.monotonic(), 0))
+            self._wakeup.clear()
+            if self._closed:
+                return
+            full = deadline is not None and time.monotonic() >= deadline
+            if full:
+                deadline = time.monotonic() + interval
+            try:
+                self.refresh(full)
+            except Exception as e:
+                with self._lock:
+                    self.stats.errors += 1
+                    self.last_error = e
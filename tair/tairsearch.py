@@ -1,6 +1,7 @@
 from typing import Dict, Iterable, List, Optional
 
 import tair
+from tair.searchquery import QueryT, query_text
 from tair.typing import CommandsProtocol, EncodableT, KeyT, ResponseT
 
 
@@ -147,16 +148,20 @@ class TairSearchCommands(CommandsProtocol):
     def tft_delall(self, index: KeyT) -> ResponseT:
         return self.execute_command("TFT.DELALL", index)
 
-    def tft_search(self, index: KeyT, query: str, use_cache: bool = False) -> ResponseT:
-        pieces: List[EncodableT] = [index, query]
+    def tft_search(
+        self, index: KeyT, query: QueryT, use_cache: bool = False
+    ) -> ResponseT:
+        pieces: List[EncodableT] = [index, query_text(query)]
         if use_cache:
             pieces.append("use_cache")
         return self.execute_command("TFT.SEARCH", *pieces)
 
     def tft_msearch(
-        self, index_count: int, index: Iterable[KeyT], query: str
+        self, index_count: int, index: Iterable[KeyT], query: QueryT
     ) -> ResponseT:
-        return self.execute_command("TFT.MSEARCH", index_count, *index, query)
+        return self.execute_command(
+            "TFT.MSEARCH", index_count, *index, query_text(query)
+        )
 
     def tft_analyzer(
         self,
@@ -181,20 +186,20 @@ class TairSearchCommands(CommandsProtocol):
                 )
         return self.execute_command("TFT.ANALYZER", *pieces, target_nodes=target_nodes)
 
-    def tft_explaincost(self, index: KeyT, query: str) -> ResponseT:
-        pieces: List[EncodableT] = [index, query]
+    def tft_explaincost(self, index: KeyT, query: QueryT) -> ResponseT:
+        pieces: List[EncodableT] = [index, query_text(query)]
         return self.execute_command("TFT.EXPLAINCOST", *pieces)
 
     def tft_explainscore(
         self,
         index: KeyT,
-        request: str,
+        request: QueryT,
         docid: Iterable[str] = []
     ) -> ResponseT:
         return self.execute_command(
             "TFT.EXPLAINSCORE",
             index,
-            request,
+            query_text(request),
             *docid,
         )
 
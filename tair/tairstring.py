@@ -278,7 +278,9 @@ def parse_exset(resp) -> Union[bool, None]:
     return bool_ok(resp)
 
 
-def parse_exget(resp) -> ExgetResult:
+def parse_exget(resp) -> Union[ExgetResult, None]:
+    if resp is None:
+        return None
     return ExgetResult(resp[0], resp[1])
 
 
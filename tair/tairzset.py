@@ -1,4 +1,4 @@
-from typing import Iterable, List, Mapping, Optional, Union
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 from redis.typing import CommandsProtocol
 from redis.utils import str_if_bytes
@@ -6,6 +6,15 @@ from redis.utils import str_if_bytes
 from tair.exceptions import DataError
 from tair.typing import AnyKeyT, EncodableT, KeyT, ResponseT
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# a score of a TairZset member is either a single number or a tuple with one
+# number per dimension, which is sent as "a#b#c".
+ScoreT = Union[EncodableT, Tuple[float, ...]]
+
 
 class TairZsetItem:
     def __init__(self, member: Union[bytes, str], score: str) -> None:
@@ -46,18 +55,50 @@ class TairZsetCommands(CommandsProtocol):
             pieces.append("INCR")
 
         for member, score in mapping.items():
-            pieces.append(score)
+            pieces.append(encode_score(score))
             pieces.append(member)
 
         return self.execute_command("EXZADD", *pieces)
 
+    def exzadd_array(
+        self,
+        key: KeyT,
+        members: Sequence[EncodableT],
+        scores: Any,
+        nx: bool = False,
+        xx: bool = False,
+        ch: bool = False,
+        incr: bool = False,
+    ) -> ResponseT:
+        encoded = encode_scores(scores)
+        if len(encoded) != len(members):
+            raise DataError("members and scores must have the same length")
+
+        pieces: List[EncodableT] = [key]
+
+        if nx:
+            pieces.append("NX")
+        if xx:
+            pieces.append("XX")
+        if ch:
+            pieces.append("CH")
+        if incr:
+            pieces.append("INCR")
+
+        interleaved: List[EncodableT] = [None] * (2 * len(encoded))
+        interleaved[0::2] = encoded
+        interleaved[1::2] = members
+        pieces.extend(interleaved)
+
+        return self.execute_command("EXZADD", *pieces)
+
     def exzincrby(
         self,
         key: KeyT,
-        increment: float,
+        increment: ScoreT,
         member: EncodableT,
     ) -> ResponseT:
-        return self.execute_command("EXZINCRBY", key, increment, member)
+        return self.execute_command("EXZINCRBY", key, encode_score(increment), member)
 
     def exzscore(self, key: KeyT, member: EncodableT) -> ResponseT:
         return self.execute_command("EXZSCORE", key, member)
@@ -89,13 +130,13 @@ class TairZsetCommands(CommandsProtocol):
     def exzrangebyscore(
         self,
         key: KeyT,
-        minval: EncodableT,
-        maxval: EncodableT,
+        minval: ScoreT,
+        maxval: ScoreT,
         withscores: bool = False,
         offset: Optional[int] = None,
         count: Optional[int] = None,
     ) -> ResponseT:
-        pieces: List[EncodableT] = [key, minval, maxval]
+        pieces: List[EncodableT] = [key, encode_score(minval), encode_score(maxval)]
 
         if withscores:
             pieces.append("WITHSCORES")
@@ -114,13 +155,13 @@ class TairZsetCommands(CommandsProtocol):
     def exzrevrangebyscore(
         self,
         key: KeyT,
-        minval: EncodableT,
-        maxval: EncodableT,
+        minval: ScoreT,
+        maxval: ScoreT,
         withscores: bool = False,
         offset: Optional[int] = None,
         count: Optional[int] = None,
     ) -> ResponseT:
-        pieces: List[EncodableT] = [key, minval, maxval]
+        pieces: List[EncodableT] = [key, encode_score(minval), encode_score(maxval)]
 
         if withscores:
             pieces.append("WITHSCORES")
@@ -186,10 +227,12 @@ class TairZsetCommands(CommandsProtocol):
     def exzremrangebyscore(
         self,
         key: KeyT,
-        minval: EncodableT,
-        maxval: EncodableT,
+        minval: ScoreT,
+        maxval: ScoreT,
     ) -> ResponseT:
-        return self.execute_command("EXZREMRANGEBYSCORE", key, minval, maxval)
+        return self.execute_command(
+            "EXZREMRANGEBYSCORE", key, encode_score(minval), encode_score(maxval)
+        )
 
     def exzremrangebyrank(self, key: KeyT, start: int, stop: int) -> ResponseT:
         return self.execute_command("EXZREMRANGEBYRANK", key, start, stop)
@@ -214,10 +257,12 @@ class TairZsetCommands(CommandsProtocol):
     def exzcount(
         self,
         key: KeyT,
-        minval: EncodableT,
-        maxval: EncodableT,
+        minval: ScoreT,
+        maxval: ScoreT,
     ) -> ResponseT:
-        return self.execute_command("EXZCOUNT", key, minval, maxval)
+        return self.execute_command(
+            "EXZCOUNT", key, encode_score(minval), encode_score(maxval)
+        )
 
     def exzlexcount(
         self,
@@ -227,11 +272,11 @@ class TairZsetCommands(CommandsProtocol):
     ) -> ResponseT:
         return self.execute_command("EXZLEXCOUNT", key, minval, maxval)
 
-    def exzrankbyscore(self, key: KeyT, score: EncodableT) -> ResponseT:
-        return self.execute_command("EXZRANKBYSCORE", key, score)
+    def exzrankbyscore(self, key: KeyT, score: ScoreT) -> ResponseT:
+        return self.execute_command("EXZRANKBYSCORE", key, encode_score(score))
 
-    def exzrevrankbyscore(self, key: KeyT, score: EncodableT) -> ResponseT:
-        return self.execute_command("EXZREVRANKBYSCORE", key, score)
+    def exzrevrankbyscore(self, key: KeyT, score: ScoreT) -> ResponseT:
+        return self.execute_command("EXZREVRANKBYSCORE", key, encode_score(score))
 
 
 def parse_tair_zset_items(resp, **options):
@@ -243,3 +288,53 @@ def parse_tair_zset_items(resp, **options):
         for i in resp:
             result.append(TairZsetItem(i, None))
     return result
+
+
+# encode_score keeps plain scores and bounds such as "(1#2" or "-inf" as they
+# are and joins the dimensions of a tuple score with "#".
+def encode_score(score: ScoreT) -> EncodableT:
+    if isinstance(score, (tuple, list)):
+        return "#".join(str(i) for i in score)
+    if np is not None and isinstance(score, np.ndarray):
+        return "#".join(str(i) for i in score.tolist())
+    return score
+
+
+# encode_scores encodes many scores at once. A NumPy array of shape (n,) or
+# (n, dims) is converted column by column, so the per-score work is done by
+# C-level map/str/join calls instead of a Python loop over tuples.
+def encode_scores(scores: Any) -> List[EncodableT]:
+    if np is None or not isinstance(scores, np.ndarray):
+        return [encode_score(score) for score in scores]
+    if scores.ndim == 1:
+        return list(map(str, scores.tolist()))
+    if scores.ndim != 2:
+        raise DataError("scores must be a 1-D or 2-D array")
+
+    columns = [map(str, scores[:, i].tolist()) for i in range(scores.shape[1])]
+    return list(map("#".join, zip(*columns)))
+
+
+def decode_score(score: Union[bytes, str]) -> Tuple[float, ...]:
+    return tuple(float(i) for i in str_if_bytes(score).split("#"))
+
+
+def decode_scores(items: Iterable[TairZsetItem]) -> List[Tuple[float, ...]]:
+    return [decode_score(item.score) for item in items]
+
+
+# items_to_array converts the items returned with withscores=True into a
+# structured array with a "member" field and a "score" field holding one
+# float per dimension.
+def items_to_array(items: Sequence[TairZsetItem]):
+    if np is None:
+        raise DataError("items_to_array requires numpy")
+    if not items:
+        return np.zeros(0, dtype=[("member", "O"), ("score", "f8", (1,))])
+
+    dims = str_if_bytes(items[0].score).count("#") + 1
+    flat = "#".join(str_if_bytes(item.score) for item in items).split("#")
+    result = np.empty(len(items), dtype=[("member", "O"), ("score", "f8", (dims,))])
+    result["member"] = [item.member for item in items]
+    result["score"] = np.array(flat, dtype="f8").reshape(len(items), dims)
+    return result
@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from tair.exceptions import ResponseError, WatchError
+from tair.stats import Stats
+from tair.typing import EncodableT, FieldT, KeyT
+
+TargetT = Union[KeyT, Tuple[KeyT, FieldT]]
+
+
+class ContentionStats(Stats):
+    FIELDS = ("updates", "attempts", "conflicts", "failures")
+
+    def __init__(self) -> None:
+        self.updates = 0
+        self.attempts = 0
+        self.conflicts = 0
+        self.failures = 0
+        self.conflicts_by_target: Dict[TargetT, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, target: TargetT, attempts: int, conflicts: int, failed: bool):
+        with self._lock:
+            self.updates += 1
+            self.attempts += attempts
+            self.conflicts += conflicts
+            if failed:
+                self.failures += 1
+            if conflicts:
+                self.conflicts_by_target[target] = (
+                    self.conflicts_by_target.get(target, 0) + conflicts
+                )
+
+    def hot_keys(self, n: int = 10) -> List[Tuple[TargetT, int]]:
+        with self._lock:
+            items = list(self.conflicts_by_target.items())
+        items.sort(key=lambda i: i[1], reverse=True)
+        return items[:n]
+
+    def conflict_rate(self) -> float:
+        if self.attempts == 0:
+            return 0.0
+        return self.conflicts / self.attempts
+
+
+def backoff_delay(backoff: float, attempt: int, max_backoff: float) -> float:
+    # full jitter: a random delay in [0, min(max_backoff, backoff * 2^attempt)).
+    return random.uniform(0, min(max_backoff, backoff * (2**attempt)))
+
+
+def is_version_conflict(error: Exception) -> bool:
+    return isinstance(error, ResponseError) and "version" in str(error).lower()
+
+
+def split_target(target: TargetT) -> Tuple[KeyT, Optional[FieldT]]:
+    if isinstance(target, tuple):
+        return target[0], target[1]
+    return target, None
+
+
+# read_versioned and write_versioned accept a client or a pipeline and
+# return whatever the underlying command returns.
+def read_versioned(client, key: KeyT, field: Optional[FieldT]):
+    if field is None:
+        return client.exget(key)
+    return client.exhgetwithver(key, field)
+
+
+def write_versioned(client, key: KeyT, field: Optional[FieldT], value, version):
+    # a missing key or field is created with NX so that a concurrent creator
+    # is detected as a conflict as well.
+    if field is None:
+        if version is None:
+            return client.exset(key, value, nx=True)
+        return client.exset(key, value, ver=version)
+    if version is None:
+        return client.exhset(key, field, value, nx=True)
+    return client.exhset(key, field, value, ver=version)
+
+
+def write_succeeded(field: Optional[FieldT], resp) -> bool:
+    if field is None:
+        return resp is not None
+    return resp != -1
+
+
+def versioned_update(
+    client,
+    key: KeyT,
+    fn: Callable[[Any], EncodableT],
+    field: Optional[FieldT] = None,
+    retries: int = 16,
+    backoff: float = 0.005,
+    max_backoff: float = 0.5,
+    stats: Optional[ContentionStats] = None,
+) -> EncodableT:
+    target = key if field is None else (key, field)
+    conflicts = 0
+    for attempt in range(retries + 1):
+        current = read_versioned(client, key, field)
+        value = fn(None if current is None else current.value)
+        version = None if current is None else current.version
+
+        try:
+            resp = write_versioned(client, key, field, value, version)
+            succeeded = write_succeeded(field, resp)
+        except ResponseError as e:
+            if not is_version_conflict(e):
+                raise
+            succeeded = False
+
+        if succeeded:
+            if stats is not None:
+                stats.record(target, attempt + 1, conflicts, False)
+            return value
+
+        conflicts += 1
+        if attempt < retries:
+            time.sleep(backoff_delay(backoff, attempt, max_backoff))
+
+    if stats is not None:
+        stats.record(target, retries + 1, conflicts, True)
+    raise WatchError(f"version conflict on {target!r} after {retries} retries")
+
+
+def versioned_update_many(
+    client,
+    targets: Iterable[TargetT],
+    fn: Callable[[Any], EncodableT],
+    retries: int = 16,
+    backoff: float = 0.005,
+    max_backoff: float = 0.5,
+    stats: Optional[ContentionStats] = None,
+) -> Dict[TargetT, EncodableT]:
+    pending: List[TargetT] = list(dict.fromkeys(targets))
+    attempts: Dict[TargetT, int] = {t: 0 for t in pending}
+    conflicts: Dict[TargetT, int] = {t: 0 for t in pending}
+    results: Dict[TargetT, EncodableT] = {}
+    if not pending:
+        return results
+
+    for attempt in range(retries + 1):
+        with client.pipeline(transaction=False) as pipe:
+            for target in pending:
+                read_versioned(pipe, *split_target(target))
+            currents = pipe.execute()
+
+        values = []
+        with client.pipeline(transaction=False) as pipe:
+            for target, current in zip(pending, currents):
+                key, field = split_target(target)
+                value = fn(None if current is None else current.value)
+                version = None if current is None else current.version
+                values.append(value)
+                write_versioned(pipe, key, field, value, version)
+            responses = pipe.execute(raise_on_error=False)
+
+        retry: List[TargetT] = []
+        for target, value, resp in zip(pending, values, responses):
+            attempts[target] += 1
+            if isinstance(resp, Exception):
+                if not is_version_conflict(resp):
+                    raise resp
+            elif write_succeeded(split_target(target)[1], resp):
+                results[target] = value
+                if stats is not None:
+                    stats.record(target, attempts[target], conflicts[target], False)
+                continue
+            conflicts[target] += 1
+            retry.append(target)
+
+        pending = retry
+        if not pending:
+            return results
+        if attempt < retries:
+            time.sleep(backoff_delay(backoff, attempt, max_backoff))
+
+    if stats is not None:
+        for target in pending:
+            stats.record(target, attempts[target], conflicts[target], True)
+    raise WatchError(
+        f"version conflict on {len(pending)} targets after {retries} retries: "
+        + f"{pending!r}"
+    )
@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from tair.exceptions import DataError
+from tair.tairzset import ScoreT, TairZsetItem, encode_score
+from tair.typing import EncodableT, KeyT
+
+ZsetEntryT = Tuple[bytes, Optional[str]]
+
+
+def check_page_size(page_size: int) -> None:
+    if page_size <= 0:
+        raise DataError("page_size must be positive")
+
+
+def to_entries(items: List[TairZsetItem]) -> List[ZsetEntryT]:
+    return [(item.member, item.score) for item in items]
+
+
+# the cursor of an index range is the index of the first member of the next
+# page.
+def next_index_cursor(
+    cursor: int, page: List[Any], page_size: int, stop: int
+) -> Optional[int]:
+    end = cursor + page_size - 1
+    if len(page) < page_size or end == stop:
+        return None
+    return end + 1
+
+
+def index_page_end(cursor: int, page_size: int, stop: int) -> int:
+    end = cursor + page_size - 1
+    return end if stop < 0 else min(end, stop)
+
+
+# the cursor of a score range is (bound, offset, score): the next page starts
+# at the last score seen, inclusive, and skips the members with that score
+# that were already returned. Unlike a growing LIMIT offset, this costs the
+# same for every page and does not skip or repeat members when members
+# before the cursor are added or removed.
+def next_score_cursor(
+    cursor: Tuple[EncodableT, int, Optional[str]],
+    page: List[ZsetEntryT],
+    page_size: int,
+) -> Optional[Tuple[EncodableT, int, Optional[str]]]:
+    if len(page) < page_size:
+        return None
+    bound, offset, score = cursor
+    last = page[-1][1]
+    if last == score:
+        return bound, offset + len(page), score
+    ties = 0
+    for _, s in reversed(page):
+        if s != last:
+            break
+        ties += 1
+    return last, ties, last
+
+
+# the cursor of a lex range is the bound of the next page, right after the
+# last member returned, which is str with decode_responses.
+def next_lex_cursor(cursor: EncodableT, page: List[EncodableT], page_size: int):
+    if len(page) < page_size:
+        return None
+    last = page[-1]
+    return ("(" if isinstance(last, str) else b"(") + last
+
+
+# iter_pages yields the pages returned by fetch, and with prefetch fetches
+# the next page in a background thread while the current one is consumed.
+def iter_pages(
+    fetch: Callable[[Any], List[Any]],
+    advance: Callable[[Any, List[Any]], Any],
+    cursor: Any,
+    prefetch: bool = False,
+) -> Iterator[List[Any]]:
+    if not prefetch:
+        while cursor is not None:
+            page = fetch(cursor)
+            cursor = advance(cursor, page)
+            yield page
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch, cursor)
+        while future is not None:
+            page = future.result()
+            cursor = advance(cursor, page)
+            future = executor.submit(fetch, cursor) if cursor is not None else None
+            yield page
+
+
+def iter_exzrange(
+    client,
+    key: KeyT,
+    start: int = 0,
+    stop: int = -1,
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> Iterator[ZsetEntryT]:
+    check_page_size(page_size)
+    if start < 0 or stop < -1:
+        raise DataError("start must not be negative and stop must be -1 or more")
+    if stop >= 0 and start > stop:
+        return
+    command = client.exzrevrange if reverse else client.exzrange
+
+    def fetch(cursor: int) -> List[ZsetEntryT]:
+        end = index_page_end(cursor, page_size, stop)
+        return to_entries(command(key, cursor, end, withscores=True))
+
+    def advance(cursor: int, page: List[ZsetEntryT]) -> Optional[int]:
+        return next_index_cursor(cursor, page, page_size, stop)
+
+    for page in iter_pages(fetch, advance, start, prefetch):
+        yield from page
+
+
+def iter_exzrangebyscore(
+    client,
+    key: KeyT,
+    minval: ScoreT = "-inf",
+    maxval: ScoreT = "+inf",
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> Iterator[ZsetEntryT]:
+    check_page_size(page_size)
+
+    def fetch(cursor) -> List[ZsetEntryT]:
+        bound, offset, _ = cursor
+        if reverse:
+            items = client.exzrevrangebyscore(
+                key, bound, minval, True, offset=offset, count=page_size
+            )
+        else:
+            items = client.exzrangebyscore(
+                key, bound, maxval, True, offset=offset, count=page_size
+            )
+        return to_entries(items)
+
+    def advance(cursor, page: List[ZsetEntryT]):
+        return next_score_cursor(cursor, page, page_size)
+
+    first = encode_score(maxval if reverse else minval)
+    for page in iter_pages(fetch, advance, (first, 0, None), prefetch):
+        yield from page
+
+
+# a lex range carries no scores, so iter_exzrangebylex yields members only.
+def iter_exzrangebylex(
+    client,
+    key: KeyT,
+    minval: EncodableT = "-",
+    maxval: EncodableT = "+",
+    reverse: bool = False,
+    page_size: int = 1000,
+    prefetch: bool = False,
+) -> Iterator[bytes]:
+    check_page_size(page_size)
+
+    def fetch(bound: EncodableT) -> List[bytes]:
+        if reverse:
+            return client.exzrevrangebylex(key, bound, minval, 0, page_size)
+        return client.exzrangebylex(key, bound, maxval, 0, page_size)
+
+    def advance(bound: EncodableT, page: List[bytes]):
+        return next_lex_cursor(bound, page, page_size)
+
+    for page in iter_pages(fetch, advance, maxval if reverse else minval, prefetch):
+        yield from page
@@ -0,0 +1,22 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import AudienceEngine
+from tair.audience import And, Not, Or
+
+
+class TestAudience:
+    @pytest.mark.asyncio
+    async def test_audience_count(self, t):
+        prefix = "key_" + str(uuid.uuid4())
+        a, b, c = set(range(0, 1000, 2)), set(range(0, 1000, 3)), set(range(0, 100))
+        for name, offsets in (("a", a), ("b", b), ("c", c)):
+            await t.tr_setbits(f"{prefix}:{name}", offsets)
+        engine = AudienceEngine(t, prefix=f"{prefix}:audience:", ttl=60)
+        expr = And(Or(f"{prefix}:a", f"{prefix}:b"), Not(f"{prefix}:c"))
+
+        assert await engine.count(expr) == len((a | b) - c)
+        key = await engine.select(expr)
+        assert await t.tr_bitcount(key) == len((a | b) - c)
+        assert await engine.count(And(f"{prefix}:a", f"{prefix}:b")) == len(a & b)
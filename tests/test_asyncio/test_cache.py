@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+
+import pytest
+
+from tair.asyncio import CacheAside
+
+
+class TestCacheAside:
+    @pytest.mark.asyncio
+    async def test_cache_aside_hit_miss(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        async def loader():
+            return "value"
+
+        assert await cache.get(key, loader) == "value"
+        assert await cache.get(key, loader) == "value"
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+        assert not await t.exists(key + ":lease")
+
+    @pytest.mark.asyncio
+    async def test_cache_aside_single_flight(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return "value"
+
+        results = await asyncio.gather(*[cache.get(key, loader) for _ in range(10)])
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+
+    @pytest.mark.asyncio
+    async def test_cache_aside_single_flight_error(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        async def loader():
+            await asyncio.sleep(0.1)
+            raise ValueError("failed")
+
+        results = await asyncio.gather(
+            *[cache.get(key, loader) for _ in range(3)], return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cache_aside_serve_stale(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        async def loader():
+            return "old"
+
+        await cache.get(key, loader)
+        await t.delete(key)
+        assert await t.set(key + ":lease", "other", ex=10, nx=True)
+        assert await cache.get(key, loader) == "old"
+        assert cache.stats.stale_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_aside_invalidate(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        async def loader():
+            return "value"
+
+        await cache.get(key, loader)
+        await cache.invalidate(key)
+        assert not await t.exists(key)
+        assert not await t.exists(key + ":stale")
+
+    @pytest.mark.asyncio
+    async def test_cache_aside_leader_cancelled(self, t):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return "value"
+
+        leader = asyncio.ensure_future(cache.get(key, loader))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.ensure_future(cache.get(key, loader)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        # one follower takes over the load instead of all being cancelled.
+        assert await asyncio.gather(*followers) == ["value"] * 3
+        assert len(calls) == 2
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+
+import pytest
+
+from tair import BufferFullError, ConnectionError, ResponseError, TairError
+from tair.asyncio import CounterBuffer, Tair
+
+
+class TestCounterBuffer:
+    @pytest.mark.asyncio
+    async def test_counter_buffer_flush(self, t):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        field = "field_" + str(uuid.uuid4())
+
+        async with CounterBuffer(t, flush_interval=60) as buffer:
+            for _ in range(10):
+                assert await buffer.incr(key1) is None
+                assert await buffer.incr(key2, 2, field=field) is None
+            assert len(buffer) == 2
+            assert await t.exists(key1) == 0
+
+            assert await buffer.flush() == 2
+            assert (await t.exget(key1)).value == b"10"
+            assert await t.exhget(key2, field) == b"20"
+
+    @pytest.mark.asyncio
+    async def test_counter_buffer_time_trigger(self, t):
+        key = "key_" + str(uuid.uuid4())
+
+        async with CounterBuffer(t, flush_interval=0.1) as buffer:
+            await buffer.incr(key, 5)
+            await asyncio.sleep(0.5)
+            assert (await t.exget(key)).value == b"5"
+
+    @pytest.mark.asyncio
+    async def test_counter_buffer_bounded(self, t):
+        key = "key_" + str(uuid.uuid4())
+
+        async with CounterBuffer(t, flush_interval=60) as buffer:
+            assert await buffer.incr(key, -1, minval=-1) == -1
+            with pytest.raises(ResponseError):
+                await buffer.incr(key, -1, minval=-1)
+            assert len(buffer) == 0
+
+    @pytest.mark.asyncio
+    async def test_counter_buffer_close(self, t):
+        key = "key_" + str(uuid.uuid4())
+
+        buffer = CounterBuffer(t, flush_interval=60)
+        await buffer.incr(key, 3)
+        await buffer.close()
+        assert (await t.exget(key)).value == b"3"
+
+        with pytest.raises(TairError):
+            await buffer.incr(key)
+
+    @pytest.mark.asyncio
+    async def test_counter_buffer_full(self):
+        # nothing listens on port 1, so every flush fails.
+        buffer = CounterBuffer(
+            Tair(port=1), flush_size=1, max_size=1, flush_interval=60
+        )
+        await buffer.incr("key1")
+        await buffer.incr("key1", 2)
+        with pytest.raises(BufferFullError):
+            await buffer.incr("key2")
+        assert buffer.increments == 2
+        with pytest.raises(ConnectionError):
+            await buffer.close()
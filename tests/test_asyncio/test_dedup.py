@@ -0,0 +1,32 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import BloomDedup
+
+
+class TestBloomDedup:
+    @pytest.mark.asyncio
+    async def test_dedup(self, t):
+        key = "key_" + str(uuid.uuid4())
+        dedup = BloomDedup(
+            t, key, batch_size=100, in_flight=3, capacity=10000, error_rate=1e-6
+        )
+        items = [f"item_{i % 700}" for i in range(2000)]
+
+        result = [item async for item in dedup.dedup(items)]
+        assert sorted(result) == sorted(f"item_{i}" for i in range(700))
+        assert dedup.stats.unseen == 700
+
+    @pytest.mark.asyncio
+    async def test_dedup_async_iterable(self, t):
+        key = "key_" + str(uuid.uuid4())
+        dedup = BloomDedup(t, key, batch_size=10, capacity=10000, error_rate=1e-6)
+
+        async def stream():
+            for i in range(100):
+                yield f"item_{i % 50}"
+
+        result = [item async for item in dedup.dedup(stream())]
+        assert result == [f"item_{i}" for i in range(50)]
+        assert dedup.stats.batches == 10
@@ -0,0 +1,22 @@
+import uuid
+
+import pytest
+
+from tair.asyncio.geofence import contains_points
+
+
+class TestGeofence:
+    @pytest.mark.asyncio
+    async def test_contains_points(self, t):
+        area = "area_" + str(uuid.uuid4())
+        assert await t.gis_add(
+            area, {"store": "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0))"}
+        )
+
+        lons = [1, 20, 5] * 4
+        lats = [1, 20, 5] * 4
+        matches = await contains_points(t, area, lons, lats, chunk_size=5, workers=2)
+        assert matches == [[b"store"], [], [b"store"]] * 4
+        sparse = await contains_points(t, area, lons, lats, sparse=True)
+        assert sorted(sparse) == [i for i in range(12) if i % 3 != 1]
+        await t.delete(area)
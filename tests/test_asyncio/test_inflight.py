@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from tair.asyncio.inflight import iter_in_flight
+
+
+class TestInFlight:
+    @pytest.mark.asyncio
+    async def test_iter_in_flight(self):
+        taken = []
+
+        async def items():
+            for i in range(10):
+                taken.append(i)
+                yield i
+
+        async def fn(i):
+            await asyncio.sleep(0.01 * (10 - i))
+            return i * i
+
+        results = []
+        async for item, task in iter_in_flight(fn, items(), 3):
+            # no more than 3 items are taken ahead of the one handed over.
+            assert len(taken) <= item + 3
+            results.append((item, await task))
+        assert results == [(i, i * i) for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_iter_in_flight_close(self):
+        cancelled = []
+
+        async def items():
+            for i in range(10):
+                yield i
+
+        async def fn(i):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(i)
+                raise
+
+        flights = iter_in_flight(fn, items(), 3)
+        item, task = await flights.__anext__()
+        await asyncio.sleep(0)
+        # closing cancels the tasks not handed over yet.
+        await flights.aclose()
+        await asyncio.sleep(0)
+        assert item == 0 and sorted(cancelled) == [1, 2]
+        task.cancel()
@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+
+from tair import TairZsetItem
+from tair.asyncio import ShardedLeaderboard
+
+
+class TestShardedLeaderboard:
+    @pytest.mark.asyncio
+    async def test_leaderboard_exzadd(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+
+        assert await lb.exzadd({f"member_{i}": i for i in range(100)}) == 100
+        assert await lb.exzcard() == 100
+        assert await lb.exzscore("member_42") == "42"
+        assert await lb.exzincrby(1, "member_42") == "43"
+        assert await lb.exzrem(["member_42"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_top(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        await lb.exzadd({f"member_{i}": i for i in range(100)})
+
+        assert await lb.top(2) == [
+            TairZsetItem(b"member_99", "99"),
+            TairZsetItem(b"member_98", "98"),
+        ]
+        assert await lb.exzrange(0, 0) == [TairZsetItem(b"member_0", None)]
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_rank(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        await lb.exzadd({f"member_{i}": i for i in range(100)})
+
+        assert await lb.exzrank("member_10") == 10
+        assert await lb.exzrevrank("member_10") == 89
+        assert await lb.exzrank("member_none") is None
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_rank_ties(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        await lb.exzadd({f"member_{i}": i % 3 for i in range(30)})
+
+        for i, item in enumerate(await lb.exzrange(0, 29)):
+            assert await lb.exzrank(item.member) == i
+        for i, item in enumerate(await lb.exzrevrange(0, 29)):
+            assert await lb.exzrevrank(item.member) == i
@@ -0,0 +1,24 @@
+import uuid
+
+import pytest
+
+from tair import LocalBitmap
+from tair.asyncio.localbitmap import fetch_bitmap, fetch_dense_bitmap, store_bitmap
+
+
+class TestLocalBitmap:
+    @pytest.mark.asyncio
+    async def test_fetch_bitmap(self, t):
+        key = "key_" + str(uuid.uuid4())
+        offsets = list(range(0, 100000, 7))
+        await t.tr_setbits(key, offsets)
+
+        assert list(await fetch_bitmap(t, key, page_size=1000)) == offsets
+        assert list(await fetch_dense_bitmap(t, key, window=4096)) == offsets
+
+    @pytest.mark.asyncio
+    async def test_store_bitmap(self, t):
+        key = "key_" + str(uuid.uuid4())
+
+        assert await store_bitmap(t, key, LocalBitmap(range(10))) == 10
+        assert await t.tr_bitcount(key) == 10
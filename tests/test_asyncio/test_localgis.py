@@ -0,0 +1,21 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import LocalGis
+
+
+class TestLocalGis:
+    @pytest.mark.asyncio
+    async def test_local_gis(self, t):
+        area = "area_" + str(uuid.uuid4())
+        local = LocalGis(t)
+        polygon = "POLYGON ((30 10, 40 40, 20 40, 10 20, 30 10))"
+        assert await local.gis_add(area, {"campus": polygon}) == 1
+
+        for wkt in ("POINT (30 11)", "POINT (50 50)"):
+            assert await local.gis_contains(area, wkt) == await t.gis_contains(
+                area, wkt
+            )
+        assert local.stats.hits == 2 and local.stats.loads == 1
+        await t.delete(area)
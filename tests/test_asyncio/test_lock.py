@@ -0,0 +1,108 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from tair import LockError, LockNotOwnedError, ResponseError
+from tair.asyncio import Lock
+
+
+class TestLock:
+    @pytest.mark.asyncio
+    async def test_lock_acquire_release(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name)
+
+        assert await lock.acquire()
+        assert lock.locked()
+        assert (await t.exget(name)).version == lock.token
+        assert not await Lock(t, name).acquire(blocking=False)
+        with pytest.raises(LockError):
+            await lock.acquire()
+
+        await lock.release()
+        assert not await t.exists(name)
+
+    @pytest.mark.asyncio
+    async def test_lock_renew(self, t):
+        name = "key_" + str(uuid.uuid4())
+
+        async with Lock(t, name, lease=1) as lock:
+            await asyncio.sleep(2)
+            assert lock.locked()
+            assert 0 < await t.pttl(name) <= 1000
+
+    @pytest.mark.asyncio
+    async def test_lock_expired(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=1, renew=False)
+
+        assert await lock.acquire()
+        await asyncio.sleep(1.5)
+        other = Lock(t, name)
+        assert await other.acquire(blocking=False)
+        assert other.token > lock.token
+        with pytest.raises(LockNotOwnedError):
+            await lock.release()
+        await other.release()
+
+    @pytest.mark.asyncio
+    async def test_lock_stale_holder(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=1, renew=False)
+
+        assert await lock.acquire()
+        assert await lock.extend()
+        await asyncio.sleep(1.5)
+        other = Lock(t, name)
+        assert await other.acquire(blocking=False)
+        assert other.token == lock.token + 1
+        assert not await lock.extend()
+        with pytest.raises(LockNotOwnedError):
+            await lock.release()
+        assert await t.exists(name)
+        await other.release()
+
+    @pytest.mark.asyncio
+    async def test_lock_timeout_subsecond(self, t):
+        name = "key_" + str(uuid.uuid4())
+
+        async with Lock(t, name):
+            start = time.monotonic()
+            assert not await Lock(t, name).acquire(timeout=0.1)
+            assert time.monotonic() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_lock_wakeup(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=10)
+
+        async def waiter():
+            async with Lock(t, name) as other:
+                return other.token
+
+        assert await lock.acquire()
+        token = lock.token
+        task = asyncio.ensure_future(waiter())
+        await asyncio.sleep(0.2)
+        start = time.monotonic()
+        await lock.release()
+        # the waiter is woken up by the release rather than the lease expiry.
+        assert await task > token
+        assert time.monotonic() - start < 1
+
+    @pytest.mark.asyncio
+    async def test_lock_release_after_renew_error(self, t):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=0.3)
+
+        async def extend():
+            raise ResponseError("ERR renew failed")
+
+        assert await lock.acquire()
+        lock.extend = extend
+        await asyncio.sleep(0.2)
+        await lock.release()
+        assert lock.token is None
+        assert not await t.exists(name)
@@ -0,0 +1,44 @@
+import uuid
+
+import pytest
+
+from tair.asyncio.roaringbitop import cluster_bitop, cluster_bitopcard, iter_bitop
+
+OFFSETS1 = list(range(0, 30000, 2))
+OFFSETS2 = list(range(0, 30000, 3))
+
+
+class TestRoaringBitop:
+    @pytest.mark.asyncio
+    async def test_iter_bitop(self, t):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        await t.tr_setbits(key1, OFFSETS1)
+        await t.tr_setbits(key2, OFFSETS2)
+
+        result = [o async for o in iter_bitop(t, "AND", [key1, key2], page_size=1000)]
+        assert result == sorted(set(OFFSETS1) & set(OFFSETS2))
+
+    @pytest.mark.asyncio
+    async def test_bitop_cross_slot(self, tc):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        dest = "key_" + str(uuid.uuid4())
+        await tc.tr_setbits(key1, OFFSETS1)
+        await tc.tr_setbits(key2, OFFSETS2)
+        expected = set(OFFSETS1) ^ set(OFFSETS2)
+
+        assert await cluster_bitopcard(tc, "XOR", [key1, key2]) == len(expected)
+        assert await cluster_bitop(tc, dest, "XOR", [key1, key2]) == len(expected)
+        assert await tc.tr_bitcount(dest) == len(expected)
+
+    @pytest.mark.asyncio
+    async def test_bitop_cross_slot_dest_in_keys(self, tc):
+        dest = "key_" + str(uuid.uuid4())
+        other = "key_" + str(uuid.uuid4())
+        await tc.tr_setbits(dest, OFFSETS1)
+        await tc.tr_setbits(other, OFFSETS2)
+        expected = set(OFFSETS1) & set(OFFSETS2)
+
+        assert await cluster_bitop(tc, dest, "AND", [dest, other]) == len(expected)
+        assert await tc.tr_bitcount(dest) == len(expected)
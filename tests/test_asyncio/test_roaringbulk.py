@@ -0,0 +1,21 @@
+import uuid
+
+import pytest
+
+from tair.asyncio.roaringbulk import bulk_setbits
+
+
+class TestRoaringBulk:
+    @pytest.mark.asyncio
+    async def test_bulk_setbits(self, t):
+        np = pytest.importorskip("numpy")
+        key = "key_" + str(uuid.uuid4())
+        rng = np.random.default_rng(0)
+        sparse = rng.integers(0, 10**9, 100000)
+        dense = np.arange(5 * 10**8, 5 * 10**8 + 100000)
+        offsets = np.concatenate((sparse, dense))
+        expected = len(np.union1d(sparse, dense))
+
+        assert await bulk_setbits(t, key, offsets, chunk_size=4096) == expected
+        assert await t.tr_bitcount(key) == expected
+        assert await bulk_setbits(t, key, range(10), replace=True) == 10
@@ -0,0 +1,29 @@
+import uuid
+
+import pytest
+
+from tair.asyncio.roaringscan import iter_tr_scan
+
+
+class TestRoaringScan:
+    @pytest.mark.asyncio
+    async def test_iter_tr_scan(self, t):
+        key = "key_" + str(uuid.uuid4())
+        offsets = list(range(0, 100000, 7))
+        await t.tr_setbits(key, offsets)
+
+        stream = iter_tr_scan(t, key, count=10, target_bytes=4096)
+        assert [offset async for offset in stream] == offsets
+        stream = iter_tr_scan(t, key, count=10, prefetch=False)
+        assert [offset async for offset in stream] == offsets
+
+    @pytest.mark.asyncio
+    async def test_iter_tr_scan_chunks(self, t):
+        np = pytest.importorskip("numpy")
+        key = "key_" + str(uuid.uuid4())
+        offsets = list(range(0, 100000, 7))
+        await t.tr_setbits(key, offsets)
+
+        stream = iter_tr_scan(t, key, count=100, target_bytes=4096, chunks=True)
+        chunks = [chunk async for chunk in stream]
+        assert np.concatenate(chunks).tolist() == offsets
@@ -0,0 +1,28 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import ScalableBloom
+
+
+class TestScalableBloom:
+    @pytest.mark.asyncio
+    async def test_scalable_bloom_add(self, t):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ScalableBloom(t, name, capacity=100)
+
+        assert await bloom.add("item_1") is True
+        assert await bloom.add("item_1") is False
+        assert await bloom.exists("item_2") is False
+        assert await bloom.madd(["item_2", "item_2"]) == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_scalable_bloom_grow(self, t):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ScalableBloom(t, name, capacity=100)
+        items = [f"item_{i}" for i in range(1000)]
+        for i in range(0, len(items), 50):
+            await bloom.madd(items[i : i + 50])
+
+        assert len(await bloom.filters()) > 1
+        assert all(await bloom.mexists(items))
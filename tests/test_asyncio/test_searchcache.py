@@ -0,0 +1,35 @@
+import json
+import uuid
+
+import pytest
+
+from tair.asyncio import SearchCache
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": { "price": { "type": "double" } }
+  }
+}"""
+
+
+class TestSearchCache:
+    @pytest.mark.asyncio
+    async def test_search_cache(self, t):
+        index = "idx_" + str(uuid.uuid4())
+        assert await t.tft_createindex(index, MAPPINGS)
+        cache = SearchCache(t, ttl=60)
+        query = '{"query":{"match_all":{}}}'
+
+        await cache.tft_adddoc(index, json.dumps({"price": 1}), "00001")
+        first = await cache.tft_search(index, query)
+        assert await cache.tft_search(index, query) == first
+        assert cache.stats.hits == 1
+
+        await cache.tft_adddoc(index, json.dumps({"price": 2}), "00002")
+        assert (
+            json.loads(await cache.tft_search(index, query))["hits"]["total"]["value"]
+            == 2
+        )
+        await t.delete(index)
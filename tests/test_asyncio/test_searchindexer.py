@@ -0,0 +1,30 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import BulkIndexer
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": { "price": { "type": "double" } }
+  }
+}"""
+
+
+class TestSearchIndexer:
+    @pytest.mark.asyncio
+    async def test_bulk_indexer(self, t):
+        index = "idx_" + str(uuid.uuid4())
+        assert await t.tft_createindex(index, MAPPINGS)
+
+        async def docs():
+            for i in range(1000):
+                yield f"{i:05}", {"price": i}
+
+        indexer = BulkIndexer(t, index, batch_size=100, in_flight=3)
+        stats = await indexer.add(docs())
+        assert stats.docs == 1000 and stats.batches == 10
+        assert await t.tft_docnum(index) == 1000
+        await t.delete(index)
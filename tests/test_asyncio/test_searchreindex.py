@@ -0,0 +1,34 @@
+import json
+import uuid
+
+import pytest
+
+from tair.asyncio import Reindexer
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": { "price": { "type": "long" } }
+  }
+}"""
+
+
+class TestReindexer:
+    @pytest.mark.asyncio
+    async def test_reindex(self, t):
+        source = "idx_" + str(uuid.uuid4())
+        dest = "idx_" + str(uuid.uuid4())
+        assert await t.tft_createindex(source, MAPPINGS)
+        assert await t.tft_createindex(dest, MAPPINGS)
+        for i in range(12):
+            await t.tft_adddoc(source, json.dumps({"price": i}), f"{i:05}")
+
+        cursors = []
+        reindexer = Reindexer(t, source, dest, scan_count=5, batch_size=2)
+        stats = await reindexer.run(checkpoint=cursors.append)
+        assert stats.docs == 12 and cursors[-1] is None
+        assert await t.tft_docnum(dest) == 12
+        assert await t.tft_getdoc(dest, "00007") == await t.tft_getdoc(source, "00007")
+        await t.delete(source)
+        await t.delete(dest)
@@ -0,0 +1,37 @@
+import json
+import uuid
+
+import pytest
+
+from tair.asyncio.searchscatter import scatter_search
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": { "price": { "type": "long" } }
+  }
+}"""
+
+
+class TestSearchScatter:
+    @pytest.mark.asyncio
+    async def test_scatter_search(self, t):
+        prefix = str(uuid.uuid4())
+        indexes = [f"{{day{n}}}:{prefix}" for n in range(2)]
+        for n, index in enumerate(indexes):
+            assert await t.tft_createindex(index, MAPPINGS)
+            for i in range(3):
+                await t.tft_adddoc(index, json.dumps({"price": n * 10 + i}))
+
+        query = '{"sort":[{"price":{"order":"asc"}}],"from":1,"size":4}'
+        result = json.loads(await scatter_search(t, indexes, query))
+        assert result["hits"]["total"]["value"] == 6
+        assert [hit["_source"]["price"] for hit in result["hits"]["hits"]] == [
+            1,
+            2,
+            10,
+            11,
+        ]
+        for index in indexes:
+            await t.delete(index)
@@ -0,0 +1,18 @@
+import uuid
+
+import pytest
+
+from tair.asyncio import ShardedBloom
+
+
+class TestShardedBloom:
+    @pytest.mark.asyncio
+    async def test_sharded_bloom_madd(self, t):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ShardedBloom(t, name, capacity=10000, shards=8, batch_size=100)
+        items = [f"item_{i}" for i in range(1000)]
+
+        assert await bloom.madd(items) == [1] * 1000
+        assert await bloom.mexists(items + ["item_none"]) == [1] * 1000 + [0]
+        assert await bloom.add("item_0") == 0
+        assert await bloom.exists("item_0") == 1
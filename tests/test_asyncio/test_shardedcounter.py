@@ -0,0 +1,51 @@
+import asyncio
+import uuid
+
+import pytest
+
+from tair.asyncio import ShardedCounter
+
+
+class TestShardedCounter:
+    @pytest.mark.asyncio
+    async def test_sharded_counter_decr(self, t):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4, rebalance_interval=None)
+
+        await counter.init(10)
+        assert await counter.stocks() == [3, 3, 2, 2]
+        for _ in range(10):
+            assert await counter.decr()
+        assert not await counter.decr()
+        assert await counter.total() == 0
+
+    @pytest.mark.asyncio
+    async def test_sharded_counter_decr_fallback(self, t):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+
+        await counter.init(7)
+        assert await counter.decr(5)
+        assert await counter.total() == 2
+        assert not await counter.decr(3)
+
+    @pytest.mark.asyncio
+    async def test_sharded_counter_concurrent(self, t):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+        await counter.init(50)
+
+        async def target():
+            c = ShardedCounter(t, name, shards=4)
+            sold = 0
+            while await c.decr():
+                sold += 1
+            return sold
+
+        sold = sum(await asyncio.gather(*[target() for _ in range(4)]))
+        # a worker may give up while another one moves stock between shards,
+        # but stock is never oversold nor lost.
+        while await counter.decr():
+            sold += 1
+        assert sold == 50
+        assert await counter.total() == 0
@@ -0,0 +1,33 @@
+import asyncio
+import uuid
+
+import pytest
+
+from tair.asyncio import SuggestionCache
+
+
+class TestSuggestionCache:
+    @pytest.mark.asyncio
+    async def test_suggestion_cache(self, t):
+        index = "idx_" + str(uuid.uuid4())
+        assert await t.tft_addsug(index, {"redis cluster": 10, "redis module": 7})
+        async with SuggestionCache(t, refresh_interval=None) as cache:
+            assert await cache.load(index) == 2
+            assert await cache.tft_getsug(index, "redis") == [
+                "redis cluster",
+                "redis module",
+            ]
+            assert cache.stats.hits == 1
+
+            assert await cache.tft_addsug(index, {"redis stack": 100}) == 1
+            assert await cache.tft_getsug(index, "redis", max_count=1) == [
+                "redis stack"
+            ]
+            assert cache.stats.misses == 1
+            while (index, "r") not in cache.store:
+                await asyncio.sleep(0.01)
+            assert await cache.tft_getsug(index, "redis", max_count=1) == [
+                "redis stack"
+            ]
+            assert cache.stats.hits == 2
+        await t.delete(index)
@@ -3,6 +3,7 @@ import uuid
 import pytest
 
 from tair import DataError, Tair, TairZsetItem
+from tair.tairzset import decode_scores
 
 
 class TestTairZset:
@@ -833,3 +834,31 @@ class TestTairZset:
             str(TairZsetItem(member.encode(), 100))
             == f"{{member: {member.encode()}, score: 100}}"
         )
+
+    @pytest.mark.asyncio
+    async def test_exzadd_tuple_score(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        member1 = "member_" + str(uuid.uuid4())
+        member2 = "member_" + str(uuid.uuid4())
+
+        assert await t.exzadd(key, {member1: (1, 2.5), member2: (1, 3)}) == 2
+        assert await t.exzscore(key, member1) == "1#2.5"
+        items = await t.exzrange(key, 0, -1, True)
+        assert decode_scores(items) == [(1.0, 2.5), (1.0, 3.0)]
+        assert await t.exzrankbyscore(key, (1, 3)) == 1
+        assert await t.exzrangebyscore(key, (1, 3), (1, 3)) == [
+            TairZsetItem(member2.encode(), None)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_exzadd_array(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        members = ["member_" + str(uuid.uuid4()) for _ in range(2)]
+
+        assert await t.exzadd_array(key, members, [(2, 1), (1, 1)]) == 2
+        assert await t.exzrange(key, 0, -1) == [
+            TairZsetItem(members[1].encode(), None),
+            TairZsetItem(members[0].encode(), None),
+        ]
+        with pytest.raises(DataError):
+            await t.exzadd_array(key, members, [1])
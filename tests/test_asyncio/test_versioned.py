@@ -0,0 +1,58 @@
+import asyncio
+import uuid
+
+import pytest
+
+from tair import ContentionStats
+from tair.asyncio.versioned import versioned_update, versioned_update_many
+
+
+class TestVersioned:
+    @pytest.mark.asyncio
+    async def test_versioned_update_string(self, t):
+        key = "key_" + str(uuid.uuid4())
+
+        assert await versioned_update(t, key, lambda v: 1 if v is None else int(v)) == 1
+        assert await versioned_update(t, key, lambda v: int(v) + 1) == 2
+        result = await t.exget(key)
+        assert result.value == b"2"
+        assert result.version == 2
+
+    @pytest.mark.asyncio
+    async def test_versioned_update_concurrent(self, t):
+        key = "key_" + str(uuid.uuid4())
+        stats = ContentionStats()
+        await t.exset(key, 0)
+
+        async def target():
+            for _ in range(20):
+                await versioned_update(
+                    t, key, lambda v: int(v) + 1, retries=1000, stats=stats
+                )
+
+        await asyncio.gather(*[target() for _ in range(4)])
+
+        assert (await t.exget(key)).value == b"80"
+        assert stats.updates == 80
+        assert stats.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_versioned_update_hash(self, t):
+        key = "key_" + str(uuid.uuid4())
+        field = "field_" + str(uuid.uuid4())
+
+        assert await versioned_update(t, key, lambda v: "a", field=field) == "a"
+        assert await versioned_update(t, key, lambda v: v + b"b", field=field) == b"ab"
+        assert (await t.exhgetwithver(key, field)).value == b"ab"
+
+    @pytest.mark.asyncio
+    async def test_versioned_update_many(self, t):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        await t.exset(key1, 10)
+
+        result = await versioned_update_many(
+            t, [key1, key2], lambda v: 1 if v is None else int(v) + 1
+        )
+        assert result == {key1: 11, key2: 1}
+        assert (await t.exget(key2)).value == b"1"
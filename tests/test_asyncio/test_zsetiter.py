@@ -0,0 +1,54 @@
+import uuid
+
+import pytest
+
+from tair.asyncio.zsetiter import (
+    iter_exzrange,
+    iter_exzrangebylex,
+    iter_exzrangebyscore,
+)
+
+
+class TestZsetIter:
+    @pytest.mark.asyncio
+    async def test_iter_exzrange(self, t):
+        key = "key_" + str(uuid.uuid4())
+        await t.exzadd(key, {f"member_{i:03d}": i for i in range(250)})
+        expected = [(f"member_{i:03d}".encode(), str(i)) for i in range(250)]
+
+        assert [e async for e in iter_exzrange(t, key, page_size=64)] == expected
+        assert [
+            e async for e in iter_exzrange(t, key, page_size=64, prefetch=True)
+        ] == expected
+
+    @pytest.mark.asyncio
+    async def test_iter_exzrangebyscore(self, t):
+        key = "key_" + str(uuid.uuid4())
+        await t.exzadd(key, {f"member_{i:03d}": i // 10 for i in range(250)})
+        expected = [(f"member_{i:03d}".encode(), str(i // 10)) for i in range(250)]
+
+        assert [e async for e in iter_exzrangebyscore(t, key, page_size=7)] == expected
+        assert [
+            e
+            async for e in iter_exzrangebyscore(
+                t, key, reverse=True, page_size=7, prefetch=True
+            )
+        ] == expected[::-1]
+
+    @pytest.mark.asyncio
+    async def test_iter_exzrangebylex(self, t):
+        key = "key_" + str(uuid.uuid4())
+        await t.exzadd(key, {f"member_{i:03d}": 0 for i in range(250)})
+        expected = [f"member_{i:03d}".encode() for i in range(250)]
+
+        assert [e async for e in iter_exzrangebylex(t, key, page_size=64)] == expected
+
+    @pytest.mark.asyncio
+    async def test_iter_close_early(self, t):
+        key = "key_" + str(uuid.uuid4())
+        await t.exzadd(key, {f"member_{i:03d}": i for i in range(250)})
+
+        it = iter_exzrange(t, key, page_size=8, prefetch=True)
+        assert await it.__anext__() == (b"member_000", "0")
+        await it.aclose()
+        assert await t.exzcard(key) == 250
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+from tair import AudienceEngine, DataError, Tair, TairCluster
+from tair.audience import And, Not, Or, cache_key, canonical, normalize
+
+SETS = {
+    "a": set(range(0, 1000, 2)),
+    "b": set(range(0, 1000, 3)),
+    "c": set(range(0, 1000, 5)),
+    "d": set(range(0, 100)),
+    "e": set(),
+}
+
+
+def setup_tags(t, tag=""):
+    prefix = "key_" + str(uuid.uuid4())
+    keys = {}
+    for name, offsets in SETS.items():
+        keys[name] = f"{tag}{prefix}:{name}"
+        if offsets:
+            t.tr_setbits(keys[name], offsets)
+    return prefix, keys
+
+
+class TestAudience:
+    def test_normalize(self):
+        expr = normalize(And("a", And("b", Or("c")), Not(Not("d")), "a"))
+        assert canonical(expr) == "AND('a','b','c','d')"
+        assert canonical(Or("b", "a")) == canonical(Or("a", "b"))
+        with pytest.raises(DataError):
+            normalize(And())
+
+    def test_cache_key(self):
+        assert cache_key("aud:", And("{x}:a", "{x}:b")).startswith(b"aud:{x}:")
+        assert cache_key("aud:", Not("a")).startswith(b"aud:{a}:")
+        key = cache_key("aud:", And("a", "b"))
+        assert key.startswith("aud:") and "{" not in key
+
+    def test_audience_count(self, t: Tair):
+        prefix, k = setup_tags(t)
+        engine = AudienceEngine(t, prefix=f"{prefix}:audience:", ttl=60)
+        a, b, c, d = SETS["a"], SETS["b"], SETS["c"], SETS["d"]
+
+        assert engine.count(k["a"]) == len(a)
+        assert engine.count(And(k["a"], k["b"])) == len(a & b)
+        assert engine.count(Or(k["a"], k["c"])) == len(a | c)
+        assert engine.count(And(k["a"], Not(k["b"]))) == len(a - b)
+        assert engine.count(And(Or(k["a"], k["b"]), k["d"], Not(k["c"]))) == len(
+            (a | b) & d - c
+        )
+        assert engine.count(And(k["a"], k["e"], Or(k["b"], k["c"]))) == 0
+        with pytest.raises(DataError):
+            engine.count(And(Not(k["a"]), Not(k["b"])))
+
+    def test_audience_select(self, t: Tair):
+        prefix, k = setup_tags(t)
+        engine = AudienceEngine(t, prefix=f"{prefix}:audience:", ttl=60)
+        expr = And(Or(k["a"], k["b"]), k["d"], Not(k["c"]))
+        expected = sorted((SETS["a"] | SETS["b"]) & SETS["d"] - SETS["c"])
+
+        key = engine.select(expr)
+        assert t.tr_range(key, 0, 1000) == expected
+        assert 0 < t.ttl(key) <= 60
+        assert engine.select(And(k["a"], k["e"])) is None
+
+        # the subexpressions are now cached.
+        bitops = engine.stats.bitops
+        assert engine.count(expr) == len(expected)
+        assert engine.stats.bitops == bitops
+        assert engine.stats.cache_hits > 0
+
+    def test_audience_cluster(self, tc: TairCluster):
+        tag = "{" + str(uuid.uuid4()) + "}"
+        prefix, k = setup_tags(tc, tag)
+        engine = AudienceEngine(tc, prefix=f"{prefix}:audience:", ttl=60)
+        expr = And(Or(k["a"], k["b"]), k["d"], Not(k["c"]))
+        expected = (SETS["a"] | SETS["b"]) & SETS["d"] - SETS["c"]
+
+        key = engine.select(expr)
+        assert tc.keyslot(key) == tc.keyslot(k["a"])
+        assert tc.tr_bitcount(key) == len(expected)
+        assert 0 < tc.ttl(key) <= 60
+        assert engine.count(expr) == len(expected)
@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+
+from tair import CacheAside, Tair
+
+
+class TestCacheAside:
+    def test_cache_aside_hit_miss(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        assert cache.get(key, lambda: "value") == "value"
+        assert cache.get(key, lambda: "other") == "value"
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+        assert cache.stats.loads == 1
+        assert 0 < t.pttl(key) <= 10000
+        assert t.exget(key + ":stale").value == b'"value"'
+
+    def test_cache_aside_release_lease(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        assert cache.get(key, lambda: {"a": [1, 2]}) == {"a": [1, 2]}
+        assert not t.exists(key + ":lease")
+        assert cache.get(key, lambda: None) == {"a": [1, 2]}
+
+    def test_cache_aside_single_flight(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+        calls = []
+        results = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get(key, loader)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+
+    def test_cache_aside_serve_stale(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10)
+
+        cache.get(key, lambda: "old")
+        t.delete(key)
+        # another process holds the recompute lease.
+        assert t.set(key + ":lease", "other", ex=10, nx=True)
+        assert cache.get(key, lambda: "new") == "old"
+        assert cache.stats.stale_hits == 1
+        assert not t.exists(key)
+
+    def test_cache_aside_invalidate(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10, lease=0.5)
+
+        cache.get(key, lambda: "old")
+        cache.invalidate(key)
+        assert not t.exists(key + ":stale")
+        # another process holds the recompute lease and there is no stale copy
+        # left to serve, so the lease holder is waited for.
+        assert t.set(key + ":lease", "other", px=500, nx=True)
+        assert cache.get(key, lambda: "new") == "new"
+        assert cache.stats.stale_hits == 0
+
+    def test_cache_aside_wait_for_lease_holder(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        cache = CacheAside(t, ttl=10, lease=2)
+
+        assert t.set(key + ":lease", "other", ex=2, nx=True)
+        timer = threading.Timer(0.2, lambda: t.exset(key, '"filled"'))
+        timer.start()
+        assert cache.get(key, lambda: "mine") == "filled"
+        timer.join()
+        assert cache.stats.loads == 0
+
+    def test_cache_aside_early_refresh(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        # a huge beta makes every hit refresh early.
+        cache = CacheAside(t, ttl=10, early_refresh=True, beta=1e15)
+
+        cache.get(key, lambda: "v1")
+        assert cache.get(key, lambda: "v2") == "v2"
+        assert cache.stats.early_refreshes == 1
+        assert t.exget(key).value == b'"v2"'
+        assert not t.exists(key + ":lease")
+        assert t.exget(key + ":stale").version == 2
@@ -0,0 +1,93 @@
+import time
+import uuid
+
+import pytest
+
+from tair import (
+    BufferFullError,
+    ConnectionError,
+    CounterBuffer,
+    DataError,
+    ResponseError,
+    Tair,
+    TairError,
+)
+
+
+class TestCounterBuffer:
+    def test_counter_buffer_flush(self, t: Tair):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        field = "field_" + str(uuid.uuid4())
+
+        buffer = CounterBuffer(t, flush_interval=60)
+        for _ in range(10):
+            assert buffer.incr(key1) is None
+            assert buffer.incr(key2, 2, field=field) is None
+        assert len(buffer) == 2
+        assert t.exists(key1) == 0
+
+        assert buffer.flush() == 2
+        assert len(buffer) == 0
+        assert t.exget(key1).value == b"10"
+        assert t.exhget(key2, field) == b"20"
+        assert buffer.increments == 20
+        assert buffer.commands == 2
+        buffer.close()
+
+    def test_counter_buffer_size_trigger(self, t: Tair):
+        keys = ["key_" + str(uuid.uuid4()) for _ in range(10)]
+
+        with CounterBuffer(t, flush_size=2, max_size=4, flush_interval=60) as buffer:
+            for key in keys:
+                buffer.incr(key)
+            # the buffer never holds more than max_size counters.
+            assert len(buffer) <= 4
+
+        for key in keys:
+            assert t.exget(key).value == b"1"
+
+    def test_counter_buffer_time_trigger(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+
+        with CounterBuffer(t, flush_interval=0.1) as buffer:
+            buffer.incr(key, 5)
+            time.sleep(0.5)
+            assert t.exget(key).value == b"5"
+
+    def test_counter_buffer_bounded(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+
+        with CounterBuffer(t, flush_interval=60) as buffer:
+            assert buffer.incr(key, 1, maxval=2) == 1
+            assert buffer.incr(key, 1, maxval=2) == 2
+            with pytest.raises(ResponseError):
+                buffer.incr(key, 1, maxval=2)
+            assert len(buffer) == 0
+
+    def test_counter_buffer_close(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+
+        buffer = CounterBuffer(t, flush_interval=60)
+        buffer.incr(key, 3)
+        buffer.close()
+        assert t.exget(key).value == b"3"
+
+        with pytest.raises(TairError):
+            buffer.incr(key)
+
+        with pytest.raises(DataError):
+            CounterBuffer(t, flush_size=10, max_size=1)
+
+    def test_counter_buffer_full(self):
+        # nothing listens on port 1, so every flush fails.
+        buffer = CounterBuffer(
+            Tair(port=1), flush_size=1, max_size=1, flush_interval=60
+        )
+        buffer.incr("key1")
+        buffer.incr("key1", 2)
+        with pytest.raises(BufferFullError):
+            buffer.incr("key2")
+        assert buffer.increments == 2
+        with pytest.raises(ConnectionError):
+            buffer.close()
@@ -0,0 +1,44 @@
+import uuid
+
+import pytest
+
+from tair import BloomDedup, DataError, ShardedBloom, Tair
+
+
+class TestBloomDedup:
+    def test_dedup(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        dedup = BloomDedup(
+            t, key, batch_size=100, in_flight=3, capacity=10000, error_rate=1e-6
+        )
+        items = [f"item_{i % 700}" for i in range(2000)]
+
+        assert sorted(dedup.dedup(items)) == sorted(f"item_{i}" for i in range(700))
+        assert list(dedup.dedup(["item_0", "item_new", "item_new"])) == ["item_new"]
+        assert dedup.stats.items == 2003
+        assert dedup.stats.unseen == 701
+        assert dedup.stats.batches == 21
+        assert dedup.stats.throughput > 0
+
+    def test_dedup_batch_bytes(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        dedup = BloomDedup(t, key, batch_bytes=100, capacity=1000, error_rate=0.001)
+        items = [f"item_{i:05d}" for i in range(100)]
+
+        assert list(dedup.dedup(iter(items))) == items
+        assert dedup.stats.batches == 10
+
+    def test_dedup_sharded(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ShardedBloom(t, name, capacity=10000, shards=4)
+        dedup = BloomDedup(t, bloom, batch_size=100)
+        items = [f"item_{i}" for i in range(500)]
+
+        assert list(dedup.dedup(items)) == items
+        assert list(dedup.dedup(items)) == []
+
+    def test_dedup_invalid_args(self, t: Tair):
+        with pytest.raises(DataError):
+            BloomDedup(t, "key", batch_size=0)
+        with pytest.raises(DataError):
+            BloomDedup(t, "key", in_flight=0)
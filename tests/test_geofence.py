@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+
+from tair import DataError, Tair
+from tair.geofence import contains_points, point_wkts
+
+STORES = {
+    "store-1": "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0))",
+    "store-2": "POLYGON ((5 5, 15 5, 15 15, 5 15, 5 5))",
+}
+
+
+def create_area(t: Tair) -> str:
+    area = "area_" + str(uuid.uuid4())
+    assert t.gis_add(area, STORES) == 2
+    return area
+
+
+class TestGeofence:
+    def test_point_wkts(self):
+        assert point_wkts([120.5, 1], (30, -2.25)) == [
+            "POINT(120.500000 30.000000)",
+            "POINT(1.000000 -2.250000)",
+        ]
+        assert point_wkts([1.23456789], [0], precision=2) == ["POINT(1.23 0.00)"]
+        assert point_wkts([], []) == []
+        with pytest.raises(DataError):
+            point_wkts([1, 2], [1])
+        with pytest.raises(DataError):
+            point_wkts([float("nan")], [1])
+
+    def test_contains_points(self, t: Tair):
+        area = create_area(t)
+        lons = [1, 7, 12, 20] * 5
+        lats = [1, 7, 12, 20] * 5
+        matches = contains_points(t, area, lons, lats, chunk_size=3, workers=2)
+        assert len(matches) == 20
+        assert matches[0] == [b"store-1"]
+        assert sorted(matches[1]) == [b"store-1", b"store-2"]
+        assert matches[2] == [b"store-2"]
+        assert matches[3] == []
+        assert matches[:4] == matches[4:8]
+
+        sparse = contains_points(t, area, lons, lats, chunk_size=3, sparse=True)
+        assert sparse == {i: names for i, names in enumerate(matches) if names}
+        assert 3 not in sparse
+        t.delete(area)
+
+    def test_contains_points_numpy(self, t: Tair):
+        np = pytest.importorskip("numpy")
+        area = create_area(t)
+        lons = np.array([1.5, 12.5, 30.0])
+        lats = np.array([1.5, 12.5, 30.0])
+        assert contains_points(t, area, lons, lats, sparse=True) == {
+            0: [b"store-1"],
+            1: [b"store-2"],
+        }
+        with pytest.raises(DataError):
+            contains_points(t, area, lons, lats, chunk_size=0)
+        t.delete(area)
@@ -0,0 +1,30 @@
+import threading
+import time
+
+from tair.inflight import iter_in_flight
+
+
+class TestInFlight:
+    def test_iter_in_flight(self):
+        taken = []
+        running = []
+        lock = threading.Lock()
+
+        def items():
+            for i in range(10):
+                taken.append(i)
+                yield i
+
+        def fn(i):
+            with lock:
+                running.append(i)
+            time.sleep(0.01 * (10 - i))
+            return i * i
+
+        results = []
+        for item, future in iter_in_flight(fn, items(), 3):
+            # no more than 3 items are taken ahead of the one handed over.
+            assert len(taken) <= item + 3
+            results.append((item, future.result()))
+        assert results == [(i, i * i) for i in range(10)]
+        assert sorted(running) == list(range(10))
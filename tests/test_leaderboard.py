@@ -0,0 +1,81 @@
+import uuid
+
+from tair import ShardedLeaderboard, Tair, TairCluster, TairZsetItem
+
+
+class TestShardedLeaderboard:
+    def test_leaderboard_exzadd(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        mapping = {f"member_{i}": i for i in range(100)}
+
+        assert lb.exzadd(mapping) == 100
+        assert lb.exzcard() == 100
+        assert sum(t.exzcard(key) for key in lb.keys) == 100
+        assert lb.exzscore("member_42") == "42"
+        assert lb.exzincrby(1, "member_42") == "43"
+        assert lb.exzrem(["member_42", "member_43"]) == 2
+        assert lb.exzcard() == 98
+
+    def test_leaderboard_top(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        lb.exzadd({f"member_{i}": i for i in range(100)})
+
+        assert lb.top(3) == [
+            TairZsetItem(b"member_99", "99"),
+            TairZsetItem(b"member_98", "98"),
+            TairZsetItem(b"member_97", "97"),
+        ]
+        assert lb.exzrevrange(10, 11) == [
+            TairZsetItem(b"member_89", None),
+            TairZsetItem(b"member_88", None),
+        ]
+        assert lb.exzrange(0, 1, withscores=True) == [
+            TairZsetItem(b"member_0", "0"),
+            TairZsetItem(b"member_1", "1"),
+        ]
+        assert lb.top(0) == []
+
+    def test_leaderboard_rank(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        lb.exzadd({f"member_{i}": i for i in range(100)})
+
+        for i in (0, 1, 50, 99):
+            assert lb.exzrank(f"member_{i}") == i
+            assert lb.exzrevrank(f"member_{i}") == 99 - i
+        assert lb.exzrank("member_none") is None
+        assert lb.exzrevrank("member_none") is None
+
+    def test_leaderboard_rank_ties(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        lb.exzadd({f"member_{i}": i % 3 for i in range(30)})
+
+        # tied members rank in the order exzrange and exzrevrange give them.
+        for i, item in enumerate(lb.exzrange(0, 29)):
+            assert lb.exzrank(item.member) == i
+        for i, item in enumerate(lb.exzrevrange(0, 29)):
+            assert lb.exzrevrank(item.member) == i
+
+    def test_leaderboard_multi_score(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(t, name, shards=4)
+        lb.exzadd({f"member_{i}": (i % 10, i) for i in range(100)})
+
+        assert [item.member for item in lb.top(2)] == [b"member_99", b"member_89"]
+        assert lb.exzrevrank("member_99") == 0
+
+    def test_leaderboard_cluster(self, tc: TairCluster):
+        name = "key_" + str(uuid.uuid4())
+        lb = ShardedLeaderboard(tc, name, shards=8)
+        lb.exzadd({f"member_{i}": i for i in range(100)})
+
+        assert len({tc.keyslot(key) for key in lb.keys}) > 1
+        assert [item.member for item in lb.top(2)] == [b"member_99", b"member_98"]
+        assert lb.exzrevrank("member_97") == 2
+
+        lb.exzadd({f"tied_{i}": 50 for i in range(10)})
+        for i, item in enumerate(lb.exzrevrange(0, 109)):
+            assert lb.exzrevrank(item.member) == i
@@ -0,0 +1,51 @@
+import uuid
+
+from tair import LocalBitmap, Tair
+from tair.localbitmap import fetch_bitmap, fetch_dense_bitmap, store_bitmap
+
+
+class TestLocalBitmap:
+    def test_local_bitmap_ops(self):
+        a = LocalBitmap([5, 1, 3, 3, 10])
+        b = LocalBitmap(range(3, 8))
+
+        assert list(a) == [1, 3, 5, 10]
+        assert len(a) == 4
+        assert 3 in a and 4 not in a
+        assert list(a & b) == [3, 5]
+        assert list(a | b) == [1, 3, 4, 5, 6, 7, 10]
+        assert list(a ^ b) == [1, 4, 6, 7, 10]
+        assert list(a - b) == [1, 10]
+        assert a.rank(5) == 3
+        assert a.rank(0) == 0
+        assert a.jaccard(b) == 2 / 7
+        assert a.min() == 1 and a.max() == 10
+        assert LocalBitmap().min() == -1
+        assert a == LocalBitmap([1, 3, 5, 10])
+        assert a != b
+        assert str(LocalBitmap([1, 2])) == "{cardinality: 2, offsets: [1, 2]}"
+
+    def test_fetch_bitmap(self, t: Tair):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        offsets1 = list(range(0, 100000, 7))
+        offsets2 = list(range(50000, 60000))
+        t.tr_setbits(key1, offsets1)
+        t.tr_setbits(key2, offsets2)
+
+        a = fetch_bitmap(t, key1, page_size=1000)
+        b = fetch_dense_bitmap(t, key2, window=4096)
+        assert list(a) == offsets1
+        assert list(b) == offsets2
+        assert fetch_bitmap(t, key1, page_size=1000, prefetch=False) == a
+        assert len(a & b) == t.tr_bitopcard("AND", [key1, key2])
+        assert a.rank(70000) == t.tr_rank(key1, 70000)
+        assert len(fetch_bitmap(t, "key_" + str(uuid.uuid4()))) == 0
+
+    def test_store_bitmap(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        t.tr_setbits(key, [1, 2, 3])
+
+        bitmap = LocalBitmap([2, 3, 4]) | LocalBitmap(range(100, 200))
+        assert store_bitmap(t, key, bitmap) == 102
+        assert t.tr_getbits(key, [1, 2, 150]) == [0, 1, 1]
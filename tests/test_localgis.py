@@ -0,0 +1,124 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from tair import DataError, LocalGis, Tair
+from tair.localgis import AreaIndex, GridIndex, locate, parse_wkt, polygon_contains
+
+CAMPUS = "POLYGON ((30 10, 40 40, 20 40, 10 20, 30 10))"
+
+
+def create_area(t: Tair) -> str:
+    area = "area_" + str(uuid.uuid4())
+    assert t.gis_add(area, {"campus": CAMPUS}) == 1
+    return area
+
+
+class TestGeometry:
+    def test_parse_wkt(self):
+        assert parse_wkt("POINT (30 11)").rings == [[(30.0, 11.0)]]
+        assert parse_wkt(b"LINESTRING(30 10,40 40)").bbox == (30, 10, 40, 40)
+        polygon = parse_wkt("POLYGON ((0 0, 4 0, 4 4, 0 4), (1 1, 2 1, 2 2, 1 1))")
+        assert len(polygon.rings) == 2 and polygon.rings[0][-1] == (0, 0)
+        assert parse_wkt("MULTIPOINT ((1 1), (2 2))") is None
+        assert parse_wkt("POINT (1)") is None
+        assert parse_wkt("not wkt") is None
+
+    def test_predicates(self):
+        square = parse_wkt(
+            "POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0), (1 1, 2 1, 2 2, 1 2, 1 1))"
+        )
+        assert locate(3, 3, square.rings) == 1
+        assert locate(4, 2, square.rings) == 0
+        assert locate(1.5, 1.5, square.rings) == -1
+        assert locate(5, 5, square.rings) == -1
+
+        u = parse_wkt("POLYGON ((0 0, 3 0, 3 3, 2 3, 2 1, 1 1, 1 3, 0 3, 0 0))")
+        assert polygon_contains(u, parse_wkt("LINESTRING (0.5 0.5, 2.5 0.5)"))
+        assert not polygon_contains(u, parse_wkt("LINESTRING (0.5 2, 2.5 2)"))
+        assert not polygon_contains(square, parse_wkt("POLYGON ((0 0, 3 0, 3 3, 0 0))"))
+
+    def test_area_index(self):
+        members = []
+        for i in range(100):
+            x, y = i % 10 * 10, i // 10 * 10
+            members += [
+                f"cell-{i}".encode(),
+                f"POLYGON (({x} {y}, {x + 10} {y}, {x + 10} {y + 10}, {x} {y + 10}))",
+            ]
+        index = AreaIndex(members)
+        assert index.supported and len(index) == 100
+        assert index.reply(index.contains(parse_wkt("POINT (15 25)")), True) == [
+            1,
+            [b"cell-21"],
+        ]
+        assert index.contains(parse_wkt("POINT (10 10)")) == [0, 1, 10, 11]
+        assert index.within(parse_wkt("POLYGON ((0 0, 20 0, 20 10, 0 10))")) == [0, 1]
+        assert index.intersects(parse_wkt("LINESTRING (5 5, 5 25)")) == [0, 10, 20]
+        assert not AreaIndex([b"p", b"POINT (1 1)"]).supported
+
+    def test_grid_index(self):
+        boxes = [(i, i, i + 1, i + 1) for i in range(0, 100, 10)]
+        grid = GridIndex(boxes + [(0, 0, 100, 100)])
+        assert grid.large == [10]
+        assert grid.candidates((0.5, 0.5, 0.5, 0.5)) == [0, 10]
+        assert grid.candidates((55, 55, 55, 55)) == [10]
+        assert grid.candidates((0, 0, 100, 100)) == list(range(11))
+
+
+class TestLocalGis:
+    def test_local_gis(self, t: Tair):
+        area = create_area(t)
+        local = LocalGis(t)
+        for command, wkt in (
+            ("gis_contains", "POINT (30 11)"),
+            ("gis_contains", "POINT (50 50)"),
+            ("gis_within", "POLYGON ((30 5, 50 50, 20 50, 5 20, 30 5))"),
+            ("gis_intersects", "LINESTRING (30 10, 40 40)"),
+        ):
+            for withoutwkts in (False, True):
+                assert getattr(local, command)(area, wkt, withoutwkts) == getattr(
+                    t, command
+                )(area, wkt, withoutwkts)
+        assert local.stats.loads == 1 and local.stats.fallbacks == 0
+
+        # unsupported geometries are sent to the server.
+        local.gis_contains(area, "MULTIPOINT ((30 11), (31 12))")
+        assert local.stats.fallbacks == 1
+        t.delete(area)
+
+    def test_local_gis_invalidate(self, t: Tair):
+        area = create_area(t)
+        local = LocalGis(t)
+        local.area_index(area)
+
+        # invalidate waits for a load under way, which holds the lock.
+        with local._lock:
+            thread = threading.Thread(target=local.invalidate, args=(area,))
+            thread.start()
+            thread.join(0.1)
+            assert thread.is_alive()
+        thread.join()
+        local.area_index(area)
+        assert local.stats.loads == 2
+        t.delete(area)
+
+    def test_local_gis_refresh(self, t: Tair):
+        area = create_area(t)
+        version_key = area + ":version"
+        local = LocalGis(t, ttl=60, version_key=lambda a: a + ":version")
+        outer = LocalGis(t, version_key=lambda a: a + ":version", check_interval=0.1)
+        assert outer.gis_contains(area, "POINT (50 50)") == [0, []]
+
+        assert local.gis_add(area, {"big": "POLYGON ((0 0, 100 0, 100 100, 0 0))"})
+        assert local.gis_contains(area, "POINT (50 40)", True) == [1, [b"big"]]
+        time.sleep(0.2)
+        assert outer.gis_contains(area, "POINT (50 40)", True) == [1, [b"big"]]
+        assert outer.stats.version_checks == 1 and outer.stats.loads == 2
+        t.delete(area)
+        t.delete(version_key)
+
+        with pytest.raises(DataError):
+            LocalGis(t, ttl=0)
@@ -0,0 +1,121 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from tair import Lock, LockError, LockNotOwnedError, Tair, TairCluster
+
+
+class TestLock:
+    def test_lock_acquire_release(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name)
+
+        assert lock.acquire()
+        assert lock.locked()
+        assert t.exget(name).version == lock.token
+        assert not Lock(t, name).acquire(blocking=False)
+        with pytest.raises(LockError):
+            lock.acquire()
+
+        lock.release()
+        assert not lock.locked()
+        assert not t.exists(name)
+        with pytest.raises(LockError):
+            lock.release()
+
+    def test_lock_fencing_token(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        tokens = []
+
+        for _ in range(3):
+            with Lock(t, name) as lock:
+                tokens.append(lock.token)
+        assert tokens == sorted(tokens)
+        assert len(set(tokens)) == 3
+
+    def test_lock_timeout(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+
+        with Lock(t, name):
+            start = time.monotonic()
+            assert not Lock(t, name).acquire(timeout=1)
+            assert time.monotonic() - start >= 1
+
+    def test_lock_timeout_subsecond(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+
+        with Lock(t, name):
+            start = time.monotonic()
+            assert not Lock(t, name).acquire(timeout=0.1)
+            assert time.monotonic() - start < 0.5
+
+    def test_lock_renew(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+
+        with Lock(t, name, lease=1) as lock:
+            time.sleep(2)
+            assert lock.locked()
+            assert 0 < t.pttl(name) <= 1000
+
+    def test_lock_expired(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=1, renew=False)
+
+        assert lock.acquire()
+        time.sleep(1.5)
+        other = Lock(t, name)
+        assert other.acquire(blocking=False)
+        assert other.token > lock.token
+        assert not lock.extend()
+        with pytest.raises(LockNotOwnedError):
+            lock.release()
+        other.release()
+
+    def test_lock_stale_holder(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=1, renew=False)
+
+        assert lock.acquire()
+        assert lock.extend()
+        assert t.exget(name).version == lock.token
+        time.sleep(1.5)
+        # the next token is the version the key would have had after the
+        # renewal, if renewing bumped it.
+        other = Lock(t, name)
+        assert other.acquire(blocking=False)
+        assert other.token == lock.token + 1
+        assert not lock.extend()
+        with pytest.raises(LockNotOwnedError):
+            lock.release()
+        assert t.exget(name).value == other.owner.encode()
+        other.release()
+
+    def test_lock_wakeup(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        lock = Lock(t, name, lease=10)
+        acquired = []
+
+        def waiter():
+            with Lock(t, name) as other:
+                acquired.append(other.token)
+
+        assert lock.acquire()
+        token = lock.token
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.2)
+        start = time.monotonic()
+        lock.release()
+        thread.join()
+        # the waiter is woken up by the release rather than the lease expiry.
+        assert time.monotonic() - start < 1
+        assert acquired[0] > token
+
+    def test_lock_cluster(self, tc: TairCluster):
+        name = "key_" + str(uuid.uuid4())
+
+        with Lock(tc, name) as lock:
+            assert tc.exget(name).version == lock.token
+        assert not tc.exists(name)
@@ -0,0 +1,108 @@
+import uuid
+
+import pytest
+
+from tair import DataError, Tair, TairCluster
+from tair.roaringbitop import (
+    cluster_bitop,
+    cluster_bitopcard,
+    iter_bitop,
+    same_slot,
+    slot_tag,
+    temp_key,
+)
+
+OFFSETS1 = list(range(0, 30000, 2))
+OFFSETS2 = list(range(0, 30000, 3))
+OFFSETS3 = list(range(0, 30000, 5))
+
+
+def expected(operation, *sets):
+    if operation == "AND":
+        return set.intersection(*sets)
+    if operation == "OR":
+        return set.union(*sets)
+    if operation == "XOR":
+        result = set()
+        for s in sets:
+            result ^= s
+        return result
+    return sets[0] - set.union(*sets[1:])
+
+
+class TestRoaringBitop:
+    def test_bitop_same_slot(self, t: Tair):
+        tag = "{" + str(uuid.uuid4()) + "}"
+        keys = [f"key_{tag}_{i}" for i in range(3)]
+        for key, offsets in zip(keys, (OFFSETS1, OFFSETS2, OFFSETS3)):
+            t.tr_setbits(key, offsets)
+        dest = f"key_{tag}_dest"
+
+        assert same_slot(t, [dest, *keys])
+        assert cluster_bitop(t, dest, "AND", keys) == len(
+            expected("AND", set(OFFSETS1), set(OFFSETS2), set(OFFSETS3))
+        )
+        assert cluster_bitopcard(t, "ANDNOT", keys[:2]) == len(
+            expected("DIFF", set(OFFSETS1), set(OFFSETS2))
+        )
+
+    def test_iter_bitop(self, t: Tair):
+        keys = ["key_" + str(uuid.uuid4()) for _ in range(3)]
+        sets = []
+        for key, offsets in zip(keys, (OFFSETS1, OFFSETS2, OFFSETS3)):
+            t.tr_setbits(key, offsets)
+            sets.append(set(offsets))
+
+        for operation in ("AND", "OR", "XOR", "DIFF"):
+            result = list(iter_bitop(t, operation, keys, page_size=1000))
+            assert result == sorted(expected(operation, *sets))
+
+    def test_bitop_invalid_args(self, t: Tair):
+        with pytest.raises(DataError):
+            cluster_bitopcard(t, "NAND", ["key"])
+        with pytest.raises(DataError):
+            cluster_bitopcard(t, "AND", [])
+        with pytest.raises(DataError):
+            list(iter_bitop(t, "NOT", ["key"]))
+
+    def test_bitop_cross_slot(self, tc: TairCluster):
+        keys = ["key_" + str(uuid.uuid4()) for _ in range(3)]
+        sets = []
+        for key, offsets in zip(keys, (OFFSETS1, OFFSETS2, OFFSETS3)):
+            tc.tr_setbits(key, offsets)
+            sets.append(set(offsets))
+        dest = "key_" + str(uuid.uuid4())
+
+        assert not same_slot(tc, [dest, *keys])
+        for operation in ("AND", "OR", "XOR", "ANDNOT"):
+            result = expected(operation, *sets)
+            assert cluster_bitopcard(tc, operation, keys, page_size=1000) == len(result)
+            assert cluster_bitop(tc, dest, operation, keys, chunk_size=1000) == len(
+                result
+            )
+            assert tc.tr_bitcount(dest) == len(result)
+            assert tc.tr_range(dest, 0, 100) == sorted(x for x in result if x <= 100)
+
+    def test_bitop_cross_slot_dest_in_keys(self, tc: TairCluster):
+        dest = "key_" + str(uuid.uuid4())
+        other = "key_" + str(uuid.uuid4())
+        tc.tr_setbits(dest, OFFSETS1)
+        tc.tr_setbits(other, OFFSETS2)
+        result = set(OFFSETS1) & set(OFFSETS2)
+
+        assert not same_slot(tc, [dest, other])
+        assert cluster_bitop(tc, dest, "AND", [dest, other], chunk_size=1000) == len(
+            result
+        )
+        assert tc.tr_bitcount(dest) == len(result)
+        assert cluster_bitop(tc, dest, "AND", [dest, "key_" + str(uuid.uuid4())]) == 0
+        assert not tc.exists(dest)
+
+    def test_temp_key(self):
+        assert slot_tag("dest") == b"dest"
+        assert slot_tag(b"a{tag}b{c}") == b"tag"
+        assert slot_tag("a{}b") is None
+        assert temp_key("dest").startswith(b"{dest}:bitop:")
+        assert temp_key(b"a{tag}b").startswith(b"{tag}:bitop:")
+        with pytest.raises(DataError):
+            temp_key("a{}b")
@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+
+from tair import DataError, Tair
+from tair.roaringbulk import bulk_setbits, iter_batches, plan_setbits
+
+
+class TestRoaringBulk:
+    def test_plan_setbits(self):
+        np = pytest.importorskip("numpy")
+        offsets = np.array([7, 3, 7] + list(range(100, 200)) + [1000, 1001])
+
+        assert list(iter_batches(plan_setbits(offsets, 2, 64), 2)) == [
+            [("tr_setrange", (100, 199)), ("tr_setbits", ([3, 7],))],
+            [("tr_setbits", ([1000, 1001],))],
+        ]
+        assert list(iter_batches(plan_setbits(iter([2, 1, 2]), 10, 64), 8)) == [
+            [("tr_setbits", ([1, 2],))]
+        ]
+        with pytest.raises(DataError):
+            list(plan_setbits([1, -1], 10, 64))
+
+    def test_bulk_setbits(self, t: Tair):
+        np = pytest.importorskip("numpy")
+        key = "key_" + str(uuid.uuid4())
+        rng = np.random.default_rng(0)
+        sparse = rng.integers(0, 10**9, 100000)
+        dense = np.arange(5 * 10**8, 5 * 10**8 + 100000)
+        offsets = np.concatenate((sparse, dense, sparse[:1000]))
+        expected = len(np.union1d(sparse, dense))
+
+        assert bulk_setbits(t, key, offsets, chunk_size=4096) == expected
+        assert t.tr_bitcount(key) == expected
+        assert t.tr_getbits(key, [int(sparse[0]), 5 * 10**8 + 99999]) == [1, 1]
+
+    def test_bulk_setbits_generator(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+
+        assert t.tr_setbits(key, [1, 2, 3]) == 3
+        assert bulk_setbits(t, key, (i * 3 for i in range(1000)), chunk_size=100) == (
+            1002
+        )
+        assert bulk_setbits(t, key, range(10), replace=True) == 10
+        assert t.tr_getbits(key, [9, 10, 12]) == [1, 0, 0]
+        assert bulk_setbits(t, key, []) == 10
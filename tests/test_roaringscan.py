@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+
+from tair import DataError, Tair
+from tair.roaringscan import iter_tr_scan, scan_count
+from tair.tairroaring import TrScanResult
+
+
+class TestRoaringScan:
+    def test_scan_count(self):
+        assert scan_count(TrScanResult(10, [9]), 1000, 10000) == 250
+        assert scan_count(TrScanResult(10, [9]), 1000, 100) == 100
+        assert scan_count(TrScanResult(10, [9]), 1, 100) == 1
+
+    def test_iter_tr_scan(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        offsets = list(range(0, 100000, 7))
+        t.tr_setbits(key, offsets)
+
+        assert list(iter_tr_scan(t, key, count=10, target_bytes=4096)) == offsets
+        assert list(iter_tr_scan(t, key, count=10, prefetch=False)) == offsets
+        assert list(iter_tr_scan(t, key, start_offset=700)) == offsets[100:]
+        assert list(iter_tr_scan(t, "key_" + str(uuid.uuid4()))) == []
+        with pytest.raises(DataError):
+            list(iter_tr_scan(t, key, count=0))
+
+    def test_iter_tr_scan_chunks(self, t: Tair):
+        np = pytest.importorskip("numpy")
+        key = "key_" + str(uuid.uuid4())
+        offsets = list(range(0, 100000, 7))
+        t.tr_setbits(key, offsets)
+
+        chunks = list(iter_tr_scan(t, key, count=100, target_bytes=4096, chunks=True))
+        assert len(chunks) > 1
+        assert all(chunk.dtype == np.uint64 for chunk in chunks)
+        assert np.concatenate(chunks).tolist() == offsets
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+from tair import DataError, ScalableBloom, Tair
+
+
+class TestScalableBloom:
+    def test_scalable_bloom_add(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ScalableBloom(t, name, capacity=100)
+
+        assert bloom.add("item_1") is True
+        assert bloom.add("item_1") is False
+        assert bloom.exists("item_1") is True
+        assert bloom.exists("item_2") is False
+        assert bloom.madd(["item_2", "item_3", "item_2", "item_1"]) == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        assert bloom.mexists(["item_1", "item_2", "item_4"]) == [True, True, False]
+
+    def test_scalable_bloom_grow(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ScalableBloom(t, name, capacity=100, error_rate=0.01)
+        items = [f"item_{i}" for i in range(1000)]
+        for i in range(0, len(items), 50):
+            bloom.madd(items[i : i + 50])
+
+        filters = bloom.filters()
+        assert len(filters) > 1
+        assert [f.capacity for f in filters[:3]] == [100, 200, 400]
+        assert all(a.error_rate > b.error_rate for a, b in zip(filters, filters[1:]))
+        assert sum(f.error_rate for f in filters) < 0.01
+        assert sum(f.count for f in filters) <= 1000
+        assert all(bloom.mexists(items))
+        assert 0 <= bloom.fill() < 1
+
+    def test_scalable_bloom_shared(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom1 = ScalableBloom(t, name, capacity=10)
+        bloom2 = ScalableBloom(t, name, capacity=10)
+
+        assert bloom1.add("item_0") is True
+        assert bloom2.exists("item_0") is True
+        for i in range(100):
+            bloom2.add(f"item_{i + 1}")
+        # bloom1 still knows a single filter, and finds the newer ones.
+        assert bloom1.exists("item_100") is True
+        assert bloom1.add("item_100") is False
+
+    def test_scalable_bloom_ttl(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ScalableBloom(t, name, capacity=10, ttl=100)
+        bloom.add("item_1")
+
+        assert 0 < t.ttl(bloom.meta) <= 100
+        assert 0 < t.ttl(bloom.key_of(0)) <= 100
+        assert 0 < t.exhttl(bloom.meta, "count:0") <= 100
+
+    def test_scalable_bloom_invalid_args(self, t: Tair):
+        with pytest.raises(DataError):
+            ScalableBloom(t, "key", capacity=0)
+        with pytest.raises(DataError):
+            ScalableBloom(t, "key", error_rate=1)
+        with pytest.raises(DataError):
+            ScalableBloom(t, "key", tightening=1)
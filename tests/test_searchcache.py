@@ -0,0 +1,88 @@
+import json
+import time
+import uuid
+
+import pytest
+
+from tair import DataError, SearchCache, SearchResult, Tair
+from tair.searchcache import normalize_query
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": {
+      "product_id": { "type": "keyword" },
+      "price": { "type": "double" }
+    }
+  }
+}"""
+QUERY = '{"query":{"term":{"product_id":"p1"}},"sort":[{"price":{"order":"desc"}}]}'
+
+
+def create_index(t: Tair) -> str:
+    index = "idx_" + str(uuid.uuid4())
+    assert t.tft_createindex(index, MAPPINGS)
+    for i in range(4):
+        t.tft_adddoc(index, json.dumps({"product_id": "p1", "price": i}), f"{i:05}")
+    return index
+
+
+class TestSearchCache:
+    def test_normalize_query(self):
+        assert normalize_query('{ "b": 1,\n "a": [1, 2] }') == '{"a":[1,2],"b":1}'
+        assert normalize_query("not json") == "not json"
+
+    def test_search_cache(self, t: Tair):
+        index = create_index(t)
+        cache = SearchCache(t, ttl=60)
+
+        first = cache.tft_search(index, QUERY)
+        assert cache.tft_search(index, json.dumps(json.loads(QUERY), indent=2)) == first
+        assert cache.stats.hits == 1 and cache.stats.misses == 1
+        assert SearchResult(first).total == 4
+
+        # a write through the cache invalidates the results of its index.
+        cache.tft_adddoc(index, '{"product_id":"p1","price":10}', "00010")
+        assert SearchResult(cache.tft_search(index, QUERY)).ids[0] == "00010"
+        assert cache.stats.misses == 2 and cache.stats.stale == 1
+        cache.tft_deldoc(index, ["00010"])
+        assert SearchResult(cache.tft_search(index, QUERY)).total == 4
+
+        reply = cache.tft_msearch(1, [index], QUERY)
+        assert cache.tft_msearch(1, [index], QUERY) == reply
+        cache.tft_incrlongdocfield(index, "00000", "price", 100)
+        assert SearchResult(cache.tft_msearch(1, [index], QUERY)).ids[0] == "00000"
+        t.delete(index)
+
+    def test_search_cache_index_name(self, t: Tair):
+        index = create_index(t)
+        cache = SearchCache(t, ttl=60)
+
+        # an index named by str or by bytes shares its results and generation.
+        cache.tft_search(index, QUERY)
+        cache.tft_search(index.encode(), QUERY)
+        assert cache.stats.hits == 1
+        cache.tft_adddoc(index.encode(), '{"product_id":"p1","price":10}', "00010")
+        assert SearchResult(cache.tft_search(index, QUERY)).ids[0] == "00010"
+        assert cache.stats.stale == 1
+        t.delete(index)
+
+    def test_search_cache_bounds(self, t: Tair):
+        index = create_index(t)
+        cache = SearchCache(t, ttl=0.2)
+        cache.tft_search(index, QUERY)
+        time.sleep(0.3)
+        cache.tft_search(index, QUERY)
+        assert cache.stats.hits == 0 and cache.stats.stale == 1
+
+        size = len(cache.tft_search(index, '{"query":{"match_all":{}}}'))
+        cache = SearchCache(t, max_bytes=size * 2)
+        for i in range(4):
+            cache.tft_search(index, f'{{"query":{{"match_all":{{}}}},"size":{10 + i}}}')
+        assert len(cache.store) < 4
+        assert cache.stats.evictions > 0
+        assert cache.store.bytes <= size * 2
+        with pytest.raises(DataError):
+            SearchCache(t, ttl=0)
+        t.delete(index)
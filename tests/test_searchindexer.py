@@ -0,0 +1,67 @@
+import json
+import uuid
+
+import pytest
+
+from tair import BulkIndexer, DataError, Tair
+from tair.searchindexer import batch_docs, dumps_doc, encode_doc
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": {
+      "product_id": { "type": "keyword" },
+      "price": { "type": "double" }
+    }
+  }
+}"""
+
+
+class TestSearchIndexer:
+    def test_batch_docs(self):
+        docs = [(str(i), {"product_id": "p" * i}) for i in range(10)]
+        batches = list(batch_docs(docs, 4, 1 << 20, dumps_doc))
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        batches = list(batch_docs(docs, 100, 64, dumps_doc))
+        assert sum(len(batch) for batch in batches) == 10
+        assert all(sum(len(d) for _, d in batch[:-1]) < 64 for batch in batches)
+        assert encode_doc('{"a":1}', dumps_doc) == b'{"a":1}'
+        assert json.loads(encode_doc({"a": "中"}, dumps_doc)) == {"a": "中"}
+
+    def test_bulk_indexer(self, t: Tair):
+        index = "idx_" + str(uuid.uuid4())
+        assert t.tft_createindex(index, MAPPINGS)
+        docs = (
+            (f"{i:05}", {"product_id": f"product_{i % 7}", "price": i / 10})
+            for i in range(2000)
+        )
+
+        indexer = BulkIndexer(t, index, batch_size=128, batch_bytes=4096)
+        stats = indexer.add(docs)
+        assert stats.docs == 2000
+        assert stats.batches > 2000 // 128
+        assert stats.failed == 0
+        assert stats.docs_per_sec > 0 and stats.bytes_per_sec > 0
+        assert t.tft_docnum(index) == 2000
+        assert json.loads(t.tft_getdoc(index, "00042"))["_source"] == {
+            "product_id": "product_0",
+            "price": 4.2,
+        }
+
+        # identical documents with different ids are all indexed.
+        indexer.add([("a", '{"price":1}'), ("b", '{"price":1}')])
+        assert t.tft_docnum(index) == 2002
+        t.delete(index)
+
+    def test_bulk_indexer_failed(self, t: Tair):
+        index = "idx_" + str(uuid.uuid4())
+        assert t.tft_createindex(index, MAPPINGS)
+
+        indexer = BulkIndexer(t, index, batch_size=1, raise_on_error=False)
+        indexer.add([("1", {"price": 1}), ("2", "not json"), ("3", {"price": 3})])
+        assert indexer.failed_ids == ["2"]
+        assert indexer.stats.docs == 2 and indexer.stats.failed == 1
+        with pytest.raises(DataError):
+            BulkIndexer(t, index, in_flight=0)
+        t.delete(index)
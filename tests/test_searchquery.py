@@ -0,0 +1,133 @@
+import json
+import uuid
+
+import pytest
+
+from tair import DataError, QueryCache, SearchQuery, SearchResult, Tair
+from tair.searchquery import (
+    Bool,
+    Match,
+    MatchAll,
+    MetricAgg,
+    Param,
+    Range,
+    Term,
+    Terms,
+    TermsAgg,
+)
+
+
+class TestSearchQuery:
+    def test_search_query(self):
+        query = (
+            SearchQuery(
+                Bool(
+                    must=[Match("title", "red shoes", operator="and")],
+                    filter=[Term("category", "c1"), Range("price", gte=10, lt=100)],
+                    must_not=[Terms("tag", ["x", "y"])],
+                )
+            )
+            .sort("price", "desc")
+            .page(20, 10)
+            .aggregate("brands", TermsAgg("brand", size=5))
+            .aggregate("avg_price", MetricAgg("avg", "price"))
+            .source(includes=["title"])
+        )
+        assert json.loads(query.to_json()) == {
+            "query": {
+                "bool": {
+                    "must": [
+                        {"match": {"title": {"query": "red shoes", "operator": "and"}}}
+                    ],
+                    "must_not": [{"terms": {"tag": ["x", "y"]}}],
+                    "filter": [
+                        {"term": {"category": "c1"}},
+                        {"range": {"price": {"gte": 10, "lt": 100}}},
+                    ],
+                }
+            },
+            "sort": [{"price": {"order": "desc"}}],
+            "from": 20,
+            "size": 10,
+            "aggs": {
+                "brands": {"terms": {"field": "brand", "size": 5}},
+                "avg_price": {"avg": {"field": "price"}},
+            },
+            "_source": {"includes": ["title"]},
+        }
+        assert str(SearchQuery(MatchAll())) == '{"query":{"match_all":{}}}'
+        with pytest.raises(DataError):
+            Range("price")
+        with pytest.raises(DataError):
+            SearchQuery().sort("price", "up")
+
+    def test_compiled_query(self):
+        query = SearchQuery(Bool(filter=[Term("category", Param("category"))]))
+        compiled = query.page(Param("offset"), 10).compile()
+
+        assert compiled.params == ["category", "offset"]
+        assert json.loads(compiled.render(category='a "b"', offset=5)) == json.loads(
+            SearchQuery(Bool(filter=[Term("category", 'a "b"')])).page(5, 10).to_json()
+        )
+        assert compiled.render({"category": "c", "offset": 0}) == compiled.render(
+            category="c", offset=0
+        )
+        with pytest.raises(DataError):
+            compiled.render(category="c")
+        with pytest.raises(DataError):
+            query.to_json()
+        with pytest.raises(DataError):
+            Param("not a name")
+
+    def test_query_cache(self):
+        cache = QueryCache(maxsize=2)
+        builds = []
+
+        def build(field):
+            builds.append(field)
+            return SearchQuery(Term(field, Param("value")))
+
+        assert cache.render("a", lambda: build("a"), value=1) == (
+            '{"query":{"term":{"a":1}}}'
+        )
+        assert cache.render("a", lambda: build("a"), value=2) == (
+            '{"query":{"term":{"a":2}}}'
+        )
+        cache.get("b", lambda: build("b"))
+        cache.get("c", lambda: build("c"))
+        cache.get("a", lambda: build("a"))
+        assert builds == ["a", "b", "c", "a"]
+        assert len(cache) == 2
+        assert cache.stats.hits == 1 and cache.stats.misses == 4
+
+    def test_search_with_query(self, t: Tair):
+        index = "idx_" + str(uuid.uuid4())
+        mappings = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": {
+      "product_id": { "type": "keyword" },
+      "price": { "type": "double" }
+    }
+  }
+}"""
+        assert t.tft_createindex(index, mappings)
+        for i in range(10):
+            t.tft_adddoc(
+                index, json.dumps({"product_id": f"p{i % 2}", "price": i}), f"{i:05}"
+            )
+
+        compiled = (
+            SearchQuery(Bool(filter=[Term("product_id", Param("product"))]))
+            .sort("price", "desc")
+            .page(0, 3)
+            .compile()
+        )
+        result = SearchResult(t.tft_search(index, compiled.render(product="p1")))
+        assert result.ids == ["00009", "00007", "00005"]
+        query = SearchQuery(Term("product_id", Param("product"))).sort("price", "desc")
+        reply = t.tft_msearch(1, [index], query.compile().render(product="p0"))
+        assert SearchResult(reply).ids[:3] == ["00008", "00006", "00004"]
+        assert json.loads(t.tft_explaincost(index, SearchQuery(MatchAll())))
+        t.delete(index)
@@ -0,0 +1,89 @@
+import json
+import uuid
+
+import pytest
+
+from tair import DataError, Reindexer, Tair
+from tair.searchreindex import source_text
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": {
+      "name": { "type": "keyword" },
+      "price": { "type": "long" }
+    }
+  }
+}"""
+
+
+def create_index(t: Tair, docs: int) -> str:
+    index = "idx_" + str(uuid.uuid4())
+    assert t.tft_createindex(index, MAPPINGS)
+    for i in range(docs):
+        t.tft_adddoc(index, json.dumps({"name": f"n{i}", "price": i}), f"{i:05}")
+    return index
+
+
+class TestReindexer:
+    def test_source_text(self):
+        reply = '{"_id":"00001","_source":{"name":"a}","price":1}}'
+        assert source_text(reply) == '{"name":"a}","price":1}'
+        assert source_text('{"_id":"00001"}') is None
+
+    def test_reindex(self, t: Tair):
+        source = create_index(t, 25)
+        dest = "idx_" + str(uuid.uuid4())
+        assert t.tft_createindex(dest, MAPPINGS)
+
+        cursors = []
+        reindexer = Reindexer(t, source, dest, scan_count=10, batch_size=4)
+        stats = reindexer.run(checkpoint=cursors.append)
+        assert stats.scanned == 25 and stats.docs == 25
+        assert reindexer.cursor is None and cursors[-1] is None
+        assert t.tft_docnum(dest) == 25
+        assert t.tft_getdoc(dest, "00003") == t.tft_getdoc(source, "00003")
+        t.delete(source)
+        t.delete(dest)
+
+    def test_reindex_transform(self, t: Tair):
+        source = create_index(t, 10)
+        dest = "idx_" + str(uuid.uuid4())
+        assert t.tft_createindex(dest, MAPPINGS)
+
+        def transform(doc_id, doc):
+            if doc["price"] % 2:
+                return None
+            return dict(doc, price=doc["price"] * 100)
+
+        reindexer = Reindexer(t, source, dest, transform=transform, scan_count=3)
+        stats = reindexer.run()
+        assert stats.docs == 5 and stats.skipped == 5
+        assert json.loads(t.tft_getdoc(dest, "00004"))["_source"]["price"] == 400
+        assert t.tft_getdoc(dest, "00001") is None
+        t.delete(source)
+        t.delete(dest)
+
+    def test_reindex_resume(self, t: Tair):
+        source = create_index(t, 20)
+        dest = "idx_" + str(uuid.uuid4())
+        assert t.tft_createindex(dest, MAPPINGS)
+
+        cursors = []
+        Reindexer(t, source, dest, scan_count=5).run(checkpoint=cursors.append)
+        assert t.tft_delall(dest)
+        reindexer = Reindexer(t, source, dest, scan_count=5)
+        stats = reindexer.run(cursors[0])
+        assert 0 < stats.scanned < 20 and t.tft_docnum(dest) == stats.scanned
+        assert reindexer.run(None).scanned == stats.scanned
+        t.delete(source)
+        t.delete(dest)
+
+    def test_reindex_args(self, t: Tair):
+        with pytest.raises(DataError):
+            Reindexer(t, "a", "b", scan_count=0)
+        with pytest.raises(DataError):
+            Reindexer(t, "a", "b", max_docs_per_sec=0)
+        with pytest.raises(DataError):
+            Reindexer(t, "a", "b", in_flight=0)
@@ -0,0 +1,88 @@
+import json
+import uuid
+
+import pytest
+
+from tair import DataError, SearchHit, SearchResult, Tair
+
+REPLY = """{
+  "hits": {
+    "hits": [
+      {
+        "_id": "00001",
+        "_index": "idx",
+        "_score": 1.5,
+        "_source": { "product_id": "test1", "tags": ["a]", "{b"] }
+      },
+      {
+        "_id": "00002",
+        "_index": "idx",
+        "_score": 0.5,
+        "_source": { "product_id": "test2" },
+        "sort": [2.0]
+      }
+    ],
+    "max_score": 1.5,
+    "total": { "relation": "eq", "value": 2 }
+  },
+  "aggregations": {
+    "groups": {
+      "buckets": [{ "key": "a", "doc_count": 2 }, { "key": "b", "doc_count": 1 }]
+    }
+  }
+}"""
+
+
+class TestSearchResult:
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_search_result(self, stream):
+        result = SearchResult(REPLY, stream=stream)
+
+        assert result.ids == ["00001", "00002"]
+        assert result.scores == [1.5, 0.5]
+        assert result.total == 2
+        assert result.max_score == 1.5
+        assert len(result) == 2
+        # a _source is only decoded when it is accessed.
+        assert result.hits[1]._raw_source == '{ "product_id": "test2" }'
+        assert result.hits[0].source == {"product_id": "test1", "tags": ["a]", "{b"]}
+        assert result.hits[1] == SearchHit(
+            "00002", 0.5, "idx", {"product_id": "test2"}, {"sort": [2.0]}
+        )
+        assert list(result.iter_buckets("groups")) == [
+            {"key": "a", "doc_count": 2},
+            {"key": "b", "doc_count": 1},
+        ]
+        assert list(result.iter_buckets("missing")) == []
+        assert result.aggregations == json.loads(REPLY)["aggregations"]
+        assert result == SearchResult(REPLY.encode())
+        assert str(result) == "{total: 2, max_score: 1.5, ids: ['00001', '00002']}"
+
+    def test_search_result_empty(self):
+        result = SearchResult('{"hits":{"hits":[],"max_score":null,"total":0}}')
+        assert result.ids == [] and result.total == 0 and result.aggregations == {}
+
+    def test_search_result_malformed(self):
+        with pytest.raises(DataError):
+            SearchResult('{"hits": {"hits": [{"_id": "1"', stream=True).ids
+
+    def test_search_result_reply(self, t: Tair):
+        index = "idx_" + str(uuid.uuid4())
+        mappings = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": { "product_id": { "type": "keyword" } }
+  }
+}"""
+        assert t.tft_createindex(index, mappings)
+        assert t.tft_madddoc(
+            index,
+            {'{"product_id":"test1"}': "00001", '{"product_id":"test2"}': "00002"},
+        )
+
+        result = SearchResult(t.tft_search(index, '{"query":{"match_all":{}}}'))
+        assert sorted(result.ids) == ["00001", "00002"]
+        assert result.total == 2
+        assert result == SearchResult(result.raw, stream=True)
+        t.delete(index)
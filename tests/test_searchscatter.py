@@ -0,0 +1,159 @@
+import json
+import uuid
+
+import pytest
+
+from tair import DataError, SearchResult, Tair, TairCluster
+from tair.searchscatter import merge_replies, scatter_search, shard_query
+
+MAPPINGS = """
+{
+  "mappings": {
+    "_source": { "enabled": true },
+    "properties": {
+      "brand": { "type": "keyword" },
+      "price": { "type": "long" }
+    }
+  }
+}"""
+
+
+def reply(hits, total, aggs=None) -> str:
+    data = {"hits": {"hits": hits, "max_score": 1.0, "total": total}}
+    if aggs is not None:
+        data["aggregations"] = aggs
+    return json.dumps(data)
+
+
+def hit(id: str, price: int) -> dict:
+    return {"_id": id, "_score": 1.0, "_source": {"price": price}}
+
+
+def create_indexes(client, names) -> list:
+    prefix = str(uuid.uuid4())
+    indexes = []
+    for n, name in enumerate(names):
+        index = f"{{{name}}}:{prefix}"
+        assert client.tft_createindex(index, MAPPINGS)
+        for i in range(5):
+            doc = {"brand": "ab"[i % 2], "price": n * 10 + i}
+            client.tft_adddoc(index, json.dumps(doc), f"{name}-{i}")
+        indexes.append(index)
+    return indexes
+
+
+class TestSearchScatter:
+    def test_shard_query(self):
+        query = {
+            "from": 5,
+            "size": 10,
+            "aggs": {
+                "brands": {"terms": {"field": "brand", "size": 4}},
+                "price": {"avg": {"field": "price"}},
+            },
+        }
+        shard, offset, size = shard_query(query)
+        assert (shard["from"], shard["size"], offset, size) == (0, 15, 5, 10)
+        assert shard["aggs"]["brands"]["terms"]["size"] > 4
+        assert shard["aggs"]["price"] == {"stats": {"field": "price"}}
+        assert query["aggs"]["price"] == {"avg": {"field": "price"}}
+
+        aggregations = {"aggregations": {"price": {"avg": {"field": "price"}}}}
+        shard, _, _ = shard_query(aggregations)
+        assert shard["aggregations"]["price"] == {"stats": {"field": "price"}}
+
+        with pytest.raises(DataError):
+            shard_query({"aggs": {"h": {"histogram": {"field": "price"}}}})
+        with pytest.raises(DataError):
+            shard_query({"aggregations": {"h": {"histogram": {"field": "price"}}}})
+        with pytest.raises(DataError):
+            shard_query({"size": -1})
+
+    def test_merge_replies(self):
+        query = {
+            "sort": [{"price": {"order": "desc"}}],
+            "from": 1,
+            "size": 2,
+            "aggs": {
+                "brands": {"terms": {"field": "brand", "size": 2}},
+                "total": {"sum": {"field": "price"}},
+                "cheapest": {"min": {"field": "price"}},
+                "price": {"avg": {"field": "price"}},
+            },
+        }
+        shard, offset, size = shard_query(query)
+        first = reply(
+            [hit("a", 9), hit("b", 4), hit("c", 1)],
+            {"relation": "eq", "value": 3},
+            {
+                "brands": {"buckets": [{"key": "x", "doc_count": 2}]},
+                "total": {"value": 14},
+                "cheapest": {"value": 1},
+                "price": {"count": 3, "min": 1, "max": 9, "avg": 14 / 3, "sum": 14},
+            },
+        )
+        second = reply(
+            [hit("d", 7), hit("e", 6)],
+            {"relation": "eq", "value": 2},
+            {
+                "brands": {
+                    "buckets": [
+                        {"key": "y", "doc_count": 1},
+                        {"key": "x", "doc_count": 1},
+                    ]
+                },
+                "total": {"value": 13},
+                "cheapest": {"value": 6},
+                "price": {"count": 2, "min": 6, "max": 7, "avg": 6.5, "sum": 13},
+            },
+        )
+        merged = json.loads(merge_replies(query, [first, second], offset, size))
+        assert [h["_id"] for h in merged["hits"]["hits"]] == ["d", "e"]
+        assert merged["hits"]["total"] == {"relation": "eq", "value": 5}
+        aggs = merged["aggregations"]
+        assert aggs["brands"]["buckets"] == [
+            {"key": "x", "doc_count": 3},
+            {"key": "y", "doc_count": 1},
+        ]
+        assert aggs["total"] == {"value": 27}
+        assert aggs["cheapest"] == {"value": 1}
+        assert aggs["price"] == {"value": 27 / 5}
+
+        # aggregations named under "aggregations" are merged the same way.
+        query = {"aggregations": {"total": {"sum": {"field": "price"}}}}
+        merged = json.loads(merge_replies(query, [first, second], 0, 10))
+        assert merged["aggregations"] == {"total": {"value": 27}}
+
+    def test_scatter_search(self, t: Tair):
+        indexes = create_indexes(t, ["day1", "day2"])
+        query = {
+            "query": {"match_all": {}},
+            "sort": [{"price": {"order": "desc"}}],
+            "from": 2,
+            "size": 4,
+            "aggs": {"brands": {"terms": {"field": "brand"}}},
+        }
+        result = SearchResult(scatter_search(t, indexes, json.dumps(query)))
+        assert result.total == 10
+        assert [hit.source["price"] for hit in result] == [12, 11, 10, 4]
+        assert list(result.iter_buckets("brands")) == [
+            {"key": "a", "doc_count": 6},
+            {"key": "b", "doc_count": 4},
+        ]
+        single = scatter_search(t, indexes[:1], json.dumps(query))
+        assert SearchResult(single).total == 5
+        with pytest.raises(DataError):
+            scatter_search(t, [], json.dumps(query))
+        for index in indexes:
+            t.delete(index)
+
+    def test_scatter_search_cluster(self, tc: TairCluster):
+        indexes = create_indexes(tc, [f"day{i}" for i in range(7)])
+        assert len({tc.keyslot(index) for index in indexes}) > 1
+        query = '{"query":{"range":{"price":{"gte":30}}},"size":50}'
+        result = SearchResult(scatter_search(tc, indexes, query))
+        assert result.total == 20
+        prices = sorted(n * 10 + i for n in range(3, 7) for i in range(5))
+        assert sorted(hit.source["price"] for hit in result) == prices
+        for index in indexes:
+            tc.delete(index)
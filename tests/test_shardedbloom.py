@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+
+from tair import DataError, ShardedBloom, Tair, TairCluster
+from tair.shardedbloom import default_shards, shard_capacity
+
+
+class TestShardedBloom:
+    def test_sharded_bloom_sizing(self, t: Tair):
+        assert default_shards(1000, 0.01) == 1
+        assert default_shards(10**9, 0.01) > 1
+        assert shard_capacity(10000, 4) > 2500
+
+        bloom = ShardedBloom(t, "key", capacity=10**9)
+        assert bloom.shards == default_shards(10**9, 0.01)
+        assert bloom.shard_capacity * bloom.shards > 10**9
+
+        with pytest.raises(DataError):
+            ShardedBloom(t, "key", capacity=0)
+        with pytest.raises(DataError):
+            ShardedBloom(t, "key", capacity=100, error_rate=0)
+        with pytest.raises(DataError):
+            ShardedBloom(t, "key", capacity=100, shards=0)
+
+    def test_sharded_bloom_madd(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ShardedBloom(t, name, capacity=10000, shards=8, batch_size=100)
+        items = [f"item_{i}" for i in range(1000)]
+
+        assert bloom.mexists(items[:10]) == [0] * 10
+        assert bloom.madd(items) == [1] * 1000
+        assert bloom.madd(items[:10] + ["item_new"]) == [0] * 10 + [1]
+        assert bloom.mexists(items) == [1] * 1000
+        assert bloom.add("item_0") == 0
+        assert bloom.exists("item_0") == 1
+        assert bloom.exists("item_none") == 0
+        assert sum(t.exists(key) for key in bloom.keys) == 8
+
+    def test_sharded_bloom_cluster(self, tc: TairCluster):
+        name = "key_" + str(uuid.uuid4())
+        bloom = ShardedBloom(tc, name, capacity=10000, shards=8)
+        items = [f"item_{i}" for i in range(1000)]
+
+        assert len({tc.keyslot(key) for key in bloom.keys}) > 1
+        assert bloom.madd(items) == [1] * 1000
+        assert bloom.mexists(items + ["item_none"]) == [1] * 1000 + [0]
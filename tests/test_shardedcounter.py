@@ -0,0 +1,106 @@
+import threading
+import uuid
+
+import pytest
+
+from tair import ResponseError, ShardedCounter, Tair, TairCluster
+
+
+class TestShardedCounter:
+    def test_sharded_counter_init(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+
+        counter.init(10)
+        assert counter.stocks() == [3, 3, 2, 2]
+        assert counter.total() == 10
+        assert t.exget(counter.keys[0]).value == b"3"
+
+    def test_sharded_counter_decr(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4, rebalance_interval=None)
+
+        counter.init(10)
+        for _ in range(10):
+            assert counter.decr()
+        assert not counter.decr()
+        assert counter.total() == 0
+
+    def test_sharded_counter_decr_fallback(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+
+        counter.init(7)
+        # no single shard holds 5, so the stock is consolidated first.
+        assert counter.decr(5)
+        assert counter.total() == 2
+        assert not counter.decr(3)
+        assert counter.total() == 2
+
+    def test_sharded_counter_incr(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=2)
+
+        counter.init(0)
+        assert not counter.decr()
+        counter.incr(3)
+        assert counter.total() == 3
+        assert counter.decr(2)
+
+    def test_sharded_counter_rebalance(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+
+        counter.init(0)
+        t.exset(counter.keys[0], 8)
+        assert counter.rebalance() == 8
+        assert counter.stocks() == [2, 2, 2, 2]
+
+    def test_sharded_counter_rebalance_error(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+
+        counter.init(0)
+        t.exset(counter.keys[0], 5)
+        t.set(counter.keys[1], "5")
+        counter.stocks = lambda: [5, 5, 0, 0]
+        # the withdrawal from the plain key fails, but the one from the
+        # first shard is still deposited.
+        with pytest.raises(ResponseError):
+            counter.rebalance()
+        values = [t.exget(counter.keys[i]).value for i in (0, 2, 3)]
+        assert values == [b"3", b"2", b"0"]
+
+    def test_sharded_counter_concurrent(self, t: Tair):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(t, name, shards=4)
+        counter.init(100)
+        sold = []
+
+        def target():
+            c = ShardedCounter(t, name, shards=4)
+            while c.decr():
+                sold.append(1)
+
+        threads = [threading.Thread(target=target) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # a worker may give up while another one moves stock between shards,
+        # but stock is never oversold nor lost.
+        while counter.decr():
+            sold.append(1)
+        assert len(sold) == 100
+        assert counter.total() == 0
+
+    def test_sharded_counter_cluster(self, tc: TairCluster):
+        name = "key_" + str(uuid.uuid4())
+        counter = ShardedCounter(tc, name, shards=8)
+
+        counter.init(16)
+        assert len({tc.keyslot(key) for key in counter.keys}) > 1
+        for _ in range(16):
+            assert counter.decr()
+        assert not counter.decr()
@@ -0,0 +1,22 @@
+from tair.searchindexer import IndexStats
+from tair.stats import Stats
+
+
+class TestStats:
+    def test_stats_repr(self):
+        class ItemStats(Stats):
+            FIELDS = ("items", "elapsed:.3f")
+
+            def __init__(self) -> None:
+                self.items = 3
+                self.elapsed = 1.23456
+
+        assert repr(ItemStats()) == "{items: 3, elapsed: 1.235}"
+
+        stats = IndexStats()
+        stats.record([("1", b"{}")], True)
+        stats.elapsed = 2.0
+        assert repr(stats) == (
+            "{docs: 1, bytes: 2, batches: 1, retries: 0, failed: 0, "
+            + "elapsed: 2.000, docs_per_sec: 0, bytes_per_sec: 1}"
+        )
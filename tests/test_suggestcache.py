@@ -0,0 +1,133 @@
+import time
+import uuid
+
+import pytest
+
+from tair import DataError, SuggestionCache, Tair
+from tair.suggestcache import SuggestionTrie, rank_weights
+
+SUGGESTIONS = {
+    "redis cluster": 10,
+    "redis is a memory database": 3,
+    "redis module": 7,
+    "tair search": 5,
+}
+
+
+def create_index(t: Tair) -> str:
+    index = "idx_" + str(uuid.uuid4())
+    assert t.tft_addsug(index, SUGGESTIONS) == len(SUGGESTIONS)
+    return index
+
+
+# wait_for waits for the background thread of a cache to satisfy condition.
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestSuggestionTrie:
+    def test_complete(self):
+        trie = SuggestionTrie(SUGGESTIONS.items())
+        assert len(trie) == 4
+        assert trie.complete("redis") == [
+            "redis cluster",
+            "redis module",
+            "redis is a memory database",
+        ]
+        assert trie.complete("redis", 1) == ["redis cluster"]
+        assert trie.complete("redis m") == ["redis module"]
+        assert trie.complete("mysql") == []
+
+        trie.insert("redis stack", 20)
+        assert trie.complete("redis", 1) == ["redis stack"]
+
+    def test_fuzzy(self):
+        trie = SuggestionTrie(SUGGESTIONS.items())
+        assert trie.fuzzy("res", 2) == ["redis cluster", "redis module"]
+        assert trie.fuzzy("rdis", 1) == ["redis cluster"]
+        assert trie.fuzzy("tsir", 5) == ["tair search"]
+        assert trie.fuzzy("rxxis", 5) == []
+
+    def test_rank_weights(self):
+        assert rank_weights(["a", "b", "c"]) == [("a", 3), ("b", 2), ("c", 1)]
+
+
+class TestSuggestionCache:
+    def test_suggestion_cache(self, t: Tair):
+        index = create_index(t)
+        with SuggestionCache(t, refresh_interval=None) as cache:
+            assert cache.load(index) == 4
+            # the groups built by load rank their matches by text.
+            assert cache.tft_getsug(index, "redis", max_count=2) == [
+                "redis cluster",
+                "redis is a memory database",
+            ]
+            assert cache.tft_getsug(index, "tair") == ["tair search"]
+            assert cache.stats.hits == 2 and cache.stats.misses == 0
+
+            # reloaded, they keep the order of the server.
+            cache.refresh(full=True)
+            assert cache.tft_getsug(index, "redis", max_count=2) == t.tft_getsug(
+                index, "redis", max_count=2
+            )
+
+            # a write through the cache reloads the groups it changed.
+            assert cache.tft_addsug(index, {"redis stack": 100}) == 1
+            assert cache.tft_getsug(index, "redis", max_count=1) == ["redis stack"]
+            wait_for(lambda: (index, "r") in cache.store)
+            assert cache.tft_getsug(index, "redis", max_count=1) == ["redis stack"]
+            assert cache.tft_delsug(index, ["redis stack"]) == 1
+            assert "redis stack" not in cache.tft_getsug(index, "redis")
+            assert cache.stats.invalidations == 2
+        t.delete(index)
+
+    def test_suggestion_cache_miss(self, t: Tair):
+        index = create_index(t)
+        with SuggestionCache(t, refresh_interval=None) as cache:
+            # a miss is answered by the server and loads the group in the
+            # background.
+            assert cache.tft_getsug(index, "redis", max_count=1) == ["redis cluster"]
+            assert cache.stats.misses == 1
+            wait_for(lambda: (index, "r") in cache.store)
+            assert cache.tft_getsug(index, "redis", max_count=1) == ["redis cluster"]
+            assert cache.stats.hits == 1
+        t.delete(index)
+
+    def test_suggestion_cache_refresh(self, t: Tair):
+        index = create_index(t)
+        with SuggestionCache(t, refresh_interval=0.2) as cache:
+            assert cache.tft_getsug(index, "tair") == ["tair search"]
+            wait_for(lambda: (index, "t") in cache.store)
+            t.tft_addsug(index, {"tair vector": 1})
+            assert cache.tft_getsug(index, "tair") == ["tair search"]
+            time.sleep(0.5)
+            assert cache.stats.refreshes > 0
+            assert cache.staleness < 0.5
+            assert sorted(cache.tft_getsug(index, "tair")) == [
+                "tair search",
+                "tair vector",
+            ]
+        t.delete(index)
+
+    def test_suggestion_cache_bounds(self, t: Tair):
+        index = create_index(t)
+        with SuggestionCache(t, max_entries=2, refresh_interval=None) as cache:
+            # the group of "r" holds 3 suggestions, so it is read from the
+            # server, and remembered as such across refreshes.
+            assert cache.tft_getsug(index, "redis") == t.tft_getsug(index, "redis")
+            wait_for(lambda: cache.store.is_oversized((index, "r")))
+            cache.refresh(full=True)
+            assert cache.store.is_oversized((index, "r"))
+            assert cache.tft_getsug(index, "tair") == ["tair search"]
+            wait_for(lambda: cache.store.entries == 1)
+            assert cache.load(index) == 1
+            assert cache.stats.misses == 2
+
+        with pytest.raises(DataError):
+            SuggestionCache(t, max_entries=0)
+        with pytest.raises(DataError):
+            SuggestionCache(t, refresh_interval=0)
+        t.delete(index)
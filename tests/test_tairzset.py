@@ -3,6 +3,7 @@ import uuid
 import pytest
 
 from tair import DataError, Tair, TairZsetItem
+from tair.tairzset import decode_scores, encode_score, encode_scores, items_to_array
 
 
 class TestTairZset:
@@ -799,3 +800,73 @@ class TestTairZset:
             str(TairZsetItem(member.encode(), 100))
             == f"{{member: {member.encode()}, score: 100}}"
         )
+
+    def test_exzadd_tuple_score(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        member1 = "member_" + str(uuid.uuid4())
+        member2 = "member_" + str(uuid.uuid4())
+
+        assert t.exzadd(key, {member1: (1, 2.5), member2: (1, 3)}) == 2
+        assert t.exzscore(key, member1) == "1#2.5"
+        assert t.exzincrby(key, (1, 1), member1) == "2#3.5"
+        items = t.exzrange(key, 0, -1, True)
+        assert decode_scores(items) == [(1.0, 3.0), (2.0, 3.5)]
+
+    def test_exzrangebyscore_tuple_bounds(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        member1 = "member_" + str(uuid.uuid4())
+        member2 = "member_" + str(uuid.uuid4())
+        member3 = "member_" + str(uuid.uuid4())
+
+        t.exzadd(key, {member1: (1, 1), member2: (1, 2), member3: (2, 0)})
+        assert t.exzrangebyscore(key, (1, 2), (2, 0)) == [
+            TairZsetItem(member2.encode(), None),
+            TairZsetItem(member3.encode(), None),
+        ]
+        assert t.exzrevrangebyscore(key, (1, 2), "-inf#-inf") == [
+            TairZsetItem(member2.encode(), None),
+            TairZsetItem(member1.encode(), None),
+        ]
+        assert t.exzcount(key, (1, 0), (1, 9)) == 2
+        assert t.exzrankbyscore(key, (1, 2)) == 1
+        assert t.exzrevrankbyscore(key, (1, 2)) == 1
+        assert t.exzremrangebyscore(key, (2, 0), (2, 0)) == 1
+
+    def test_exzadd_array(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        members = ["member_" + str(uuid.uuid4()) for _ in range(3)]
+
+        assert t.exzadd_array(key, members, [(3, 1), (2, 1), (1, 1)]) == 3
+        assert t.exzrange(key, 0, -1) == [
+            TairZsetItem(members[2].encode(), None),
+            TairZsetItem(members[1].encode(), None),
+            TairZsetItem(members[0].encode(), None),
+        ]
+        with pytest.raises(DataError):
+            t.exzadd_array(key, members, [1, 2])
+
+    def test_exzadd_array_numpy(self, t: Tair):
+        np = pytest.importorskip("numpy")
+        key = "key_" + str(uuid.uuid4())
+        members = ["member_" + str(i) for i in range(100)]
+        scores = np.arange(200, dtype="f8").reshape(100, 2)
+
+        assert t.exzadd_array(key, members, scores) == 100
+        result = items_to_array(t.exzrange(key, 0, -1, True))
+        assert result["member"].tolist() == [m.encode() for m in members]
+        assert (result["score"] == scores).all()
+
+    def test_encode_scores(self):
+        assert encode_score((1, 2.5, -3)) == "1#2.5#-3"
+        assert encode_score("(1#2") == "(1#2"
+        assert encode_score(1.5) == 1.5
+        assert encode_scores([(1, 2), 3]) == ["1#2", 3]
+
+        np = pytest.importorskip("numpy")
+        assert encode_scores(np.array([[1.0, 2.5], [0.1, 3.0]])) == [
+            "1.0#2.5",
+            "0.1#3.0",
+        ]
+        assert encode_scores(np.array([1, 2])) == ["1", "2"]
+        with pytest.raises(DataError):
+            encode_scores(np.zeros((1, 1, 1)))
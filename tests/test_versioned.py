@@ -0,0 +1,77 @@
+import threading
+import uuid
+
+import pytest
+
+from tair import ContentionStats, Tair, WatchError
+from tair.versioned import versioned_update, versioned_update_many
+
+
+class TestVersioned:
+    def test_versioned_update_string(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+
+        assert versioned_update(t, key, lambda v: 1 if v is None else int(v) + 1) == 1
+        assert versioned_update(t, key, lambda v: int(v) + 1) == 2
+        result = t.exget(key)
+        assert result.value == b"2"
+        assert result.version == 2
+
+    def test_versioned_update_hash(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        field = "field_" + str(uuid.uuid4())
+
+        assert versioned_update(t, key, lambda v: "a", field=field) == "a"
+        assert versioned_update(t, key, lambda v: v + b"b", field=field) == b"ab"
+        assert t.exhgetwithver(key, field).value == b"ab"
+
+    def test_versioned_update_concurrent(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        stats = ContentionStats()
+        t.exset(key, 0)
+
+        def target():
+            for _ in range(20):
+                versioned_update(
+                    t, key, lambda v: int(v) + 1, retries=1000, stats=stats
+                )
+
+        threads = [threading.Thread(target=target) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert t.exget(key).value == b"80"
+        assert stats.updates == 80
+        assert stats.failures == 0
+        assert stats.attempts == 80 + stats.conflicts
+
+    def test_versioned_update_retries_exhausted(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        stats = ContentionStats()
+        t.exset(key, 0)
+
+        # every write races with a concurrent bump of the version.
+        def bump(v):
+            t.exset(key, v)
+            return v
+
+        with pytest.raises(WatchError):
+            versioned_update(t, key, bump, retries=2, backoff=0, stats=stats)
+        assert stats.failures == 1
+        assert stats.conflicts == 3
+        assert stats.hot_keys() == [(key, 3)]
+
+    def test_versioned_update_many(self, t: Tair):
+        key1 = "key_" + str(uuid.uuid4())
+        key2 = "key_" + str(uuid.uuid4())
+        field = "field_" + str(uuid.uuid4())
+        t.exset(key1, 10)
+
+        result = versioned_update_many(
+            t, [key1, (key2, field)], lambda v: 1 if v is None else int(v) + 1
+        )
+        assert result == {key1: 11, (key2, field): 1}
+        assert t.exget(key1).value == b"11"
+        assert t.exhget(key2, field) == b"1"
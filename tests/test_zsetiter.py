@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+
+from tair import DataError, Tair
+from tair.zsetiter import (
+    iter_exzrange,
+    iter_exzrangebylex,
+    iter_exzrangebyscore,
+    next_lex_cursor,
+)
+
+
+class TestZsetIter:
+    def test_iter_exzrange(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        t.exzadd(key, {f"member_{i:03d}": i for i in range(250)})
+        expected = [(f"member_{i:03d}".encode(), str(i)) for i in range(250)]
+
+        assert list(iter_exzrange(t, key, page_size=64)) == expected
+        assert list(iter_exzrange(t, key, 10, 99, page_size=64)) == expected[10:100]
+        assert list(iter_exzrange(t, key, reverse=True, page_size=64)) == expected[::-1]
+        assert list(iter_exzrange(t, key, page_size=64, prefetch=True)) == expected
+
+    def test_iter_exzrangebyscore(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        # many members share a score, so pages end in the middle of a tie.
+        t.exzadd(key, {f"member_{i:03d}": i // 10 for i in range(250)})
+        expected = [(f"member_{i:03d}".encode(), str(i // 10)) for i in range(250)]
+
+        assert list(iter_exzrangebyscore(t, key, page_size=7)) == expected
+        assert list(iter_exzrangebyscore(t, key, 5, "(10", page_size=7)) == [
+            entry for entry in expected if 5 <= int(entry[1]) < 10
+        ]
+        assert (
+            list(iter_exzrangebyscore(t, key, reverse=True, page_size=7, prefetch=True))
+            == expected[::-1]
+        )
+
+    def test_iter_exzrangebyscore_multi_score(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        t.exzadd(key, {f"member_{i:03d}": (i // 10, i % 3) for i in range(100)})
+
+        result = list(iter_exzrangebyscore(t, key, "0#0", "9#2", page_size=8))
+        assert len(result) == 100
+        assert result == sorted(
+            result, key=lambda entry: tuple(map(float, entry[1].split("#")))
+        )
+
+    def test_iter_exzrangebylex(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        t.exzadd(key, {f"member_{i:03d}": 0 for i in range(250)})
+        expected = [f"member_{i:03d}".encode() for i in range(250)]
+
+        assert list(iter_exzrangebylex(t, key, page_size=64)) == expected
+        assert (
+            list(iter_exzrangebylex(t, key, "[member_010", "(member_100", page_size=8))
+            == expected[10:100]
+        )
+        assert list(iter_exzrangebylex(t, key, reverse=True, page_size=64)) == (
+            expected[::-1]
+        )
+
+    def test_next_lex_cursor(self):
+        assert next_lex_cursor(b"-", [b"a", b"b"], 2) == b"(b"
+        assert next_lex_cursor("-", ["a", "b"], 2) == "(b"
+        assert next_lex_cursor("-", ["a"], 2) is None
+
+    def test_iter_invalid_args(self, t: Tair):
+        key = "key_" + str(uuid.uuid4())
+        with pytest.raises(DataError):
+            list(iter_exzrange(t, key, page_size=0))
+        with pytest.raises(DataError):
+            list(iter_exzrange(t, key, -10, -1))
+        assert list(iter_exzrangebyscore(t, key)) == []